@@ -0,0 +1,305 @@
+"""
+Headless benchmark of the register operations on a synthetic inward_logistic of 1k to 1M rows.
+
+The register is generated with realistic, skewed data (a few suppliers and projects account for most
+entries, like at the gates) into a database of the application's SQLite backend, with the tables and B-tree
+indexes of the schema bootstrap. The operations run the application's own SQL:
+
+- search   : filters compiled by query_builder.build_filter_query(), as in the Search and Edit windows
+- export   : the whole register streamed through export.StyledSheetWriter, as download_inward_register does
+- insert   : single-row INSERT + COMMIT, as DataEntryWindow.save_data does
+- edit     : UPDATE ... WHERE id = %s + COMMIT, as save_changes does
+- last     : the last-entries query of DataEntryWindow.load_last_entries
+
+For each operation the latency percentiles, rows/s and the peak Python memory of one run are reported. With a stored
+baseline the check fails (exit code 1) when an operation's p95 latency regresses by more than the tolerance.
+SQLite is not the production server, so the numbers are for comparing versions of this code, not for sizing.
+
+Usage (from the repository root):
+    python benchmarks/bench_register.py --rows 1000 100000
+    python benchmarks/bench_register.py --rows 1000 100000 --save-baseline      # after an intended change
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from config import column_names
+from query_builder import build_filter_query, inward_select_columns, column_types
+from schema import bootstrap_schema
+from storage import SQLiteBackend, use_storage
+from export import stream_cursor_to_xlsx, register_column_widths
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "register_baseline.json")
+
+# Distinct values and Zipf exponent of the skewed columns: value k is picked with weight 1 / k ** SKEW
+SUPPLIER_COUNT = 500
+PROJECT_COUNT = 60
+DEPARTMENTS = ["Stores", "Production", "Quality", "Maintenance", "R&D", "Purchase", "IT", "Admin"]
+SKEW = 1.1
+
+# Entries are spread over this many days before the end of the generated period
+DAYS = 3 * 365
+LAST_DAY = date(2025, 12, 31)
+
+MATERIAL_WORDS = ["steel", "bolt", "nut", "washer", "bracket", "cable", "harness", "panel", "foam", "cover",
+                  "clip", "screw", "gasket", "sensor", "motor", "frame", "plate", "tube", "hose", "label"]
+
+# Rows written per executemany() while the register is generated
+GENERATE_BATCH = 10000
+
+
+def _skewed(rng, values, count):
+    weights = [1 / rank ** SKEW for rank in range(1, len(values) + 1)]
+    return rng.choices(values, weights=weights, k=count)
+
+
+def generate_rows(count, seed=7):
+    """
+    Yields `count` register rows in column_names order (without id), oldest first.
+
+    Suppliers and projects follow a Zipf distribution, a quarter of the entries are returnable with a
+    return date a few weeks after the entry, and material descriptions and remarks vary in length.
+    """
+    rng = random.Random(seed)
+    suppliers = _skewed(rng, [f"Supplier {rank:03d}" for rank in range(1, SUPPLIER_COUNT + 1)], count)
+    projects = _skewed(rng, [f"Project {rank:02d}" for rank in range(1, PROJECT_COUNT + 1)], count)
+    departments = _skewed(rng, DEPARTMENTS, count)
+    first_day = LAST_DAY - timedelta(days=DAYS - 1)
+
+    for index in range(count):
+        day = first_day + timedelta(days=index * DAYS // count)
+        returnable = rng.random() < 0.25
+        return_date = (day + timedelta(days=rng.randrange(7, 60))).isoformat() if returnable else None
+        yield (
+            index + 1, "Returnable" if returnable else "Non-Returnable",
+            rng.choice(["Non-Benefit", "Benefit"]), day.isoformat(),
+            f"{rng.randrange(7, 20):02d}:{rng.randrange(60):02d}:00", f"GE{index + 1:07d}",
+            f"INV/{rng.randrange(10 ** 6)}", f"PO{rng.randrange(10 ** 5)}", "",
+            return_date, "17:00:00" if returnable else None, suppliers[index],
+            " ".join(rng.choices(MATERIAL_WORDS, k=rng.randrange(2, 8))), rng.randrange(1, 500),
+            departments[index], projects[index], f"TPL {rng.randrange(10)}", f"MH12 AB {rng.randrange(9999)}",
+            "Receiver", "Manager", "Guard", "Remark " * rng.randrange(0, 6), "",
+        )
+
+
+class StandIn:
+    """
+    The register in a database of the application's SQLite backend (see storage.py).
+
+    The tables, B-tree indexes and collations are created by the application's own schema bootstrap, and the
+    database runs in WAL mode like the backend does for CI and offline gates. FULLTEXT indexes do not exist
+    there, so "Contains" filters are benchmarked as LIKE.
+    """
+
+    def __init__(self, path):
+        self.backend = SQLiteBackend(path)
+        use_storage(self.backend)
+        bootstrap_schema()
+        self._borrowed = self.backend.connection()
+        self.connection = self._borrowed.__enter__()
+
+    def execute(self, query, params=()):
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        return cursor
+
+    def fill(self, count, seed=7):
+        """Generates the register in batches; returns the seconds it took."""
+        start = time.perf_counter()
+        insert = self.insert_query()
+        rows = generate_rows(count, seed)
+        cursor = self.connection.cursor()
+        while True:
+            batch = [row for _, row in zip(range(GENERATE_BATCH), rows)]
+            if not batch:
+                break
+            cursor.executemany(insert, batch)
+        self.connection.commit()
+        cursor.execute("ANALYZE")
+        return time.perf_counter() - start
+
+    def close(self):
+        self._borrowed.__exit__(None, None, None)
+        self.backend.close()
+
+    @staticmethod
+    def insert_query():
+        """The INSERT of DataEntryWindow.save_data: every column but id."""
+        return (f"INSERT INTO inward_logistic ({', '.join(column_names)}) "
+                f"VALUES ({', '.join(['%s'] * len(column_names))})")
+
+
+def search_filters(rng):
+    """Returns one filter set as the Search window would build it, weighted toward the common searches."""
+    kind = rng.choices(["supplier", "project_month", "invoice", "material"], weights=[4, 3, 2, 1])[0]
+    if kind == "supplier":
+        return [("Supplier", "Equals", f"Supplier {min(int(rng.paretovariate(1.0)), SUPPLIER_COUNT):03d}")]
+    if kind == "project_month":
+        month = LAST_DAY - timedelta(days=rng.randrange(DAYS))
+        return [("Project", "Equals", f"Project {min(int(rng.paretovariate(1.0)), PROJECT_COUNT):02d}"),
+                ("Date", "Contains", month.strftime("%Y-%m"))]
+    if kind == "invoice":
+        return [("Invoice_No", "Starts With", f"INV/{rng.randrange(1000)}")]
+    return [("Material", "Contains", rng.choice(MATERIAL_WORDS))]
+
+
+def measure(operation, runs, trace_memory=True):
+    """
+    Runs `operation()` `runs` times and collects latency, rows and peak memory.
+
+    The first run is a warm-up and is not timed. When `trace_memory` is set it runs under tracemalloc to
+    find the peak Python memory of one run; tracing slows allocation-heavy code down several times, so it
+    is kept out of the timed runs.
+
+    Parameters:
+    operation (callable): Performs one run and returns the number of rows it read or wrote.
+    runs (int): Number of timed runs.
+    trace_memory (bool): Measure the peak memory in the warm-up run.
+
+    Returns:
+    dict: p50_ms, p95_ms, p99_ms, rows_per_s, peak_mb and runs.
+    """
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            operation()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    else:
+        operation()
+
+    timings = []
+    total_rows = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        total_rows += operation()
+        timings.append(time.perf_counter() - start)
+
+    timings_ms = sorted(timing * 1000 for timing in timings)
+    if len(timings_ms) > 1:
+        cut_points = statistics.quantiles(timings_ms, n=100, method="inclusive")
+        p50, p95, p99 = cut_points[49], cut_points[94], cut_points[98]
+    else:
+        p50 = p95 = p99 = timings_ms[0]
+    return {"runs": runs, "p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3),
+            "rows_per_s": round(total_rows / sum(timings)) if sum(timings) else 0,
+            "peak_mb": round(peak / 2 ** 20, 2) if peak is not None else None}
+
+
+def run_suite(db, row_count, runs, export_runs, tmp_dir, trace_memory=True, seed=11):
+    """Runs every operation on a filled stand-in and returns operation name -> measure() result."""
+    rng = random.Random(seed)
+    results = {}
+
+    def search():
+        query, params = build_filter_query(search_filters(rng), inward_select_columns)
+        return len(db.execute(query, params).fetchall())
+    results["search"] = measure(search, runs, trace_memory)
+
+    def export():
+        cursor = db.execute(build_filter_query([], inward_select_columns)[0])
+        return stream_cursor_to_xlsx(cursor, os.path.join(tmp_dir, "register.xlsx"), inward_select_columns,
+                                     [column_types[column] for column in inward_select_columns],
+                                     register_column_widths(len(inward_select_columns)))
+    results["export"] = measure(export, export_runs, trace_memory)
+
+    insert_query = db.insert_query()
+    new_rows = generate_rows(runs + 1, seed=seed)
+
+    def insert():
+        db.execute(insert_query, next(new_rows))
+        db.connection.commit()
+        return 1
+    results["insert"] = measure(insert, runs, trace_memory)
+
+    def edit():
+        db.execute("UPDATE inward_logistic SET Qty = %s, Remark = %s WHERE id = %s",
+                   (rng.randrange(1, 500), "Edited", rng.randrange(1, row_count + 1)))
+        db.connection.commit()
+        return 1
+    results["edit"] = measure(edit, runs, trace_memory)
+
+    def last_entries():
+        return len(db.execute("SELECT * FROM inward_logistic WHERE id > %s ORDER BY id DESC LIMIT 5",
+                              (0,)).fetchall())
+    results["last"] = measure(last_entries, runs, trace_memory)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints the p95 change against the baseline per operation; returns True if any regressed too much."""
+    failed = False
+    for operation, result in results.items():
+        previous = baseline.get(operation)
+        if not previous or not previous["p95_ms"]:
+            continue
+        change = result["p95_ms"] / previous["p95_ms"] - 1
+        regressed = change > tolerance
+        failed |= regressed
+        print(f"  {operation:<8} p95 {previous['p95_ms']:9.2f} -> {result['p95_ms']:9.2f} ms  ({change:+.0%})"
+              f"{'  FAIL' if regressed else ''}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000],
+                        help="register sizes to benchmark (1000 to 1000000)")
+    parser.add_argument("--runs", type=int, default=200, help="runs per operation (except export)")
+    parser.add_argument("--export-runs", type=int, default=3, help="runs of the full register export")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed p95 slowdown against the baseline, as a fraction (default 0.25)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced warm-up run that measures peak memory (saves time at 1M rows)")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as file:
+            baseline = json.load(file)
+
+    failed = False
+    for row_count in args.rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = StandIn(os.path.join(tmp_dir, "logistic.db"))
+            fill_seconds = db.fill(row_count)
+            print(f"\n{row_count} rows generated in {fill_seconds:.1f} s ({row_count / fill_seconds:.0f} rows/s)")
+            results = run_suite(db, row_count, args.runs, args.export_runs, tmp_dir,
+                                trace_memory=not args.no_memory)
+            db.close()
+
+        print(f"  {'':<8} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rows/s':>10} {'peak MB':>8}")
+        for operation, result in results.items():
+            peak = f"{result['peak_mb']:.2f}" if result['peak_mb'] is not None else "-"
+            print(f"  {operation:<8} {result['runs']:>5} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                  f"{result['p99_ms']:>9.2f} {result['rows_per_s']:>10} {peak:>8}")
+
+        if args.save_baseline:
+            baseline[str(row_count)] = results
+        elif str(row_count) in baseline:
+            print(f"  Against the baseline (tolerance {args.tolerance:.0%}):")
+            failed |= compare(results, baseline[str(row_count)], args.tolerance)
+        else:
+            print("  No baseline stored for this size; run with --save-baseline to create one")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as file:
+            json.dump(baseline, file, indent=2)
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark of the search-result Excel export: the previous pandas + openpyxl per-cell styling
+against the single-pass StyledSheetWriter in src/export.py.
+
+Usage (from the repository root):
+    python benchmarks/bench_search_export.py --rows 5000 --repeat 3
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from export import StyledSheetWriter, SEARCH_CELL_STYLE, SEARCH_HEADER_STYLE, SEARCH_WRAP_THRESHOLD
+
+# Same column order and SQL types as inward_logistic (id + database_columns in header.py)
+COLUMNS = [
+    ("id", "INT"), ("Inward_No", "INT"), ("Return_Type", "VARCHAR(255)"), ("Benefit_Type", "VARCHAR(255)"),
+    ("Date", "DATE"), ("Time", "TIME"), ("Gate_Entry_No", "VARCHAR(255)"), ("Invoice_No", "VARCHAR(255)"),
+    ("PO_No", "VARCHAR(255)"), ("BOE_No", "VARCHAR(255)"), ("Return_Date", "DATE"), ("Return_Time", "TIME"),
+    ("Supplier", "VARCHAR(255)"), ("Material", "VARCHAR(255)"), ("Qty", "INT"), ("Department", "VARCHAR(255)"),
+    ("Project", "VARCHAR(255)"), ("TPL_Name", "VARCHAR(255)"), ("Vehicle", "VARCHAR(255)"),
+    ("Received", "VARCHAR(255)"), ("Authorized", "VARCHAR(255)"), ("Security", "VARCHAR(255)"),
+    ("Remark", "TEXT"), ("TPL_Remarks", "TEXT"),
+]
+
+
+def synthetic_rows(count, seed=7):
+    """Builds rows shaped like a cursor result of the search query."""
+    rng = random.Random(seed)
+    rows = []
+    for row_id in range(1, count + 1):
+        day = date(2024, 1, 1) + timedelta(days=rng.randrange(365))
+        rows.append((
+            row_id, row_id, rng.choice(["Non-Returnable", "Returnable"]), rng.choice(["Non-Benefit", "Benefit"]),
+            day, timedelta(seconds=rng.randrange(86400)), f"GE{row_id:06d}", f"INV/{rng.randrange(10 ** 6)}",
+            f"PO{rng.randrange(10 ** 5)}", "", day, timedelta(0), f"Supplier {rng.randrange(200)}",
+            "Material description " * rng.randrange(1, 5), rng.randrange(1, 500), "Stores",
+            f"Project {rng.randrange(40)}", "TPL", f"MH12 AB {rng.randrange(9999)}", "Receiver", "Manager",
+            "Guard", "Remark text " * rng.randrange(0, 8), "",
+        ))
+    return rows
+
+
+def legacy_export(rows, path):
+    """The export as SearchWindow.search_data did it before: to_excel, reload, style every cell, save."""
+    import pandas as pd
+    from openpyxl import load_workbook
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from openpyxl.utils import get_column_letter
+
+    df = pd.DataFrame(rows, columns=[name for name, _ in COLUMNS])
+    df.to_excel(path, index=False)
+    wb = load_workbook(path)
+    ws = wb.active
+    header_fill = PatternFill(start_color="D9FFFF", end_color="D9FFFF", fill_type="solid")
+    header_font = Font(name="Bookman Old Style", size=11, bold=True)
+    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    for col_num, col_name in enumerate(df.columns, start=1):
+        col_letter = get_column_letter(col_num)
+        cell = ws[f"{col_letter}1"]
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        ws.column_dimensions[col_letter].width = len(col_name) + 5
+    for col_num, col_cells in enumerate(ws.columns, start=1):
+        max_length = max((len(str(cell.value or "")) for cell in col_cells[1:]), default=0)
+        col_letter = get_column_letter(col_num)
+        for cell in col_cells[1:]:
+            cell.font = Font(name="Bookman Old Style", size=11)
+            cell.alignment = Alignment(vertical="center", wrap_text=len(str(cell.value or "")) > 50)
+        ws.column_dimensions[col_letter].width = min(max(max_length + 5, ws.column_dimensions[col_letter].width), 50)
+    wb.save(path)
+
+
+def styled_export(rows, path):
+    """The single-pass export used by SearchWindow.search_data now."""
+    with StyledSheetWriter(path, [name for name, _ in COLUMNS], [column_type for _, column_type in COLUMNS],
+                           SEARCH_CELL_STYLE, SEARCH_HEADER_STYLE, wrap_threshold=SEARCH_WRAP_THRESHOLD) as writer:
+        writer.write_rows(rows)
+
+
+def best_of(function, rows, path, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(rows, path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000, help="number of result rows to export")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = best_of(legacy_export, rows, os.path.join(tmp, "legacy.xlsx"), args.repeat)
+        styled = best_of(styled_export, rows, os.path.join(tmp, "styled.xlsx"), args.repeat)
+
+    print(f"rows: {args.rows}")
+    print(f"legacy pandas + openpyxl : {legacy:8.3f} s  ({args.rows / legacy:10.0f} rows/s)")
+    print(f"StyledSheetWriter        : {styled:8.3f} s  ({args.rows / styled:10.0f} rows/s)")
+    print(f"speed-up                 : {legacy / styled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Cold-start benchmark: how long the application's modules take to import before the login window can show.
+
+Every run imports the modules main.py imports (search, settings, entry, edit) in a fresh interpreter with
+`-X importtime` and reports the slowest modules. The check fails (exit code 1) when
+
+- one of the heavy, lazily imported modules (pandas, openpyxl, PIL, ...) is imported at startup again, or
+- the median import time exceeds the stored baseline by more than the tolerance, or
+- no baseline has been stored yet (create it with --save-baseline on the machine that runs the check).
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --save-baseline      # after an intended change
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+
+# What main.py imports before it creates the root window
+STARTUP_MODULES = ["search", "settings", "entry", "edit"]
+
+# Modules that header.py defers until first use; importing any of them at startup is a regression
+DEFERRED_MODULES = ["pandas", "openpyxl", "xlsxwriter", "docx", "pyautogui", "PIL.Image", "PIL.ImageTk",
+                    "tkcalendar", "cryptography"]
+
+
+def parse_importtime(stderr):
+    """
+    Parses `-X importtime` output.
+
+    Returns:
+    list: (module, self_us, cumulative_us, depth) tuples in the order the imports finished.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented by two spaces per level after the separator's own space
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def measure(modules):
+    """Imports `modules` in a fresh interpreter and returns the parsed importtime entries."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+                            cwd=SRC_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(f"Importing {', '.join(modules)} failed: {last_line}")
+    return parse_importtime(result.stderr)
+
+
+def total_ms(entries):
+    """Total import time: the cumulative time of the top-level imports."""
+    return sum(cumulative for _, _, cumulative, depth in entries if depth == 0) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters to measure (median is used)")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest modules to list")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, as a fraction (default 0.25)")
+    parser.add_argument("--modules", nargs="+", default=STARTUP_MODULES, help="modules to import")
+    parser.add_argument("--save-baseline", action="store_true", help="store the measured time as the new baseline")
+    args = parser.parse_args()
+
+    # The first run also warms the OS file cache, so it is not counted
+    measure(args.modules)
+    runs = [measure(args.modules) for _ in range(args.repeat)]
+    times = [total_ms(entries) for entries in runs]
+    median_ms = statistics.median(times)
+
+    print(f"Import time of {', '.join(args.modules)}: median {median_ms:.1f} ms "
+          f"(min {min(times):.1f}, max {max(times):.1f}, {args.repeat} runs)")
+    print("\nSlowest modules (self time of the median run):")
+    median_run = runs[times.index(sorted(times)[len(times) // 2])]
+    for name, self_us, cumulative_us, _ in sorted(median_run, key=lambda entry: -entry[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  (cumulative {cumulative_us / 1000:8.1f} ms)  {name}")
+
+    failed = False
+    imported = {name for name, _, _, _ in median_run}
+    eager = [name for name in DEFERRED_MODULES if name in imported]
+    if eager:
+        print(f"\nFAIL: imported at startup although they should load lazily: {', '.join(eager)}")
+        failed = True
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as file:
+            json.dump({"modules": args.modules, "median_ms": round(median_ms, 1)}, file, indent=2)
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+    elif os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as file:
+            baseline = json.load(file)
+        limit_ms = baseline["median_ms"] * (1 + args.tolerance)
+        print(f"\nBaseline {baseline['median_ms']:.1f} ms, limit {limit_ms:.1f} ms")
+        if median_ms > limit_ms:
+            print(f"FAIL: cold start regressed by {median_ms / baseline['median_ms'] - 1:.0%}")
+            failed = True
+    else:
+        # Without a baseline a regression cannot be detected, so the check must not pass silently
+        print(f"\nFAIL: no baseline at {BASELINE_PATH}; run with --save-baseline on the reference machine first")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import time
+from datetime import date
+
+from config import archive_config
+from storage import db_connection, get_storage
+from instrumentation import timed
+from query_builder import build_filter_query, date_filter_start, inward_select_columns, quote_column
+
+# Table holding the closed years moved out of inward_logistic, partitioned by year
+ARCHIVE_TABLE = "inward_logistic_archive"
+
+# Partition that receives years no partition has been split off for yet
+ARCHIVE_FUTURE_PARTITION = "p_future"
+
+
+def read_archived_through_year(cursor):
+    """Returns the latest year moved to the archive, or None if nothing has been archived yet."""
+    cursor.execute("SELECT archived_through_year FROM inward_archive_state WHERE id = 1")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def archivable_years():
+    """
+    Returns the closed years from the oldest row of inward_logistic up to last year, oldest first.
+
+    Only MIN(Date) is read, which the idx_date index answers without scanning the table.
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(Date) FROM inward_logistic")
+        oldest = cursor.fetchone()[0]
+        cursor.close()
+    if oldest is None:
+        return []
+    # The server returns a date; SQLite returns the text of a computed date, which starts with the year too
+    return list(range(int(str(oldest)[:4]), date.today().year))
+
+
+def ensure_archive_partition(cursor, year):
+    """
+    Splits a partition for `year` off p_future, unless a partition already covers the year.
+
+    p_future never holds rows because every year gets its partition before its rows are moved, so the
+    split only changes the table definition and is quick. Backends without partitions skip this.
+    """
+    if not get_storage().supports_partitions:
+        return
+    cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM INFORMATION_SCHEMA.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (ARCHIVE_TABLE,))
+    bounds = [int(description) for name, description in cursor.fetchall() if name != ARCHIVE_FUTURE_PARTITION]
+    if any(year < bound for bound in bounds):
+        return
+    cursor.execute(f"ALTER TABLE {ARCHIVE_TABLE} REORGANIZE PARTITION {ARCHIVE_FUTURE_PARTITION} INTO ("
+                   f"PARTITION p{year} VALUES LESS THAN ({year + 1}), "
+                   f"PARTITION {ARCHIVE_FUTURE_PARTITION} VALUES LESS THAN MAXVALUE)")
+
+
+def archive_years(through_year, progress=None, chunk_size=None, pause=None):
+    """
+    Moves every row dated before the end of `through_year` from inward_logistic to the archive.
+
+    Years are moved oldest first, `chunk_size` rows per transaction: the rows are locked by id, copied and
+    deleted, and the transaction commits before the next chunk, so no lock is held for longer than one small
+    chunk and the gates keep saving. Ids and values are kept as they are, and the daily summary is not
+    affected. An interrupted run can simply be started again.
+
+    Parameters:
+    through_year (int): The last year to archive; it must be closed (before the current year).
+    progress (callable): Called as progress(year, moved_rows, year_rows) after each chunk.
+    chunk_size (int): Rows per transaction, default archive_config['chunk_size'].
+    pause (float): Seconds between two chunks, default archive_config['pause'].
+
+    Returns:
+    int: The number of rows moved.
+
+    Raises:
+    ValueError: If `through_year` is not closed yet.
+    """
+    chunk_size = chunk_size or archive_config['chunk_size']
+    pause = archive_config['pause'] if pause is None else pause
+    if through_year >= date.today().year:
+        raise ValueError(f"{through_year} is not closed yet")
+
+    storage = get_storage()
+    columns = ", ".join(quote_column(column) for column in inward_select_columns)
+    years = [year for year in archivable_years() if year <= through_year]
+    total_moved = 0
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        for year in years:
+            year_range = (f"{year}-01-01", f"{year + 1}-01-01")
+            cursor.execute("SELECT COUNT(*) FROM inward_logistic WHERE Date >= %s AND Date < %s", year_range)
+            year_rows = cursor.fetchone()[0]
+            if year_rows:
+                ensure_archive_partition(cursor, year)
+
+            moved = 0
+            while True:
+                with timed("archive.chunk", year=year) as timing:
+                    conn.start_transaction()
+                    cursor.execute("SELECT id FROM inward_logistic WHERE Date >= %s AND Date < %s "
+                                   f"ORDER BY id LIMIT {int(chunk_size)}{storage.lock_update_clause}", year_range)
+                    ids = [row[0] for row in cursor.fetchall()]
+                    if ids:
+                        id_list = ", ".join(["%s"] * len(ids))
+                        cursor.execute(f"INSERT INTO {ARCHIVE_TABLE} ({columns}) "
+                                       f"SELECT {columns} FROM inward_logistic WHERE id IN ({id_list})", ids)
+                        cursor.execute(f"DELETE FROM inward_logistic WHERE id IN ({id_list})", ids)
+                    conn.commit()
+                    timing.rows = len(ids)
+                if not ids:
+                    break
+
+                moved += len(ids)
+                if progress:
+                    progress(year, moved, year_rows)
+                time.sleep(pause)
+
+            # Searches skip the archive when their date filter starts after this year
+            upsert = storage.upsert_clause("inward_archive_state", ["id"], {
+                "archived_through_year": "GREATEST(COALESCE(inward_archive_state.archived_through_year, 0), %s)"})
+            cursor.execute(f"INSERT INTO inward_archive_state (id, archived_through_year) VALUES (1, %s) {upsert}",
+                           (year, year))
+            total_moved += moved
+        cursor.close()
+    return total_moved
+
+
+def build_search_query(cursor, filters, select_columns, fulltext_columns=(), include_archive=False):
+    """
+    Compiles the filter rows into a query on inward_logistic and, if asked for, the archive.
+
+    The archive is only added when the date filter (if any) can match an archived year; within the archive,
+    MySQL reads only the partitions of the years the date range covers.
+
+    Parameters:
+    cursor: Cursor used to read the archived year range.
+    filters (list): (column, operator, value) tuples as used by build_filter_query().
+    select_columns (list): Columns to select.
+    fulltext_columns (set): Columns of inward_logistic whose "Contains Word" filter may use MATCH ... AGAINST.
+    include_archive (bool): Also search the archive of closed years.
+
+    Returns:
+    tuple: (sql, params, whether the archive is part of the query)
+    """
+    query, params = build_filter_query(filters, select_columns, fulltext_columns=fulltext_columns)
+    if not include_archive:
+        return query, params, False
+
+    archived_through_year = read_archived_through_year(cursor)
+    start = date_filter_start(filters)
+    if archived_through_year is None or (start is not None and int(start[:4]) > archived_through_year):
+        return query, params, False
+
+    # The archive has no FULLTEXT indexes, so its "Contains Word" filters use LIKE
+    archive_query, archive_params = build_filter_query(filters, select_columns, table=ARCHIVE_TABLE)
+    return f"{query} UNION ALL {archive_query}", params + archive_params, True
@@ -0,0 +1,167 @@
+from tkinter import TclError
+
+from config import change_feed_config
+from storage import db_connection
+from query_builder import inward_select_columns, quote_column
+from task_runner import get_task_executor
+from instrumentation import timed, log_warning
+
+# Most rows delivered by one poll; a full batch is followed by another poll right away
+CHANGE_FEED_BATCH_SIZE = 500
+
+# How far below the highest id seen a gap is still looked for. The gates save in transactions, so an id
+# handed out earlier can commit after a higher one was already delivered; a batch save takes up to a few
+# hundred ids at once (see entry_queue_config['batch_size']). Ids of rolled back saves never show up.
+CHANGE_FEED_RESCAN_IDS = 500
+
+
+class ChangeFeed:
+    """
+    Polls inward_logistic for rows entered at any gate and pushes them into the open windows.
+
+    Every poll asks for the ids above `last_seen` and for the gaps: ids below it that were skipped because
+    their transaction had not committed yet. That is a seek on the primary key plus, usually, no gaps at all,
+    and it returns nothing while the table is idle. A gap is given up once it lies more than
+    CHANGE_FEED_RESCAN_IDS ids behind `last_seen`, so a row committing that late is not delivered. The interval
+    starts at `poll_interval` seconds and grows by `backoff` after every empty poll up to `max_poll_interval`;
+    as soon as new rows arrive it drops back to `poll_interval`.
+
+    Windows subscribe with a callback that receives the new rows (all inward_select_columns, ascending id)
+    on the Tk thread. A subscription ends when its widget is destroyed, and hidden windows are skipped;
+    they reload their data when they are shown again.
+    """
+
+    def __init__(self, root, poll_interval=3, max_poll_interval=30, backoff=1.5):
+        """
+        Parameters:
+        root (tk.Tk): The application root, used to schedule the polls.
+        poll_interval (float): Seconds between polls while rows keep arriving.
+        max_poll_interval (float): Upper bound for the interval while the table is idle.
+        backoff (float): Factor applied to the interval after a poll without new rows.
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+
+        self.interval = poll_interval
+        self.last_seen = None
+        self.gaps = set()  # Ids below last_seen not delivered yet
+        self._subscribers = []
+        self._after_id = None
+        self._running = False
+
+    def subscribe(self, widget, callback):
+        """
+        Registers `callback(rows)` for new rows while `widget`'s window is shown.
+
+        Parameters:
+        widget (tk.Widget): Widget whose lifetime and visibility the subscription follows.
+        callback (callable): Called on the Tk thread with a list of new rows.
+        """
+        self._subscribers.append((widget, callback))
+
+    def start(self):
+        """Starts polling from the current end of the table; rows entered earlier are not delivered."""
+        if self._running:
+            return
+        self._running = True
+        self.interval = self.poll_interval
+        self.last_seen = None
+        self.gaps = set()
+        self._schedule(0)
+
+    def stop(self):
+        """Stops polling, e.g. on logout."""
+        self._running = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self, seconds):
+        self._after_id = self.root.after(int(seconds * 1000), self._poll)
+
+    def _poll(self):
+        """Tk thread: starts one poll on the task executor."""
+        self._after_id = None
+        if not self._running:
+            return
+        last_seen, gaps = self.last_seen, sorted(self.gaps)
+        get_task_executor(self.root).submit(lambda task: self._fetch(last_seen, gaps), on_success=self._deliver,
+                                            on_error=self._failed, busy=False)
+
+    @staticmethod
+    def _fetch(last_seen, gaps):
+        """
+        Worker thread: reads the rows not delivered yet, or only where the table ends on the first poll.
+
+        Parameters:
+        last_seen (int): Highest id delivered so far; None on the first poll.
+        gaps (list): Ids below `last_seen` not delivered yet.
+
+        Returns:
+        tuple: (new last_seen, new gaps, rows to deliver in ascending id order)
+        """
+        with timed("feed.poll") as timing, db_connection() as connection:
+            cursor = connection.cursor()
+            if last_seen is None:
+                # Rows already there are not delivered, but ids missing just below the end may still commit
+                cursor.execute("SELECT id FROM inward_logistic WHERE id > "
+                               "(SELECT COALESCE(MAX(id), 0) FROM inward_logistic) - %s", (CHANGE_FEED_RESCAN_IDS,))
+                ids = [row[0] for row in cursor.fetchall()]
+                rows, high = [], max(ids, default=0)
+                missing = set(range(max(high - CHANGE_FEED_RESCAN_IDS, 0) + 1, high)) - set(ids) if ids else set()
+            else:
+                columns = ", ".join(quote_column(column) for column in inward_select_columns)
+                query = f"SELECT {columns} FROM inward_logistic WHERE `id` > %s"
+                if gaps:
+                    query += f" OR `id` IN ({', '.join(['%s'] * len(gaps))})"
+                cursor.execute(query + f" ORDER BY `id` LIMIT {CHANGE_FEED_BATCH_SIZE}", (last_seen, *gaps))
+                rows = cursor.fetchall()
+                delivered = {row[0] for row in rows}
+                high = max([last_seen] + list(delivered))
+                # Ids skipped between the old end and the new one belong to saves that have not committed yet
+                missing = (set(gaps) | set(range(last_seen + 1, high))) - delivered
+            cursor.close()
+            timing.rows = len(rows)
+        return high, {record_id for record_id in missing if record_id > high - CHANGE_FEED_RESCAN_IDS}, rows
+
+    def _deliver(self, result):
+        """Tk thread: hands new rows to the shown windows and schedules the next poll."""
+        if not self._running:
+            return
+        self.last_seen, self.gaps, rows = result
+
+        if rows:
+            self.interval = self.poll_interval
+            for widget, callback in list(self._subscribers):
+                try:
+                    if not widget.winfo_exists():
+                        self._subscribers.remove((widget, callback))
+                    elif widget.winfo_toplevel().winfo_ismapped():
+                        callback(rows)
+                except TclError:
+                    self._subscribers.remove((widget, callback))
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_poll_interval)
+
+        # A full batch means more rows are waiting
+        self._schedule(0 if len(rows) == CHANGE_FEED_BATCH_SIZE else self.interval)
+
+    def _failed(self, err):
+        """Tk thread: keeps the feed alive through server outages at the slowest interval."""
+        log_warning("change feed poll failed", error=str(err))
+        self.interval = self.max_poll_interval
+        if self._running:
+            self._schedule(self.interval)
+
+
+_change_feed = None
+
+
+def get_change_feed(widget):
+    """Returns the application's ChangeFeed, creating it on first use for the root of `widget`."""
+    global _change_feed
+    if _change_feed is None:
+        _change_feed = ChangeFeed(widget._root(), **change_feed_config)
+    return _change_feed
@@ -1,17 +1,28 @@
 # Get Display Scaling Factor
 from header import *
-
-user32 = ctypes.windll.user32
-GetDpiForWindow = user32.GetDpiForWindow
-GetDpiForWindow.restype = ctypes.c_int
-GetDpiForWindow.argtypes = [ctypes.c_void_p]
-
-def get_scaling_factor():
-    hwnd = ctypes.windll.user32.GetForegroundWindow()
-    dpi = GetDpiForWindow(hwnd)
-    return dpi / 96.0  # 96 DPI is the base scale
-
-def scaled_value(value):
+from storage import *
+from query_builder import *
+from schema import *
+from export import *
+from result_grid import *
+from task_runner import *
+from instrumentation import *
+from lookup_cache import *
+from image_cache import *
+from window_manager import *
+from change_feed import *
+from summary import *
+from returns_tracker import *
+from archive import *
+from register import *
+from entry_queue import *
+from replica import *
+from scaling import *
+
+# With a widget the factor of its window is used, cached by scaling.py; without one the foreground window's
+def scaled_value(value, widget=None):
+    if widget is not None:
+        return get_display_scaling().scaled(value, widget)
     return int(value * get_scaling_factor())
 
 def is_valid_numeric_input(input_str):
@@ -22,7 +33,6 @@ def is_valid_numeric_input(input_str):
         return False
 
 def donothing(event=None):
-    print("Button is disabled")
     pass
 
 
@@ -30,34 +40,16 @@ def get_project_names():
     """
     Retrieves a list of project names from the 'projects' table in the database.
 
+    The list is served from the lookup cache and only read from the server again after the TTL
+    expires or a project is added/renamed in the Settings window.
+
     Returns:
     list: A list of project names.
     """
 
-    # Define the database connection details
-    db_config = serverdb_config
-
     try:
-        # Create a connection to the MySQL database
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-
-        # Use the existing logistic database
-        cursor.execute("USE logistic")
-
-        # Query to select all project names from the 'projects' table
-        query = "SELECT project_name FROM projects"
-        cursor.execute(query)
-
-        # Fetch all project names from the query result
-        projects = [row[0] for row in cursor.fetchall()]
-
-        # Close the cursor and connection objects
-        cursor.close()
-        conn.close()
-
-        return projects
-    except mysql.connector.Error as err:
+        return cached_project_names()
+    except get_storage().Error as err:
         # Show an error messagebox if the connection to the server fails
         root = tk.Tk()
         root.withdraw()  # Hides the root window
@@ -66,13 +58,29 @@ def get_project_names():
         if response:
             root.destroy()
             sys.exit(1)  # Exit the application with a non-zero status code
-        print(f"Error: {err}")
+        log_warning("database connection failed", error=str(err))
         return []
 
 
-from cryptography.fernet import Fernet
-import pandas as pd
-import os
+def attach_autocomplete(combobox, values):
+    """
+    Offers `values` in a combobox and narrows the drop-down list to the matching ones while the user types.
+
+    Parameters:
+    combobox (ttk.Combobox): The editable combobox to fill.
+    values (list): All known values, e.g. from cached_distinct_values().
+    """
+    combobox.configure(values=values)
+
+    def filter_values(event):
+        typed = combobox.get().strip().lower()
+        combobox.configure(values=[value for value in values if typed in value.lower()] if typed else values)
+
+    combobox.bind("<KeyRelease>", filter_values)
+
+
+# Only needed by the file encryption helpers below, so it is loaded on first use
+Fernet = lazy_attribute("cryptography.fernet", "Fernet")
 
 
 # Generate a key and save it securely (Do this only once)
@@ -0,0 +1,169 @@
+# Column definitions and settings shared by the Tk windows and the core modules (query building, schema,
+# export, summary, archive). This module imports nothing, so the core can be used without a display,
+# e.g. to benchmark or load-test it on a Linux box; header.py re-exports everything for the windows.
+
+database_columns = ("Inward No", "Return Type", "Benefit Type", "Date", "Time", "Gate Entry No",
+                   "Invoice No", "PO No", "BOE No", "Return Date", "Return Time","Supplier", "Material", "Qty", "Department",
+                   "Project", "TPL Name","Vehicle", "Received", "Authorized", "Security", "Remark", "TPL Remarks")
+
+database_fields = [
+            "Inward No", "Return Type", "Benefit Type", "Date", "Time", "Gate Entry No", "Invoice No *", "PO No",
+            "BOE No", "Return Date", "Return Time","Name of the Supplier", "Material Description", "Quantity *", "Department", "Project_Name", "TPL_Name","Vehicle No",
+            "Received Name", "Authorized Sign", "Security Sign", "Remark","TPL Remarks"
+        ]
+
+database_fields_load = [
+            "S.No","Inward No", "Return Type", "Benefit Type", "Date", "Time", "Gate Entry No", "Invoice No", "PO No",
+            "BOE No", "Return Date", "Return Time","Name of the Supplier", "Material Description", "Qty", "Department", "Project_Name", "TPL_Name","Vehicle No",
+            "Received Name", "Authorized Sign", "Security Sign", "Remark","TPL Remarks"
+        ]
+database_columns = [
+    "Inward_No INT",
+    "Return_Type VARCHAR(255)",
+    "Benefit_Type VARCHAR(255)",
+    "Date DATE",
+    "Time TIME",
+    "Gate_Entry_No VARCHAR(255)",
+    "Invoice_No VARCHAR(255)",
+    "PO_No VARCHAR(255)",
+    "BOE_No VARCHAR(255)",
+    "Return_Date DATE",
+    "Return_Time TIME",
+    "Supplier VARCHAR(255)",
+    "Material VARCHAR(255)",
+    "Qty INT",
+    "Department VARCHAR(255)",
+    "Project VARCHAR(255)",
+    "TPL_Name VARCHAR(255)",
+    "Vehicle VARCHAR(255)",
+    "Received VARCHAR(255)",
+    "Authorized VARCHAR(255)",
+    "Security VARCHAR(255)",
+    "Remark TEXT",
+    "TPL_Remarks TEXT"
+]
+
+column_names = [
+    "Inward_No",
+    "Return_Type",
+    "Benefit_Type",
+    "Date",
+    "Time",
+    "Gate_Entry_No",
+    "Invoice_No",
+    "PO_No",
+    "BOE_No",
+    "Return_Date",
+    "Return_Time",
+    "Supplier",
+    "Material",
+    "Qty",
+    "Department",
+    "Project",
+    "TPL_Name",
+    "Vehicle",
+    "Received",
+    "Authorized",
+    "Security",
+    "Remark",
+    "TPL_Remarks"
+]
+
+serverdb_config = {
+    'user': 'forvia',
+    'password': 'password@123',
+    'host': '10.170.140.103',
+    'port': 3306,
+    'database': 'logistic'
+}
+
+# Database the application stores its tables in (see storage.py)
+# backend: 'mysql' for the plant server in serverdb_config, 'sqlite' for a local database file with the same
+#          tables and indexes, e.g. for CI, load tests or a gate PC without a connection to the server
+# sqlite_path: file of the SQLite database; None puts it into the application's data directory
+# sqlite_busy_timeout: seconds a SQLite writer waits for another writer to finish before failing
+storage_config = {
+    'backend': 'mysql',
+    'sqlite_path': None,
+    'sqlite_busy_timeout': 10
+}
+
+# Settings for the shared connection pool (see db_pool.py)
+# pool_size: maximum number of open connections to the server
+# acquire_timeout: seconds to wait for a free connection before failing
+# health_check_interval: idle seconds after which a connection is pinged before reuse
+db_pool_config = {
+    'pool_size': 4,
+    'acquire_timeout': 10,
+    'health_check_interval': 30
+}
+
+# Settings for the live feed of new inward entries (see change_feed.py)
+# poll_interval: seconds between two polls while new rows keep arriving
+# max_poll_interval: upper bound for the interval when the table is idle
+# backoff: factor by which the interval grows after every poll without new rows
+change_feed_config = {
+    'poll_interval': 3,
+    'max_poll_interval': 30,
+    'backoff': 1.5
+}
+
+# Settings for the local queue of gate entries and its sync to the database (see entry_queue.py)
+# sync_interval: seconds between two attempts to send queued entries while the database is reachable
+# max_sync_interval: upper bound for the interval while the database cannot be reached
+# backoff: factor by which the interval grows after every failed attempt
+# batch_size: queued entries sent per transaction
+entry_queue_config = {
+    'sync_interval': 2,
+    'max_sync_interval': 120,
+    'backoff': 2,
+    'batch_size': 200
+}
+
+# Settings for the local read replica of the register (see replica.py)
+# enabled: keep a copy of inward_logistic on this PC and answer the Search and Edit windows from it
+# path: file of the copy; None puts replica.sqlite3 into the application's data directory
+# sync_interval: seconds between two syncs with the server
+# batch_size: records copied per transaction while the copy is seeded or catching up
+# overlap: seconds by which the edit window of a sync reaches back before the previous one, so edits whose
+#          transaction committed after that sync had started are still picked up
+replica_config = {
+    'enabled': False,
+    'path': None,
+    'sync_interval': 30,
+    'batch_size': 5000,
+    'overlap': 300
+}
+
+# Settings for the tracker of returnable material due back (see returns_tracker.py)
+# due_soon_days: items whose return date is at most this many days ahead are listed as due soon
+# scan_interval: seconds between two checks whether the date moved on and new return dates came into range
+# full_scan_interval: seconds between two complete re-reads, which pick up edits made at the other gates
+return_tracker_config = {
+    'due_soon_days': 3,
+    'scan_interval': 60,
+    'full_scan_interval': 900
+}
+
+# Settings for moving closed years to inward_logistic_archive (see archive.py)
+# chunk_size: rows moved per transaction; small chunks keep the row locks short so the gates can keep saving
+# pause: seconds to wait between two chunks
+archive_config = {
+    'chunk_size': 1000,
+    'pause': 0.05
+}
+
+# Settings for the timing instrumentation and its log file (see instrumentation.py)
+# slow_ms: operations taking at least this many milliseconds are logged as slow
+# log_level: 'WARNING' writes only slow and failed operations, 'INFO' every timed operation,
+#            'DEBUG' additionally the executed queries
+# max_bytes: size at which the log file is rotated
+# backup_count: number of rotated log files kept
+# sample_size: latest timings kept per operation for the p50/p95 figures shown in Settings
+instrumentation_config = {
+    'slow_ms': 500,
+    'log_level': 'WARNING',
+    'max_bytes': 2 * 1024 * 1024,
+    'backup_count': 5,
+    'sample_size': 500
+}
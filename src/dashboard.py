@@ -0,0 +1,176 @@
+from common_utils import *
+
+import calendar
+from datetime import date
+
+# Months offered in the month drop-down, counting back from the current one
+DASHBOARD_MONTHS = 24
+
+
+class DashboardWindow(ReusableWindow):
+    def __init__(self, master):
+        """
+        Initializes the dashboard showing inward entries and quantities per project, supplier, department,
+        benefit type or day for one month.
+
+        Everything is read from the inward_daily_summary table (see summary.py), which holds one row per day
+        and key combination, so a month is a few hundred rows no matter how large the register is.
+
+        :param master: The parent Tkinter window.
+        """
+        self.master = master
+        self.dashboard_window = None
+        self.month_var = None
+        self.dimension_var = None
+        self.status_label = None
+        self.tree = None
+        self.rebuild_button = None
+        self.create_dashboard_window()
+
+    @property
+    def toplevel(self):
+        return self.dashboard_window
+
+    def reset_window(self):
+        """Shows the current month grouped by project again."""
+        self.month_var.set(date.today().strftime("%Y-%m"))
+        self.dimension_var.set("Project")
+        self.load_summary()
+
+    def create_dashboard_window(self):
+        """Creates the dashboard window with the month and grouping selection, the totals and the table."""
+        self.dashboard_window = tk.Toplevel(self.master)
+        width, height = pyautogui.size()
+        self.dashboard_window.title("Dashboard")
+        self.dashboard_window.geometry(f'600x450+{int(width / 3.2)}+{int(height / 4)}')
+        self.dashboard_window.configure(background='wheat')
+        self.dashboard_window.resizable(width=False, height=False)
+
+        # Closing only hides the window; it is reused the next time Dashboard is clicked
+        self.dashboard_window.protocol("WM_DELETE_WINDOW", self.hide_window)
+        self.dashboard_window.bind("<Escape>", self.hide_window)
+
+        heading = tk.Label(self.dashboard_window, text="Dashboard", font=('ariel narrow', 15, 'bold'), bg='wheat')
+        heading.pack()
+
+        # Month and grouping; changing either reloads the table
+        selection_frame = tk.Frame(self.dashboard_window, bd=4, relief='ridge', bg='wheat')
+        selection_frame.pack(padx=10, pady=10, fill=tk.X)
+
+        today = date.today()
+        months = []
+        for offset in range(DASHBOARD_MONTHS):
+            year, month = divmod(today.year * 12 + today.month - 1 - offset, 12)
+            months.append(f"{year}-{month + 1:02d}")
+
+        tk.Label(selection_frame, text="Month", font=('ariel narrow', 10), bg='wheat').pack(side=tk.LEFT, padx=5)
+        self.month_var = tk.StringVar(value=months[0])
+        month_option = ttk.Combobox(selection_frame, textvariable=self.month_var, values=months, width=10,
+                                    state='readonly')
+        month_option.pack(side=tk.LEFT, padx=5)
+        month_option.bind("<<ComboboxSelected>>", lambda event: self.load_summary())
+
+        tk.Label(selection_frame, text="Group by", font=('ariel narrow', 10), bg='wheat').pack(side=tk.LEFT, padx=5)
+        self.dimension_var = tk.StringVar(value="Project")
+        dimension_option = ttk.Combobox(selection_frame, textvariable=self.dimension_var,
+                                        values=list(SUMMARY_DIMENSIONS), width=14, state='readonly')
+        dimension_option.pack(side=tk.LEFT, padx=5)
+        dimension_option.bind("<<ComboboxSelected>>", lambda event: self.load_summary())
+
+        # Buttons: rebuild the summary from the register, close
+        button_frame = tk.Frame(self.dashboard_window, bd=4, relief='ridge', bg='wheat')
+        button_frame.pack(pady=5)
+        self.rebuild_button = tk.Button(button_frame, text="Rebuild", command=lambda: self.build_summary(restart=True),
+                                        font=('ariel narrow', 10), width=10, bg='light cyan')
+        self.rebuild_button.pack(side=tk.LEFT, padx=10, pady=5)
+        close_button = tk.Button(button_frame, text="Close", command=self.hide_window,
+                                 font=('ariel narrow', 10), width=10, bg='light cyan')
+        close_button.pack(side=tk.LEFT, padx=10, pady=5)
+
+        self.status_label = tk.Label(self.dashboard_window, text="", font=('ariel narrow', 12, 'bold'),
+                                     bg='wheat', fg='green', width=50)
+        self.status_label.pack(pady=5)
+
+        # Table: one row per value of the chosen grouping
+        table_frame = tk.Frame(self.dashboard_window, bg='wheat')
+        table_frame.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(table_frame, columns=("value", "entries", "quantity"), show="headings", height=12)
+        self.tree.heading("value", text="Project", anchor="center")
+        self.tree.heading("entries", text="Entries", anchor="center")
+        self.tree.heading("quantity", text="Quantity", anchor="center")
+        self.tree.column("value", width=300, anchor="w")
+        self.tree.column("entries", width=100, anchor="center")
+        self.tree.column("quantity", width=120, anchor="center")
+        v_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=v_scroll.set)
+        v_scroll.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.dashboard_window.focus()
+        self.load_summary()
+
+    def selected_range(self):
+        """Returns the first and last day of the selected month."""
+        year, month = (int(part) for part in self.month_var.get().split("-"))
+        return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+    def load_summary(self):
+        """Reads the selected month from the daily summary in the background and shows it."""
+        start_date, end_date = self.selected_range()
+        dimension = self.dimension_var.get()
+
+        def fetch(task):
+            with timed("dashboard.summary", dimension=dimension) as timing:
+                rows, state = fetch_summary(start_date, end_date, dimension)
+                timing.rows = len(rows)
+            return rows, state, timing.elapsed_ms
+
+        def show(result):
+            rows, (_, complete), elapsed_ms = result
+            if not complete:
+                # Never built, or a build was interrupted: count the register first
+                self.build_summary()
+                return
+            self.tree.delete(*self.tree.get_children())
+            self.tree.heading("value", text=dimension)
+            for value, entries, quantity in rows:
+                self.tree.insert("", "end", values=(value if value != "" else "(none)", entries, quantity))
+            total_entries = sum(entries for _, entries, _ in rows)
+            total_quantity = sum(quantity for _, _, quantity in rows)
+            self.status_label.config(text=f"{total_entries} entries, quantity {total_quantity} "
+                                          f"({elapsed_ms:.0f} ms)", fg="green")
+
+        def show_error(err):
+            self.status_label.config(text="Failed to load the summary", fg="red")
+            messagebox.showerror("Database Error", f"Error: {err}", parent=self.dashboard_window)
+
+        self.status_label.config(text="Loading...", fg="blue")
+        get_task_executor(self.dashboard_window).submit(fetch, on_success=show, on_error=show_error,
+                                                        owner=self.dashboard_window)
+
+    def build_summary(self, restart=False):
+        """
+        Counts the register into the daily summary in the background, then shows the selected month.
+
+        Parameters:
+        restart (bool): Count everything again instead of resuming an interrupted build.
+        """
+        executor = get_task_executor(self.dashboard_window)
+        if executor.is_busy(self.dashboard_window):
+            return
+        if restart and not messagebox.askyesno("Rebuild Summary",
+                                               "Count the whole register into the summary again?",
+                                               parent=self.dashboard_window):
+            return
+
+        def show_progress(through_id, max_id):
+            self.status_label.config(text=f"Building summary... {through_id * 100 // max_id}%", fg="blue")
+
+        def show_error(err):
+            self.status_label.config(text="Failed to build the summary", fg="red")
+            messagebox.showerror("Database Error", f"Error: {err}", parent=self.dashboard_window)
+
+        self.status_label.config(text="Building summary...", fg="blue")
+        executor.submit(lambda task: build_daily_summary(progress=task.report_progress, restart=restart),
+                        on_success=lambda _: self.load_summary(), on_error=show_error,
+                        on_progress=show_progress, owner=self.dashboard_window)
@@ -0,0 +1,207 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+
+from config import serverdb_config, db_pool_config
+
+# MySQL client error numbers which mean the connection itself is gone and must not be reused
+CONNECTION_LOST_ERRNOS = (2006, 2013, 2055)
+
+
+class DBConnectionPool:
+    """
+    A process-wide pool of MySQL connections shared by every window and helper.
+
+    Connections are created lazily up to `pool_size`. A caller borrows a connection with `acquire()`
+    and hands it back with `release()`; the `db_connection()` context manager below does both.
+    Idle connections are health-checked (ping with reconnect) before reuse once they have been idle
+    longer than `health_check_interval` seconds, so a stale socket after a network blip is
+    transparently replaced instead of failing the user's click.
+
+    Pooled connections run in autocommit mode so that plain SELECTs neither hold a transaction open
+    nor see a stale snapshot when the connection is reused. Writers still call `conn.commit()` as
+    before, and multi-statement work uses `conn.start_transaction()`.
+
+    Attributes:
+    stats (dict): Counters for pool hits (idle connection reused), misses (new connection dialed),
+                  waits (caller had to block for a free connection), reconnects and discarded connections.
+    """
+
+    def __init__(self, db_config, pool_size=4, acquire_timeout=10, health_check_interval=30):
+        """
+        Parameters:
+        db_config (dict): Keyword arguments passed to mysql.connector.connect().
+        pool_size (int): Maximum number of open connections.
+        acquire_timeout (float): Seconds to wait for a free connection before giving up.
+        health_check_interval (float): Idle seconds after which a connection is pinged before reuse.
+        """
+        self.db_config = db_config
+        self.pool_size = pool_size
+        self.acquire_timeout = acquire_timeout
+        self.health_check_interval = health_check_interval
+
+        # LIFO so the most recently used (warmest) connection is handed out first
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self.stats = {"hits": 0, "misses": 0, "waits": 0, "reconnects": 0, "discarded": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _dial(self):
+        """Opens a brand new connection; the caller must already hold a reserved slot."""
+        try:
+            return mysql.connector.connect(autocommit=True, **self.db_config)
+        except mysql.connector.Error:
+            # Give the reserved slot back so a later attempt can retry
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def acquire(self):
+        """
+        Borrows a connection from the pool.
+
+        Returns:
+        MySQLConnection: A live connection. It must be returned with release().
+
+        Raises:
+        mysql.connector.errors.PoolError: If no connection became free within acquire_timeout.
+        mysql.connector.Error: If a new connection could not be opened.
+        """
+        try:
+            conn, last_used = self._idle.get_nowait()
+            self._count("hits")
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.pool_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                self._count("misses")
+                return self._dial()
+
+            # Pool exhausted: block until another caller releases a connection
+            self._count("waits")
+            try:
+                conn, last_used = self._idle.get(timeout=self.acquire_timeout)
+            except queue.Empty:
+                raise mysql.connector.errors.PoolError(
+                    f"No free database connection after {self.acquire_timeout} seconds")
+
+        return self._ensure_alive(conn, last_used)
+
+    def _ensure_alive(self, conn, last_used):
+        """Pings a connection that has been idle too long and replaces it if it cannot be revived."""
+        if time.monotonic() - last_used < self.health_check_interval:
+            return conn
+        try:
+            conn.ping(reconnect=True, attempts=1, delay=0)
+            return conn
+        except mysql.connector.Error:
+            self._count("reconnects")
+            self._close_quietly(conn)
+            # The slot stays reserved for the replacement connection
+            return self._dial()
+
+    def release(self, conn, discard=False):
+        """
+        Returns a borrowed connection to the pool.
+
+        Parameters:
+        conn (MySQLConnection): The connection obtained from acquire().
+        discard (bool): Close the connection instead of reusing it (e.g. after a lost-connection error).
+        """
+        if not discard:
+            try:
+                if conn.unread_result:
+                    # A half-read result set would poison the next borrower
+                    discard = True
+                elif conn.in_transaction:
+                    # Never hand out a connection with someone else's uncommitted work
+                    conn.rollback()
+            except mysql.connector.Error:
+                discard = True
+
+        if discard:
+            self._count("discarded")
+            self._close_quietly(conn)
+            with self._lock:
+                self._created -= 1
+        else:
+            self._idle.put((conn, time.monotonic()))
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def get_stats(self):
+        """
+        Returns a snapshot of the pool counters together with the current pool occupancy.
+
+        Returns:
+        dict: hits, misses, waits, reconnects, discarded, open and idle connection counts.
+        """
+        with self._lock:
+            snapshot = dict(self.stats)
+            snapshot["open"] = self._created
+        snapshot["idle"] = self._idle.qsize()
+        return snapshot
+
+    def close_all(self):
+        """Closes every idle connection, e.g. when the application exits."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(conn)
+            with self._lock:
+                self._created -= 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Returns the process-wide connection pool, creating it on first use from serverdb_config."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DBConnectionPool(serverdb_config, **db_pool_config)
+    return _pool
+
+
+@contextmanager
+def db_connection():
+    """
+    Borrows a pooled connection for the duration of a `with` block.
+
+    Usage:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            ...
+
+    The connection is returned to the pool when the block exits. Uncommitted work is rolled back,
+    and a connection that reported a lost-connection error is discarded instead of being reused.
+    """
+    pool = get_pool()
+    conn = pool.acquire()
+    discard = False
+    try:
+        yield conn
+    except mysql.connector.Error as err:
+        discard = getattr(err, "errno", None) in CONNECTION_LOST_ERRNOS
+        raise
+    finally:
+        pool.release(conn, discard=discard)
@@ -1,6 +1,8 @@
 from common_utils import *
 
-class EditWindow:
+class EditWindow(ReusableWindow):
+    modal = True
+
     def __init__(self, master, download_callback):
         """
         Initializes the edit window for filtering and displaying data from an Excel file.
@@ -10,6 +12,8 @@ class EditWindow:
         """
         self.view_edit_window = None
         self.tree = None
+        self.result_grid = None
+        self.record_count = 0
         self.table_frame = None
         self.edit_window = None
         self.button_frame = None
@@ -29,6 +33,25 @@ class EditWindow:
         # Call method to create and display the edit window
         self.create_edit_window()
 
+    @property
+    def toplevel(self):
+        return self.edit_window
+
+    def reset_window(self):
+        """Clears the filter, the results and the status text of the previous visit."""
+        column_var, operator_option, entry_var, _ = self.filter_rows[0]
+        column_var.set("")
+        operator_option.set("")
+        entry_var.set("")
+        self.result_grid.clear()
+        self.status_label.config(text="Select Filter and Press Search", fg="green")
+
+    def hide_window(self, event=None):
+        # A record still open for editing belongs to this visit
+        if self.view_edit_window is not None and self.view_edit_window.winfo_exists():
+            self.view_edit_window.destroy()
+        super().hide_window(event)
+
     def create_edit_window(self):
         """
         Creates and configures the edit window where users can filter data from an Excel file.
@@ -54,6 +77,9 @@ class EditWindow:
         # Disable resizing of the edit window
         self.edit_window.resizable(width=False, height=False)
 
+        # Closing only hides the window; it is reused the next time Edit Record is clicked
+        self.edit_window.protocol("WM_DELETE_WINDOW", self.hide_window)
+
         # Create UI frames to organize different sections of the window
         self.heading_frame = tk.Frame(self.edit_window, bg='wheat')  # Header section
         self.filter_frame = tk.Frame(self.edit_window, bd=4, relief='ridge', bg='wheat')  # Filter fields section
@@ -79,6 +105,7 @@ class EditWindow:
         self.filter_frame.pack(padx=10, pady=10, fill=tk.X)  # Filter section
         self.button_frame.pack(pady=10)  # Buttons section
         self.status_label.pack(pady=5)  # Status label
+        ReplicaStatusLabel(self.edit_window).pack()  # Freshness of the local copy, if searched
         self.create_search_tree()
 
     def create_buttons(self):
@@ -106,12 +133,12 @@ class EditWindow:
         self.edit_window.bind("<Alt-Key-d>", lambda event: result_download())
 
         # Button to close the edit window
-        close_button = tk.Button(self.button_frame, text="Close", command=self.edit_window.destroy,
+        close_button = tk.Button(self.button_frame, text="Close", command=self.hide_window,
                                  font=('ariel narrow', 10), width=10, bg='light cyan')
         close_button.pack(side=tk.LEFT, padx=10, pady=5)
 
         # Bind "Escape" key to close the window
-        self.edit_window.bind("<Escape>", lambda event: self.edit_window.destroy())
+        self.edit_window.bind("<Escape>", self.hide_window)
         
     def create_search_tree(self):
         # Define columns for the table
@@ -135,8 +162,14 @@ class EditWindow:
         v_scroll = ttk.Scrollbar(self.edit_window, orient="vertical", command=self.tree.yview)
         h_scroll = ttk.Scrollbar(self.edit_window, orient="horizontal", command=self.tree.xview)
 
-        # Configure the Treeview to use the scrollbars
-        self.tree.configure(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
+        # Configure the Treeview to use the horizontal scrollbar; the result grid drives the vertical one
+        self.tree.configure(xscrollcommand=h_scroll.set)
+
+        # Results are paged in by id as the user scrolls instead of inserting every row at once
+        self.result_grid = KeysetResultGrid(self.tree, v_scroll)
+
+        # Entries saved at any gate while a search is shown are appended if they match its filters
+        get_change_feed(self.edit_window).subscribe(self.tree, self.show_new_entries)
 
         # Place tree and scrollbars
 
@@ -153,7 +186,7 @@ class EditWindow:
 
         Each filter row consists of:
         - A dropdown to select the column to filter.
-        - A dropdown to choose the filtering operator (Equals, Not Equals, Contains, Not Contains).
+        - A dropdown to choose the filtering operator (Equals, Not Equals, Starts With, Contains, Not Contains).
         - A text entry field where the user inputs the value to filter by.
         """
         # Create a frame to hold the filter row components
@@ -173,8 +206,8 @@ class EditWindow:
         tk.Label(filter_row, text="Operator", font=('ariel narrow', 10), bg='wheat').pack(side=tk.LEFT, padx=5)
 
         # Create a dropdown for selecting an operator (equality, containment, etc.)
-        operator_option = ttk.Combobox(filter_row, values=["Equals", "Not Equals", "Contains", "Not Contains"],
-                                       width=10, state='readonly')
+        operator_option = ttk.Combobox(filter_row, values=FILTER_OPERATORS,
+                                       width=13, state='readonly')
         operator_option.pack(side=tk.LEFT, padx=5)
 
         # Create a text entry field for entering the filter value
@@ -192,62 +225,44 @@ class EditWindow:
         #self.update_window_size("extend")
 
     def search_data(self):
+        # Ignore repeated clicks while the previous search is still running
+        if get_task_executor(self.edit_window).is_busy(self.edit_window):
+            return
         try:
-            # Connect to the database
-            connection = mysql.connector.connect(**serverdb_config)
-            cursor = connection.cursor()
-
-            # Base query
-            query = "SELECT * FROM inward_logistic WHERE 1=1"
-            print("Initial query:", query)
-
-            # Build the query based on filters
-            for column_var, operator_option, entry_var, _ in self.filter_rows:
-                column = column_var.get()
-                operator = operator_option.get()
-                value = entry_var.get().strip()
-                print("Column:", column, "operator:", operator, "value:", value)
-                if column and operator and value:
-                    column = f"`{column}`"  # Enclose column name in backticks
-                    if operator == "Equals":
-                        query += f" AND {column} = '{value}'"
-                    elif operator == "Not Equals":
-                        query += f" AND {column} != '{value}'"
-                    elif operator == "Contains":
-                        query += f" AND {column} LIKE '%{value}%'"
-                    elif operator == "Not Contains":
-                        query += f" AND {column} NOT LIKE '%{value}%'"
-
-            # Execute the query
-            print("Final query:", query)
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-            # Get column names
-            columns = [desc[0] for desc in cursor.description]
-
-            # Clear existing tree view data
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            # Insert new data into tree view
-            for row in rows:
-                self.tree.insert("", "end", values=row)
+            # Collect (column, operator, value) from every filter row
+            filters = [(column_var.get(), operator_option.get(), entry_var.get().strip())
+                       for column_var, operator_option, entry_var, _ in self.filter_rows]
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to edit the database: {str(e)}")
+            return
 
+        def show_record_count(record_count):
+            self.record_count = record_count
             # Display record count
-            record_count = len(rows)
             self.status_label.config(
                 text=f"{record_count} records found" if record_count else "0 records found",
                 fg="green" if record_count else "red"
             )
 
-            # Close the database connection
-            cursor.close()
-            connection.close()
+        def show_error(e):
+            self.status_label.config(text="Select Filter and Press Search", fg="green")
+            messagebox.showerror("Error", f"Failed to edit the database: {str(e)}", parent=self.edit_window)
+
+        self.status_label.config(text="Searching...", fg="blue")
+        # Load the first page of results in the background; further pages are fetched by id as the user scrolls.
+        # "Contains Word" on Material/Remark/TPL_Remarks uses the FULLTEXT index when the server has it.
+        # The local copy of the register answers the search once it is seeded (see replica.py).
+        self.result_grid.load(filters, on_loaded=show_record_count, on_error=show_error,
+                              storage=get_register_replica(self.edit_window).search_storage())
+
+    def show_new_entries(self, rows):
+        """Change feed subscriber: appends new entries matching the current search and updates the count."""
+        def show_added(added_count):
+            self.record_count += added_count
+            self.status_label.config(text=f"{self.record_count} records found ({added_count} new)", fg="green")
+
+        self.result_grid.load_new_rows(on_added=show_added)
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to edit the database: {str(e)}")
-            
     def view_edit_record(self, event):
         """Opens a new window for viewing and editing a selected record with dropdowns and date pickers."""
         selected_item = self.tree.selection()
@@ -258,7 +273,6 @@ class EditWindow:
 
         # Store the first element in a variable
         serial_no = self.tree.item(selected_item, "values")[0]
-        print("Serial no :  ", serial_no)
         if not record:
             return
         width, height = pyautogui.size()
@@ -281,7 +295,11 @@ class EditWindow:
         fields = database_fields
 
         self.view_edit_entries = []
-        dropdown_fields = {"Return Type": ["Non-Returnable", "Returnable"], "Benefit Type": ["Non-Benefit", "Benefit", "None"]}
+        dropdown_fields = {"Return Type": ["Non-Returnable", "Returnable", "Returned"], "Benefit Type": ["Non-Benefit", "Benefit", "None"]}
+
+        # The style is shared by all fields, so it is configured once
+        style = ttk.Style()
+        style.configure("Readonly.TEntry", background="light grey")
 
         num_fields = len(fields)
         for i, field in enumerate(fields):
@@ -289,8 +307,6 @@ class EditWindow:
 
             label = tk.Label(display_frame, text=field, width=20, anchor=tk.W, font=("Bookman Old Style", 10), bg="wheat")
             label.grid(row=row, column=col * 2, padx=5, pady=5, sticky="w")
-            style = ttk.Style()
-            style.configure("Readonly.TEntry", background="light grey")
 
             if field in dropdown_fields:
                 var = tk.StringVar(value=record[i])
@@ -323,32 +339,28 @@ class EditWindow:
 
         def save_changes():
             updated_record = [item[1].get() for item in self.view_edit_entries]
-            print("Updated record count:", len(updated_record))
-
-            # Connect to the database
-            connection = mysql.connector.connect(**serverdb_config)
-            cursor = connection.cursor()
-
-            # SQL query to update the record
-            update_query = """
-            UPDATE inward_logistic
-            SET Inward_No = %s,Return_Type = %s, Benefit_Type = %s, Date = %s, Time = %s, Gate_Entry_No = %s, Invoice_No = %s, PO_No = %s, BOE_No = %s, 
-                Return_Date = %s, Return_Time = %s, Supplier = %s, Material = %s, Qty = %s, Department = %s, Project = %s, 
-                TPL_Name = %s, Vehicle = %s, Received = %s, Authorized = %s, Security = %s, Remark = %s, TPL_Remarks = %s
-            WHERE id = %s
-            """
-
-            # Execute the update query
-            cursor.execute(update_query, (*updated_record, serial_no))
-            connection.commit()
-
-            # Close the database connection
-            cursor.close()
-            connection.close()
-
-            # Update the Treeview and show success message
-            self.tree.item(selected_item, values=(serial_no, *updated_record))
-            messagebox.showinfo("Success", "Record edited successfully and saved !!!", parent=self.view_edit_window)
+
+            def run_update(task):
+                # The daily summary moves the record from its old day/project/supplier to the new one in the same
+                # transaction (see register.py)
+                update_record(serial_no, updated_record)
+
+            def show_saved(_):
+                # Update the Treeview and show success message
+                if self.tree.exists(selected_item[0]):
+                    self.tree.item(selected_item, values=(serial_no, *updated_record))
+                # The return date or type may have changed
+                get_return_tracker(self.view_edit_window).refresh_records([serial_no])
+                # Copy the edit to the local replica without waiting for its next sync
+                get_register_replica(self.view_edit_window).sync_now()
+                messagebox.showinfo("Success", "Record edited successfully and saved !!!", parent=self.view_edit_window)
+
+            def show_error(e):
+                messagebox.showerror("Error", f"Failed to save the record: {str(e)}", parent=self.view_edit_window)
+
+            # A save is never dropped, even if the window is closed while it waits for a worker
+            get_task_executor(self.view_edit_window).submit(run_update, on_success=show_saved, on_error=show_error,
+                                                            owner=self.view_edit_window, cancellable=False)
             #self.load_last_entries()
 
         edit_button = tk.Button(button_frame, text="Edit", command=enable_edit, bg="light cyan",font=('ariel narrow', 10), width=10)
@@ -363,10 +375,8 @@ class EditWindow:
     def download_filteredData(self):
         source_path = self.output_filename
 
-        print("download_filteredData-> ", source_path)
-
         # Get user's default download directory
-        download_dir = str(Path.home() / "Downloads")
+        download_dir = downloads_dir()
         destination_path = os.path.join(download_dir, "Filtered_Inward_Material.xlsx")
 
         if os.path.exists(source_path):
@@ -378,13 +388,13 @@ class EditWindow:
                 # Open the Downloads directory in File Explorer, handle errors
                 '''
                 try:
-                    subprocess.Popen(["explorer", download_dir], shell=True)
+                    open_folder(download_dir)
                 except Exception as e:
                     print(f"Warning: Failed to open Downloads directory: {e}")
 
                 # Open the downloaded Excel file
                 try:
-                    os.startfile(destination_path)  # Works on Windows
+                    open_file(destination_path)
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to open the file: {str(e)}")
                 '''
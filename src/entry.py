@@ -2,7 +2,12 @@ from xml.etree.ElementTree import tostring
 
 from common_utils import *
 
-class DataEntryWindow:
+# Saved records shown below the form
+LAST_ENTRIES_COUNT = 5
+
+class DataEntryWindow(ReusableWindow):
+    modal = True
+
     def __init__(self, master):
         """
         Initializes the DataEntryWindow class.
@@ -13,8 +18,23 @@ class DataEntryWindow:
         :param master: The parent Tkinter window.
         """
         self.master = master
+
+        # Batch mode: entries validated and queued in the Treeview, saved together with "Save Batch"
+        self.batch_mode = None
+        self.batch_entries = {}  # Treeview iid -> validated record, in the order they were queued
+        self.batch_counter = 0
+        self.save_batch_button = None
+
+        # Fields with lists from the lookup cache, filled in load_lookup_lists()
+        self.project_dropdown = None
+        self.lookup_entries = {}  # inward_logistic column -> autocomplete combobox
+        self.view_edit_window = None
         self.create_data_entry_window()
 
+    @property
+    def toplevel(self):
+        return self.data_entry_window
+
     def create_data_entry_window(self):
         """
         Creates a data entry window for recording inward material details.
@@ -34,6 +54,8 @@ class DataEntryWindow:
         self.data_entry_window.geometry(f'975x650+{int(width / 3.2)}+{int(height / 3.5)}')
         self.data_entry_window.configure(background='wheat')
         self.data_entry_window.resizable(width=True, height=True)  # Disable window resizing
+        # Closing only hides the window; it is reused the next time Inward Entry is clicked
+        self.data_entry_window.protocol("WM_DELETE_WINDOW", self.close_window)
 
 
         # Create main frames for UI organization
@@ -148,33 +170,57 @@ class DataEntryWindow:
                 self.entry_fields.append(remark_entry)
 
             elif field == "Project_Name":
-                project_names = get_project_names()
-                project_dropdown = ttk.Combobox(self.data_entry_frame, values=project_names, font=('ariel narrow', 10),
-                                                width=37)
-                if project_names:
-                    project_dropdown.set(project_names[0])
+                project_dropdown = ttk.Combobox(self.data_entry_frame, font=('ariel narrow', 10), width=37)
+                self.project_dropdown = project_dropdown
                 project_dropdown.grid(row=i if i < len(fields) // 2 else i - len(fields) // 2,
                                       column=1 if i < len(fields) // 2 else 3, padx=5, pady=5)
                 self.entry_fields.append(project_dropdown)
 
+            elif field in LOOKUP_FIELDS:
+                # Previously used values are offered for autocomplete
+                lookup_entry = ttk.Combobox(self.data_entry_frame, font=('ariel narrow', 10), width=37)
+                lookup_entry.grid(row=i if i < len(fields) // 2 else i - len(fields) // 2,
+                                  column=1 if i < len(fields) // 2 else 3, padx=5, pady=5)
+                self.entry_fields.append(lookup_entry)
+                self.lookup_entries[LOOKUP_FIELDS[field]] = lookup_entry
+
             else:
                 entry = tk.Entry(self.data_entry_frame, width=40, font=('ariel narrow', 10), bg='light yellow')
                 entry.grid(row=i if i < len(fields) // 2 else i - len(fields) // 2,
                            column=1 if i < len(fields) // 2 else 3, padx=5, pady=5)
                 self.entry_fields.append(entry)
 
+        # Keep the widgets and variables needed to reset the form when the window is reused
+        self.returnable_type = returnable_type
+        self.benefit_type = benefit_type
+        self.time_entries = (time_entry, return_time_entry)
+        self.return_fields = (return_date_entry, return_time_entry)
+
+        # Fill the project drop-down and the autocomplete lists
+        self.load_lookup_lists()
+
         # Buttons for form actions
         save_button = tk.Button(self.button_frame, text="Save", fg="Black", command=self.save_data,
                                 font=('ariel narrow', 10), width=10, bg='light cyan')
         reset_button = tk.Button(self.button_frame, text="Reset", fg="Black", command=self.reset_fields,
                                  font=('ariel narrow', 10), width=10, bg='light cyan')
-        close_button = tk.Button(self.button_frame, text="Close", fg="Black", command=self.data_entry_window.destroy,
+        close_button = tk.Button(self.button_frame, text="Close", fg="Black", command=self.close_window,
                                  font=('ariel narrow', 10), width=10, bg='light cyan')
 
+        # In batch mode "Save" only queues the entry; "Save Batch" writes all queued entries at once
+        self.batch_mode = tk.BooleanVar(self.data_entry_window, False)
+        batch_check = tk.Checkbutton(self.button_frame, text="Batch Mode", variable=self.batch_mode,
+                                     font=('ariel narrow', 10), bg='wheat', activebackground='wheat')
+        self.save_batch_button = tk.Button(self.button_frame, text="Save Batch (0)", fg="Black",
+                                           command=self.save_batch, font=('ariel narrow', 10), width=14,
+                                           bg='light cyan', state=DISABLED)
+
         # Arrange buttons in the button frame
         save_button.grid(row=0, column=0, padx=5, pady=5)
         reset_button.grid(row=0, column=1, padx=5, pady=5)
         close_button.grid(row=0, column=2, padx=5, pady=5)
+        batch_check.grid(row=0, column=3, padx=5, pady=5)
+        self.save_batch_button.grid(row=0, column=4, padx=5, pady=5)
 
         # Define columns for the table
         columns = database_fields_load
@@ -184,6 +230,10 @@ class DataEntryWindow:
         style = ttk.Style()
         style.configure("Treeview.Heading", background="light cyan", font=("Arial", 10, "bold"), anchor="center")
         self.tree.bind("<Double-1>", self.view_edit_record)  # Double-click to open View/Edit window
+        self.tree.bind("<Delete>", self.remove_batch_entry)  # Delete key removes a queued batch entry
+        # Queued (not yet saved) batch entries are highlighted, entries the server rejected are shown in red
+        self.tree.tag_configure("pending", background="light yellow")
+        self.tree.tag_configure("failed", background="misty rose")
 
         # Define column headings
         # Define column headings and set their properties
@@ -210,116 +260,245 @@ class DataEntryWindow:
         # Load the last five entries initially
         self.load_last_entries()
 
+        # Entries saved at the other gates show up without reopening the window
+        get_change_feed(self.data_entry_window).subscribe(
+            self.tree, lambda rows: self.merge_last_entries(rows[-LAST_ENTRIES_COUNT:]))
+
+        # Entries queued here show up as soon as they reached the database
+        get_entry_sync(self.data_entry_window).subscribe(self.tree, self.show_synced_entries)
+
         self.data_entry_window.focus()  # Focus on the new window
         self.data_entry_window.grab_set()  # Make the window modal
 
+    def load_lookup_lists(self):
+        """Fills the project drop-down and the autocomplete comboboxes from the lookup cache in the background."""
+        executor = get_task_executor(self.data_entry_window)
+
+        def fill_projects(project_names):
+            self.project_dropdown.configure(values=project_names)
+            if project_names and not self.project_dropdown.get():
+                self.project_dropdown.set(project_names[0])
+
+        # The lists come from the lookup cache and are only read from the server on a cache miss
+        executor.submit(lambda task: cached_project_names(), on_success=fill_projects,
+                        on_error=lambda err: log_warning("failed to load the project list", error=str(err)),
+                        owner=self.data_entry_window, busy=False)
+        for column, lookup_entry in self.lookup_entries.items():
+            executor.submit(lambda task, column=column: cached_distinct_values(column),
+                            on_success=lambda values, combobox=lookup_entry: attach_autocomplete(combobox, values),
+                            on_error=lambda err, column=column: log_warning(
+                                "failed to load the autocomplete list", column=column, error=str(err)),
+                            owner=self.data_entry_window, busy=False)
+
+    def reset_window(self):
+        """Puts the form back into the state of a freshly opened window and refreshes the lists and last entries."""
+        # The return date and time are disabled for non-returnable entries; enable them so they can be reset
+        for return_field in self.return_fields:
+            return_field.configure(state="normal")
+
+        for entry in self.entry_fields:
+            if isinstance(entry, DateEntry):
+                entry.set_date(datetime.now().date())
+            elif isinstance(entry, tk.Text):
+                entry.delete('1.0', tk.END)
+            elif isinstance(entry, tk.Entry):
+                entry.delete(0, tk.END)
+        for time_entry in self.time_entries:
+            time_entry.insert(0, datetime.now().strftime("%H:%M:%S"))
+
+        self.benefit_type.set("Non-Benefit")
+        self.returnable_type.set("Non-Returnable")  # Also disables the return date and time again
+        self.batch_mode.set(False)
+
+        self.load_lookup_lists()
+        self.load_last_entries()
+
     def load_last_entries(self):
-        """Loads the last 5 entries from the SQL database and displays them in the Treeview table."""
-        # Database connection configuration
-        db_config = serverdb_config
+        """Replaces the saved records in the Treeview with the last 5 entries from the SQL database."""
+        for item in self.saved_entry_items():
+            self.tree.delete(item)
+        self.refresh_last_entries()
 
-        try:
-            # Establish connection
-            conn = mysql.connector.connect(**db_config)
-            cursor = conn.cursor()
+    def saved_entry_items(self):
+        """Returns the Treeview items of saved records (their iid is the record id), newest first."""
+        return [item for item in self.tree.get_children() if item not in self.batch_entries]
 
-            # Fetch last 5 entries from the database
-            cursor.execute("""
-                SELECT * FROM inward_logistic ORDER BY id DESC LIMIT 5
-            """)
-            last_five_entries = cursor.fetchall()
+    def refresh_last_entries(self):
+        """
+        Adds the records saved since the Treeview was filled.
 
-            print("entries", last_five_entries)
+        Only rows with an id above the highest one already shown are read, which is a short range scan on
+        the primary key instead of re-reading and redrawing the whole list.
+        """
+        saved_items = self.saved_entry_items()
+        after_id = max((int(item) for item in saved_items), default=0)
 
-            # Clear existing data in the treeview
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+        def fetch_new_entries(task):
+            # Fetch the entries newer than the ones shown on a pooled connection
+            return fetch_entries_after(after_id, LAST_ENTRIES_COUNT)
 
-            # Insert last 5 entries into the treeview
-            for entry in last_five_entries:
-                self.tree.insert("", tk.END, values=list(entry))
-                print(entry)
+        def show_error(err):
+            log_warning("failed to load the last entries", error=str(err))
 
-            for col in self.tree["columns"]:
-                self.tree.column(col, anchor="center")  # Center-align column data
+        get_task_executor(self.data_entry_window).submit(fetch_new_entries, on_success=self.merge_last_entries,
+                                                         on_error=show_error, owner=self.data_entry_window)
 
-            # Update the Treeview
-            self.tree.update_idletasks()
+    def show_synced_entries(self, pending, rejected, saved_ids):
+        """Entry sync subscriber: adds the records that just reached the database to the last entries."""
+        if saved_ids:
+            self.refresh_last_entries()
+
+    def merge_last_entries(self, entries):
+        """
+        Patches saved records into the Treeview: new ids are inserted on top (below the queued batch entries),
+        known ids are updated in place, and records beyond the last 5 are removed.
 
-        except mysql.connector.Error as err:
-            print(f"Database Error: {err}")
+        Parameters:
+        entries (list): Rows of inward_logistic (id first), in any order.
+        """
+        position = len(self.batch_entries)
+        for entry in sorted(entries, key=lambda row: row[0]):
+            iid = str(entry[0])
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=list(entry))
+            else:
+                self.tree.insert("", position, iid=iid, values=list(entry))
+
+        for item in self.saved_entry_items()[LAST_ENTRIES_COUNT:]:
+            self.tree.delete(item)
 
-        finally:
-            # Close the database connection
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+    def read_form_data(self):
+        """Extracts the values of all entry form fields as strings, in the order of database_fields."""
+        return [str(entry.get()) if isinstance(entry, (tk.Entry, tk.StringVar)) else
+                entry.get_date().strftime('%m/%d/%y') if isinstance(entry, DateEntry) else
+                str(entry.get('1.0', 'end-1c')) for entry in self.entry_fields]
 
     def save_data(self):
         """
-        Saves the data entered in the form to an SQL database.
+        Saves the data entered in the form: it is queued on this PC and sent to the SQL database in the background.
+
+        In batch mode the entry is only validated and queued; see save_batch().
         """
         # Extract and convert all data to string
-        data = [str(entry.get()) if isinstance(entry, (tk.Entry, tk.StringVar)) else
-                entry.get_date().strftime('%m/%d/%y') if isinstance(entry, DateEntry) else
-                str(entry.get('1.0', 'end-1c')) for entry in self.entry_fields]
+        data = self.read_form_data()
 
-        # Validate that the quantity (data[13]) is numeric
-        if not re.match(r'^[0-9]+$', data[13]):
-            messagebox.showerror("Error", "Qty must be numeric", parent=self.data_entry_window)
+        error = validate_entry(data)
+        if error:
+            messagebox.showerror("Error", error, parent=self.data_entry_window)
             return
 
-        # Validate that the invoice number (data[6]) is not empty
-        if data[6].strip() == "":
-            messagebox.showerror("Error", "Invoice cannot be blank", parent=self.data_entry_window)
+        if self.batch_mode.get():
+            self.add_batch_entry(data)
             return
 
-        print("Date :", data[3], " ", data[4], "Return Date :", data[9], " ", data[10])
-
-        # Convert Date and Time fields to correct format
+        # The entry goes into the queue on this PC first and is sent to the database in the background
+        # (see entry_queue.py), so a network blip neither loses it nor keeps the gate waiting
+        sync = get_entry_sync(self.data_entry_window)
         try:
-            data[3] = datetime.strptime(data[3], '%m/%d/%y').strftime('%Y-%m-%d')  # Ensure date format is correct
-            data[9] = datetime.strptime(data[9], '%m/%d/%y').strftime('%Y-%m-%d')  # Ensure return date is correct
-            data[4] = data[4] if ":" in data[4] else "00:00:00"  # Ensure correct time format
-            data[10] = data[10] if ":" in data[10] else "00:00:00"
-            print("After formatting ---> Date :", data[3], " ", data[4], "Return Date :", data[9], " ", data[10])
-        except ValueError as e:
-            print(f"Error: {e}")
-            messagebox.showerror("Error", "Invalid Date or Time format", parent=self.data_entry_window)
+            sync.enqueue(data)
+        except QueueError as err:
+            messagebox.showerror("Error", f"The entry could not be saved on this PC: {err}",
+                                 parent=self.data_entry_window)
             return
 
-        # Database connection configuration
-        try:
-            # Establish connection
-            conn = mysql.connector.connect(**serverdb_config)
-            cursor = conn.cursor()
-
-            # Define SQL query to insert data
-            sql_query = """
-                INSERT INTO inward_logistic (
-                    Inward_No, Return_Type, Benefit_Type, Date, Time, Gate_Entry_No, Invoice_No, PO_No, BOE_No,
-                    Return_Date, Return_Time, Supplier, Material, Qty, Department, Project, TPL_Name, Vehicle,
-                    Received, Authorized, Security, Remark, TPL_Remarks
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-
-            # Execute query
-            cursor.execute(sql_query, data)
-            conn.commit()
-
-            # Notify the user that the data has been saved successfully
-            messagebox.showinfo("Success", "Data saved successfully", parent=self.data_entry_window)
-
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Error", f"Error: {err}", parent=self.data_entry_window)
-
-        finally:
-            # Close the database connection
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+        # New suppliers, departments and TPL names become available for autocomplete right away
+        self.remember_entry_values(data)
+
+        # Notify the user that the data has been saved successfully
+        message = "Data saved successfully"
+        if not sync.online:
+            message += "\nThe server cannot be reached; the entry is kept on this PC and sent automatically."
+        messagebox.showinfo("Success", message, parent=self.data_entry_window)
+
+    @staticmethod
+    def remember_entry_values(data):
+        """Adds the supplier, department and TPL name of a saved record to the autocomplete lists."""
+        remember_lookup_values({column: data[database_fields.index(field)]
+                                for field, column in LOOKUP_FIELDS.items()})
+
+    def add_batch_entry(self, data):
+        """Queues a validated record in the Treeview until the batch is saved."""
+        self.batch_counter += 1
+        iid = f"batch-{self.batch_counter}"
+        # Queued entries stay below the ones queued before them, above the saved records
+        self.tree.insert("", len(self.batch_entries), iid=iid, values=["New", *data], tags=("pending",))
+        self.batch_entries[iid] = data
+        self.update_batch_button()
+
+    def remove_batch_entry(self, event=None):
+        """Removes the selected queued entries from the batch (bound to the Delete key)."""
+        for iid in self.tree.selection():
+            if iid in self.batch_entries:
+                del self.batch_entries[iid]
+                self.tree.delete(iid)
+        self.update_batch_button()
+
+    def close_window(self):
+        """Closes (hides) the entry window, asking first if queued batch entries would be lost."""
+        if self.batch_entries and not messagebox.askyesno(
+                "Unsaved Batch", f"{len(self.batch_entries)} queued entries have not been saved. Close anyway?",
+                parent=self.data_entry_window):
+            return
+
+        # Discard the queued entries and any record still open for editing
+        self.tree.delete(*self.batch_entries)
+        self.batch_entries.clear()
+        self.update_batch_button()
+        if self.view_edit_window is not None and self.view_edit_window.winfo_exists():
+            self.view_edit_window.destroy()
+        self.hide_window()
+
+    def update_batch_button(self):
+        self.save_batch_button.configure(text=f"Save Batch ({len(self.batch_entries)})",
+                                         state=NORMAL if self.batch_entries else DISABLED)
+
+    def save_batch(self):
+        """
+        Saves all queued entries in one transaction.
+
+        The whole batch is sent as one multi-row INSERT (executemany) and committed once. If the server
+        rejects that statement because of a bad row, the rows are inserted one by one in the same
+        transaction instead: InnoDB only undoes the failing statement, so every good row still goes in.
+        Rejected rows stay queued, marked red, and are listed in a per-row error report.
+        """
+        executor = get_task_executor(self.data_entry_window)
+        if not self.batch_entries or executor.is_busy(self.data_entry_window):
+            return
+        batch = list(self.batch_entries.items())
+
+        def run_batch_insert(task):
+            return insert_batch(batch)
+
+        def show_batch_result(result):
+            saved, failed = result
+            for iid in saved:
+                self.remember_entry_values(self.batch_entries.pop(iid))
+                self.tree.delete(iid)
+            for iid, _ in failed:
+                self.tree.item(iid, tags=("failed",))
+            self.update_batch_button()
+            self.refresh_last_entries()
+
+            if not failed:
+                messagebox.showinfo("Success", f"{len(saved)} entries saved successfully",
+                                    parent=self.data_entry_window)
+                return
+
+            # Per-row error report: position in the batch, invoice number and the server's reason
+            positions = {iid: position for position, (iid, _) in enumerate(batch, start=1)}
+            report = "\n".join(f"Row {positions[iid]} (Invoice {self.batch_entries[iid][6]}): {error}"
+                                for iid, error in failed)
+            messagebox.showwarning("Batch Saved With Errors",
+                                   f"{len(saved)} of {len(batch)} entries saved.\n"
+                                   f"The following entries were not saved and are still queued:\n\n{report}",
+                                   parent=self.data_entry_window)
+
+        def show_error(err):
+            messagebox.showerror("Database Error", f"Error: {err}\nNo entries of the batch were saved.",
+                                 parent=self.data_entry_window)
+
+        executor.submit(run_batch_insert, on_success=show_batch_result, on_error=show_error,
+                        owner=self.data_entry_window, cancellable=False)
 
     def reset_fields(self):
         """
@@ -340,12 +519,13 @@ class DataEntryWindow:
         selected_item = self.tree.selection()
         if not selected_item:
             return  # No item selected
+        if selected_item[0] in self.batch_entries:
+            return  # Queued batch entries are not in the database yet
 
         record = self.tree.item(selected_item, "values")[1:]
 
         # Store the first element in a variable
         serial_no = self.tree.item(selected_item, "values")[0]
-        print("Serial no :  ", serial_no)
         if not record:
             return
         width, height = pyautogui.size()
@@ -368,7 +548,11 @@ class DataEntryWindow:
         fields = database_fields
 
         self.view_edit_entries = []
-        dropdown_fields = {"Return Type": ["Non-Returnable", "Returnable"], "Benefit Type": ["Non-Benefit", "Benefit", "None"]}
+        dropdown_fields = {"Return Type": ["Non-Returnable", "Returnable", "Returned"], "Benefit Type": ["Non-Benefit", "Benefit", "None"]}
+
+        # The style is shared by all fields, so it is configured once
+        style = ttk.Style()
+        style.configure("Readonly.TEntry", background="light grey")
 
         num_fields = len(fields)
         for i, field in enumerate(fields):
@@ -376,8 +560,6 @@ class DataEntryWindow:
 
             label = tk.Label(display_frame, text=field, width=20, anchor=tk.W, font=("Bookman Old Style", 10), bg="wheat")
             label.grid(row=row, column=col * 2, padx=5, pady=5, sticky="w")
-            style = ttk.Style()
-            style.configure("Readonly.TEntry", background="light grey")
 
             if field in dropdown_fields:
                 var = tk.StringVar(value=record[i])
@@ -410,33 +592,28 @@ class DataEntryWindow:
 
         def save_changes():
             updated_record = [item[1].get() for item in self.view_edit_entries]
-            print("Updated record count:", len(updated_record))
-
-            # Connect to the database
-            connection = mysql.connector.connect(**serverdb_config)
-            cursor = connection.cursor()
-
-            # SQL query to update the record
-            update_query = """
-            UPDATE inward_logistic
-            SET Inward_No = %s,Return_Type = %s, Benefit_Type = %s, Date = %s, Time = %s, Gate_Entry_No = %s, Invoice_No = %s, PO_No = %s, BOE_No = %s, 
-                Return_Date = %s, Return_Time = %s, Supplier = %s, Material = %s, Qty = %s, Department = %s, Project = %s, 
-                TPL_Name = %s, Vehicle = %s, Received = %s, Authorized = %s, Security = %s, Remark = %s, TPL_Remarks = %s
-            WHERE id = %s
-            """
-
-            # Execute the update query
-            cursor.execute(update_query, (*updated_record, serial_no))
-            connection.commit()
-
-            # Close the database connection
-            cursor.close()
-            connection.close()
-
-            # Update the Treeview and show success message
-            self.tree.item(selected_item, values=updated_record)
-            messagebox.showinfo("Success", "Record edited successfully and saved !!!", parent=self.view_edit_window)
-            self.load_last_entries()
+
+            def run_update(task):
+                # The daily summary moves the record from its old day/project/supplier to the new one in the same
+                # transaction (see register.py)
+                update_record(serial_no, updated_record)
+
+            def show_saved(_):
+                # Patch only the edited row of the Treeview and show success message
+                if self.tree.exists(str(serial_no)):
+                    self.tree.item(str(serial_no), values=(serial_no, *updated_record))
+                # The return date or type may have changed
+                get_return_tracker(self.view_edit_window).refresh_records([serial_no])
+                # Copy the edit to the local replica without waiting for its next sync
+                get_register_replica(self.view_edit_window).sync_now()
+                messagebox.showinfo("Success", "Record edited successfully and saved !!!", parent=self.view_edit_window)
+
+            def show_error(e):
+                messagebox.showerror("Error", f"Failed to save the record: {str(e)}", parent=self.view_edit_window)
+
+            # A save is never dropped, even if the window is closed while it waits for a worker
+            get_task_executor(self.view_edit_window).submit(run_update, on_success=show_saved, on_error=show_error,
+                                                            owner=self.view_edit_window, cancellable=False)
 
         edit_button = tk.Button(button_frame, text="Edit", command=enable_edit, bg="light cyan",font=('ariel narrow', 10), width=10)
         edit_button.pack(side="left", padx=5)
@@ -0,0 +1,322 @@
+import json
+import os
+import sqlite3
+import threading
+import tkinter as tk
+import uuid
+from datetime import datetime
+from tkinter import TclError, messagebox
+
+from config import entry_queue_config
+from platform_support import data_dir
+from register import insert_queued_entries
+from task_runner import get_task_executor
+from instrumentation import timed, log_warning
+
+# File name of the queue inside the data directory
+ENTRY_QUEUE_FILE_NAME = "entry_queue.sqlite3"
+
+# Raised when the queue file cannot be written, e.g. because the disk is full
+QueueError = sqlite3.Error
+
+
+class EntryJournal:
+    """
+    Durable queue of gate entries waiting to be saved to the database, kept in a SQLite file on this PC.
+
+    Appending an entry is one small local transaction, so saving at the gate does not wait for the network.
+    The file runs in WAL mode with synchronous=NORMAL: a committed entry survives a crash of the application;
+    only a power cut in the moment after the commit can lose it.
+
+    Every entry gets a random idempotency key when it is queued. The key travels with the entry to the
+    database (see register.insert_queued_entries), so an entry sent twice is saved once.
+
+    An entry the database rejects (as opposed to a connection failure) is kept with its error message and not
+    sent again until retry_rejected() is called.
+    """
+
+    def __init__(self, path=None):
+        """
+        Parameters:
+        path (str): The queue file, created if missing; default entry_queue.sqlite3 in the data directory.
+        """
+        self.path = path or data_dir(ENTRY_QUEUE_FILE_NAME)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Used from the Tk thread (append) and a worker thread (peek, remove); the lock serializes them
+        self._connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS queued_entries (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    entry_key TEXT NOT NULL UNIQUE,
+                    data TEXT NOT NULL,
+                    queued_at TEXT NOT NULL,
+                    error TEXT
+                )
+            """)
+
+    def append(self, data):
+        """
+        Queues one validated entry.
+
+        Parameters:
+        data (list): Field values as converted by validate_entry().
+
+        Returns:
+        str: The entry's idempotency key.
+        """
+        entry_key = uuid.uuid4().hex
+        with self._lock:
+            self._connection.execute("INSERT INTO queued_entries (entry_key, data, queued_at) VALUES (?, ?, ?)",
+                                     (entry_key, json.dumps(data), datetime.now().isoformat(" ", "seconds")))
+        return entry_key
+
+    def peek(self, limit):
+        """Returns up to `limit` entries to send as (entry key, data) pairs, oldest first."""
+        with self._lock:
+            rows = self._connection.execute("SELECT entry_key, data FROM queued_entries WHERE error IS NULL "
+                                            "ORDER BY seq LIMIT ?", (limit,)).fetchall()
+        return [(entry_key, json.loads(data)) for entry_key, data in rows]
+
+    def remove(self, entry_keys):
+        """Removes the entries saved to the database."""
+        with self._lock:
+            self._connection.executemany("DELETE FROM queued_entries WHERE entry_key = ?",
+                                         [(entry_key,) for entry_key in entry_keys])
+
+    def mark_rejected(self, failures):
+        """
+        Keeps entries the database rejected out of the next batches.
+
+        Parameters:
+        failures (list): (entry key, error message) pairs.
+        """
+        with self._lock:
+            self._connection.executemany("UPDATE queued_entries SET error = ? WHERE entry_key = ?",
+                                         [(error, entry_key) for entry_key, error in failures])
+
+    def rejected(self):
+        """Returns (data, error message) of the rejected entries, oldest first."""
+        with self._lock:
+            rows = self._connection.execute("SELECT data, error FROM queued_entries WHERE error IS NOT NULL "
+                                            "ORDER BY seq").fetchall()
+        return [(json.loads(data), error) for data, error in rows]
+
+    def retry_rejected(self):
+        """Queues the rejected entries to be sent again, e.g. after the cause was fixed on the server."""
+        with self._lock:
+            self._connection.execute("UPDATE queued_entries SET error = NULL WHERE error IS NOT NULL")
+
+    def counts(self):
+        """Returns (entries waiting to be sent, rejected entries)."""
+        with self._lock:
+            pending, rejected = self._connection.execute(
+                "SELECT COUNT(*) - COUNT(error), COUNT(error) FROM queued_entries").fetchone()
+        return pending, rejected
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class EntrySync:
+    """
+    Sends the queued gate entries to the database in the background.
+
+    An attempt runs on the task executor right after an entry is queued and then again while entries are
+    waiting, `batch_size` entries per transaction. While the database cannot be reached, the pause between
+    two attempts starts at `sync_interval` seconds and grows by `backoff` after every failed attempt up to
+    `max_sync_interval`; the first successful attempt drops it back to `sync_interval`.
+
+    Subscribers get (waiting entries, rejected entries, ids of the records just saved) on the Tk thread
+    whenever the queue changed.
+
+    Attributes:
+    online (bool): The last attempt reached the database.
+    """
+
+    def __init__(self, root, journal, sync_interval=2, max_sync_interval=120, backoff=2, batch_size=200):
+        """
+        Parameters:
+        root (tk.Tk): The application root, used to schedule the attempts.
+        journal (EntryJournal): The queue.
+        sync_interval (float): Seconds between two attempts while the database is reachable.
+        max_sync_interval (float): Upper bound for the interval while it is not.
+        backoff (float): Factor applied to the interval after a failed attempt.
+        batch_size (int): Entries sent per transaction.
+        """
+        self.root = root
+        self.journal = journal
+        self.sync_interval = sync_interval
+        self.max_sync_interval = max_sync_interval
+        self.backoff = backoff
+        self.batch_size = batch_size
+
+        self.interval = sync_interval
+        self.online = True
+        self._subscribers = []
+        self._after_id = None
+        self._in_flight = False
+        self._running = False
+
+    def subscribe(self, widget, callback):
+        """
+        Registers `callback(pending, rejected, saved_ids)`, called while `widget` exists, and calls it once.
+
+        Parameters:
+        widget (tk.Widget): Widget whose lifetime the subscription follows.
+        callback (callable): Called on the Tk thread with the queue counts and the ids of newly saved records.
+        """
+        self._subscribers.append((widget, callback))
+        callback(*self.journal.counts(), [])
+
+    def start(self):
+        """Sends the entries left over from earlier sessions and keeps sending until stop() is called."""
+        if self._running:
+            return
+        self._running = True
+        self._schedule(0)
+
+    def stop(self):
+        self._running = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def enqueue(self, data):
+        """
+        Tk thread: queues a validated entry and starts sending it unless the database is known to be down.
+
+        Returns:
+        str: The entry's idempotency key.
+
+        Raises:
+        QueueError: If the queue file cannot be written; the entry is not saved then.
+        """
+        with timed("entry.enqueue", rows=1):
+            entry_key = self.journal.append(data)
+        self._notify([])
+        if self._running and self.online and not self._in_flight:
+            self._schedule(0)
+        return entry_key
+
+    def _schedule(self, seconds):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(int(seconds * 1000), self._sync)
+
+    def _sync(self):
+        """Tk thread: starts one attempt on the task executor."""
+        self._after_id = None
+        if not self._running or self._in_flight:
+            return
+        self._in_flight = True
+        get_task_executor(self.root).submit(lambda task: self._send(), on_success=self._sent,
+                                            on_error=self._failed, busy=False)
+
+    def _send(self):
+        """Worker thread: saves the oldest waiting entries and removes them from the queue."""
+        entries = self.journal.peek(self.batch_size)
+        if not entries:
+            return []
+        saved, rejected = insert_queued_entries(entries)
+        self.journal.remove(saved)
+        if rejected:
+            log_warning("queued entries rejected", entries=[{"entry_key": entry_key, "error": error}
+                                                            for entry_key, error in rejected])
+            self.journal.mark_rejected(rejected)
+        return list(saved.values())
+
+    def _sent(self, saved_ids):
+        """Tk thread: reports the saved records and continues while entries are waiting."""
+        self._in_flight = False
+        self.online = True
+        self.interval = self.sync_interval
+        pending, rejected = self.journal.counts()
+        self._notify(saved_ids, (pending, rejected))
+        if self._running and pending:
+            self._schedule(0 if saved_ids else self.interval)
+
+    def _failed(self, err):
+        """Tk thread: keeps the entries and tries again after a growing pause."""
+        log_warning("entry sync failed", error=str(err), retry_in=self.interval)
+        self._in_flight = False
+        self.online = False
+        self._notify([])
+        if self._running:
+            self._schedule(self.interval)
+        self.interval = min(self.interval * self.backoff, self.max_sync_interval)
+
+    def _notify(self, saved_ids, counts=None):
+        pending, rejected = counts or self.journal.counts()
+        for widget, callback in list(self._subscribers):
+            try:
+                if widget.winfo_exists():
+                    callback(pending, rejected, saved_ids)
+                    continue
+            except TclError:
+                pass
+            self._subscribers.remove((widget, callback))
+
+    def retry_rejected(self):
+        """Sends the rejected entries again."""
+        self.journal.retry_rejected()
+        self._notify([])
+        if self._running and not self._in_flight:
+            self._schedule(0)
+
+
+_entry_sync = None
+
+
+def get_entry_sync(widget):
+    """Returns the application's EntrySync, creating it and opening the queue on first use."""
+    global _entry_sync
+    if _entry_sync is None:
+        _entry_sync = EntrySync(widget._root(), EntryJournal(), **entry_queue_config)
+    return _entry_sync
+
+
+class SyncStatusLabel:
+    """
+    Main-screen indicator of the entries saved at this gate that are not in the database yet.
+
+    Clicking it while entries were rejected lists them and offers to send them again.
+    """
+
+    def __init__(self, master):
+        """
+        Parameters:
+        master (tk.Tk): The main window the label is placed on.
+        """
+        self.sync = get_entry_sync(master)
+        self.label = tk.Label(master, font=('ariel narrow', 12, 'bold'), bg='wheat', bd=2, relief='ridge',
+                              padx=6, cursor="hand2")
+        self.label.bind("<Button-1>", self.show_rejected)
+        self.sync.subscribe(self.label, self.show_counts)
+
+    def place(self, **kwargs):
+        self.label.place(**kwargs)
+
+    def show_counts(self, pending, rejected, saved_ids):
+        """Sync subscriber: shows the number of waiting and rejected entries."""
+        text = f"Unsynced entries: {pending}"
+        if pending and not self.sync.online:
+            text += " (server unreachable, retrying)"
+        if rejected:
+            text += f", {rejected} rejected"
+        self.label.config(text=text, fg="red" if rejected or not self.sync.online else
+                          "dark orange" if pending else "dark green")
+
+    def show_rejected(self, event=None):
+        """Lists the rejected entries with the database's reason and offers to send them again."""
+        rejected = self.sync.journal.rejected()
+        if not rejected:
+            return
+        report = "\n".join(f"Invoice {data[6]}, {data[11]}: {error}" for data, error in rejected)
+        if messagebox.askyesno("Rejected Entries", f"The database rejected these entries:\n\n{report}\n\n"
+                                                   f"Send them again?", parent=self.label):
+            self.sync.retry_rejected()
@@ -0,0 +1,2 @@
+class TaskCancelled(Exception):
+    """Raised inside a job when its task has been cancelled; the job simply stops."""
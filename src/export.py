@@ -0,0 +1,227 @@
+from datetime import timedelta
+
+# Number of rows pulled from the server per fetchmany() call while exporting
+EXPORT_CHUNK_SIZE = 2000
+
+# Cell style of the master Inward Material Register
+REGISTER_CELL_STYLE = {
+    'font_name': 'Bookman Old Style',
+    'font_size': 11,
+    'align': 'center',
+    'valign': 'vcenter',
+    'text_wrap': True
+}
+
+# Header style of the master Inward Material Register
+REGISTER_HEADER_STYLE = dict(REGISTER_CELL_STYLE, bold=True, border=1)
+
+# Cell style of the filtered search results; long values additionally wrap (see SEARCH_WRAP_THRESHOLD)
+SEARCH_CELL_STYLE = {
+    'font_name': 'Bookman Old Style',
+    'font_size': 11,
+    'valign': 'vcenter'
+}
+
+# Header style of the filtered search results (light cyan, bold, centered)
+SEARCH_HEADER_STYLE = dict(SEARCH_CELL_STYLE, bold=True, align='center', text_wrap=True,
+                           bg_color='#D9FFFF', pattern=1)
+
+# Values longer than this many characters are wrapped in the search results
+SEARCH_WRAP_THRESHOLD = 50
+
+# Excel number formats for the SQL column types that need one
+NUMBER_FORMATS = {
+    'DATE': 'yyyy-mm-dd',
+    'TIME': 'hh:mm:ss'
+}
+
+
+def excel_value(value):
+    """
+    Converts a value fetched from MySQL into something xlsxwriter writes natively.
+
+    MySQL TIME columns arrive as timedelta; Excel stores a time of day as a fraction of a day.
+    """
+    if isinstance(value, timedelta):
+        return value.total_seconds() / 86400
+    return value
+
+
+def register_column_widths(column_count):
+    """Returns the register's column widths: 20 for the first twelve columns (A-L), 50 for the rest."""
+    return [20 if index < 12 else 50 for index in range(column_count)]
+
+
+class StyledSheetWriter:
+    """
+    Writes rows to a single-sheet workbook with shared formats, sizing the columns while it writes.
+
+    Instead of writing the data first and then reopening the file to style every cell, the writer
+    creates each distinct format exactly once, attaches it to its column up front, and records the
+    longest value per column as rows go by. Column widths are applied when the writer is closed, so the
+    formatted workbook is produced in a single pass. With constant_memory the rows are flushed to
+    disk as they are written.
+
+    Usage:
+        with StyledSheetWriter(path, names, types, SEARCH_CELL_STYLE, SEARCH_HEADER_STYLE) as writer:
+            writer.write_rows(rows)
+    """
+
+    def __init__(self, destination_path, column_names, column_types, cell_style, header_style,
+                 column_widths=None, wrap_threshold=None, max_width=50, padding=5, constant_memory=True):
+        """
+        Parameters:
+        destination_path (str): Path of the .xlsx file to create.
+        column_names (list): Header text for each column.
+        column_types (list): SQL type of each column ("DATE", "TIME", ...) used to pick a number format.
+        cell_style (dict): xlsxwriter format properties shared by all data cells.
+        header_style (dict): xlsxwriter format properties of the header row.
+        column_widths (list): Fixed column widths; when None the widths are computed from the data.
+        wrap_threshold (int): Text longer than this is written with a wrapping variant of the cell style.
+        max_width (int): Upper bound for computed column widths.
+        padding (int): Characters added to the longest value of a column.
+        constant_memory (bool): Flush every row to disk as soon as the next one is written.
+        """
+        self.column_names = list(column_names)
+        self.fixed_widths = column_widths
+        self.wrap_threshold = wrap_threshold
+        self.max_width = max_width
+        self.padding = padding
+        self.row_count = 0
+
+        # Imported here so that the module only loads when the first export is written
+        import xlsxwriter
+
+        # User text such as "=GST" or a long URL must be written as plain text, never as a formula or link
+        self.workbook = xlsxwriter.Workbook(destination_path, {'constant_memory': constant_memory,
+                                                               'strings_to_formulas': False,
+                                                               'strings_to_urls': False})
+        self.worksheet = self.workbook.add_worksheet()
+
+        # One shared format per (number format, wrap) combination instead of one per cell
+        self._formats = {}
+        self.column_formats = []
+        self.wrap_formats = []
+        for column_type in column_types:
+            number_format = NUMBER_FORMATS.get(column_type)
+            self.column_formats.append(self._format(cell_style, number_format, False))
+            self.wrap_formats.append(self._format(cell_style, number_format, True) if wrap_threshold else None)
+
+        # Widths start at the header length; data can only widen a column
+        self.max_lengths = [len(str(name)) for name in self.column_names]
+
+        # Column formats must be in place before rows are flushed, since a cell without a format of its
+        # own takes its column's format at the moment it is written out
+        for col_num, column_format in enumerate(self.column_formats):
+            width = self.fixed_widths[col_num] if self.fixed_widths is not None else None
+            self.worksheet.set_column(col_num, col_num, width, column_format)
+
+        self.worksheet.write_row(0, 0, self.column_names, self.workbook.add_format(header_style))
+
+    def _format(self, cell_style, number_format, wrap):
+        key = (number_format, wrap)
+        if key not in self._formats:
+            style = dict(cell_style)
+            if number_format:
+                style['num_format'] = number_format
+            if wrap:
+                style['text_wrap'] = True
+            self._formats[key] = self.workbook.add_format(style)
+        return self._formats[key]
+
+    def write_rows(self, rows):
+        """
+        Appends rows below the ones already written.
+
+        Parameters:
+        rows (iterable): Sequences of values in column order, as returned by cursor.fetchmany().
+        """
+        worksheet = self.worksheet
+        max_lengths = self.max_lengths
+        track_widths = self.fixed_widths is None
+        wrap_threshold = self.wrap_threshold
+        wrap_formats = self.wrap_formats
+
+        for row in rows:
+            self.row_count += 1
+            row_num = self.row_count
+            for col_num, value in enumerate(row):
+                if value is None:
+                    continue
+                if track_widths or wrap_threshold:
+                    length = len(value) if isinstance(value, str) else len(str(value))
+                    if length > max_lengths[col_num]:
+                        max_lengths[col_num] = length
+                    if wrap_threshold and length > wrap_threshold:
+                        # Only the rare long cell gets an explicit (shared) format
+                        worksheet.write(row_num, col_num, excel_value(value), wrap_formats[col_num])
+                        continue
+                # Everything else inherits the column format
+                worksheet.write(row_num, col_num, excel_value(value))
+
+    def write_cursor(self, cursor, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+        """
+        Writes the remaining result set of an executed cursor, fetching it in chunks.
+
+        Parameters:
+        cursor (MySQLCursor): An executed cursor.
+        chunk_size (int): Rows fetched per fetchmany() call.
+        progress (callable): Optional callback receiving the number of rows written after every chunk,
+                             e.g. Task.report_progress, which may raise to abort the export.
+
+        Returns:
+        int: Total number of data rows written so far.
+        """
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            self.write_rows(rows)
+            if progress:
+                progress(self.row_count)
+        return self.row_count
+
+    def close(self):
+        """Applies the computed column widths and writes the workbook to disk."""
+        if self.fixed_widths is None:
+            for col_num, column_format in enumerate(self.column_formats):
+                width = min(self.max_lengths[col_num] + self.padding, self.max_width)
+                self.worksheet.set_column(col_num, col_num, width, column_format)
+        self.workbook.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def stream_cursor_to_xlsx(cursor, destination_path, column_names, column_types, column_widths,
+                          cell_style=REGISTER_CELL_STYLE, header_style=REGISTER_HEADER_STYLE,
+                          chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Writes the result set of an executed, unbuffered cursor to an Excel file in a single pass.
+
+    Rows are pulled with fetchmany() in chunks, so the MySQL client streams them from the server
+    instead of materialising the whole table, and xlsxwriter's constant_memory mode keeps memory
+    flat regardless of the table size. Styling is attached once per column; cells pick up their
+    column's format.
+
+    Parameters:
+    cursor (MySQLCursor): An unbuffered cursor on which the SELECT has already been executed.
+    destination_path (str): Path of the .xlsx file to create.
+    column_names (list): Header text for each column.
+    column_types (list): SQL type of each column ("DATE", "TIME", ...) used to pick a number format.
+    column_widths (list): Width of each column.
+    cell_style (dict): xlsxwriter format properties shared by all data cells.
+    header_style (dict): xlsxwriter format properties of the header row.
+    chunk_size (int): Rows fetched from the server per round trip.
+    progress (callable): Optional callback receiving the number of rows written after every chunk.
+
+    Returns:
+    int: Number of data rows written.
+    """
+    with StyledSheetWriter(destination_path, column_names, column_types, cell_style, header_style,
+                           column_widths=column_widths) as writer:
+        return writer.write_cursor(cursor, chunk_size, progress)
@@ -1,10 +1,7 @@
 # Importing tkinter module with alias name "tk"
 import tkinter as tk
-import mysql.connector
 import ctypes
 import subprocess
-# Importing specific classes and functions from tkinter module
-import pandas as pd
 from tkinter import Canvas  # Importing Canvas specifically for background image handling
 
 from tkinter import (
@@ -13,29 +10,14 @@ from tkinter import (
 )
 import sys
 from tkinter import ttk, messagebox
-import xlsxwriter
 import re
-from openpyxl import load_workbook
 from pathlib import Path
-from tkcalendar import DateEntry
 from datetime import datetime
-from PIL import Image, ImageTk
 
 from tkinter import *
 # Importing specific class from tkinter.messagebox module
 from tkinter.messagebox import showinfo
 
-# Importing docx module to work with Word documents
-import docx
-
-# Importing openpyxl module to work with Excel files
-import openpyxl
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-
-# Importing DateEntry class from tkcalendar module
-from tkcalendar import DateEntry
-
 # Importing random module for generating random values
 import random
 
@@ -48,13 +30,41 @@ import shutil
 # Importing os module for interacting with the operating system
 import os
 
-# Importing pyautogui module for automating mouse and keyboard actions
-import pyautogui
-
-# Importing Image and ImageTk classes from PIL module
-from PIL import Image, ImageTk
-
-from openpyxl.styles import Font, PatternFill,Alignment, Border, Side
+# Heavy third-party modules are imported lazily: the names below are bound at startup, but each module
+# is only loaded the first time it is actually used (e.g. on export or when a window opens), so the
+# login window is not kept waiting for pandas, openpyxl, PIL and friends.
+from lazy_import import lazy_module, lazy_attribute
+
+# pandas, xlsxwriter and openpyxl for working with Excel files
+pd = lazy_module("pandas")
+xlsxwriter = lazy_module("xlsxwriter")
+openpyxl = lazy_module("openpyxl")
+load_workbook = lazy_attribute("openpyxl", "load_workbook")
+Workbook = lazy_attribute("openpyxl", "Workbook")
+get_column_letter = lazy_attribute("openpyxl.utils", "get_column_letter")
+Font = lazy_attribute("openpyxl.styles", "Font")
+PatternFill = lazy_attribute("openpyxl.styles", "PatternFill")
+Alignment = lazy_attribute("openpyxl.styles", "Alignment")
+Border = lazy_attribute("openpyxl.styles", "Border")
+Side = lazy_attribute("openpyxl.styles", "Side")
+
+# docx module to work with Word documents
+docx = lazy_module("docx")
+
+# DateEntry class from tkcalendar module
+DateEntry = lazy_attribute("tkcalendar", "DateEntry")
+
+# pyautogui module for automating mouse and keyboard actions
+pyautogui = lazy_module("pyautogui")
+
+# Importing pyautogui used to make the process DPI aware before the first window was created; keep doing
+# that up front so window sizes and positions do not depend on when pyautogui is first used
+from platform_support import *
+make_process_dpi_aware()
+
+# Image and ImageTk classes from PIL module
+Image = lazy_module("PIL.Image")
+ImageTk = lazy_module("PIL.ImageTk")
 
 # defining fonts for usage in project
 NORM_FONT = ('times new roman', 13, 'normal')
@@ -69,77 +79,5 @@ XL_FONT = ('times new roman', 20, 'normal')
 L_FONT = ('times new roman', 15, 'normal')
 MAX_ENTRIES_FOR_DISPLAY = 6
 
-database_columns = ("Inward No", "Return Type", "Benefit Type", "Date", "Time", "Gate Entry No",
-                   "Invoice No", "PO No", "BOE No", "Return Date", "Return Time","Supplier", "Material", "Qty", "Department",
-                   "Project", "TPL Name","Vehicle", "Received", "Authorized", "Security", "Remark", "TPL Remarks")
-
-database_fields = [
-            "Inward No", "Return Type", "Benefit Type", "Date", "Time", "Gate Entry No", "Invoice No *", "PO No",
-            "BOE No", "Return Date", "Return Time","Name of the Supplier", "Material Description", "Quantity *", "Department", "Project_Name", "TPL_Name","Vehicle No",
-            "Received Name", "Authorized Sign", "Security Sign", "Remark","TPL Remarks"
-        ]
-
-database_fields_load = [
-            "S.No","Inward No", "Return Type", "Benefit Type", "Date", "Time", "Gate Entry No", "Invoice No", "PO No",
-            "BOE No", "Return Date", "Return Time","Name of the Supplier", "Material Description", "Qty", "Department", "Project_Name", "TPL_Name","Vehicle No",
-            "Received Name", "Authorized Sign", "Security Sign", "Remark","TPL Remarks"
-        ]
-database_columns = [
-    "Inward_No INT",
-    "Return_Type VARCHAR(255)",
-    "Benefit_Type VARCHAR(255)",
-    "Date DATE",
-    "Time TIME",
-    "Gate_Entry_No VARCHAR(255)",
-    "Invoice_No VARCHAR(255)",
-    "PO_No VARCHAR(255)",
-    "BOE_No VARCHAR(255)",
-    "Return_Date DATE",
-    "Return_Time TIME",
-    "Supplier VARCHAR(255)",
-    "Material VARCHAR(255)",
-    "Qty INT",
-    "Department VARCHAR(255)",
-    "Project VARCHAR(255)",
-    "TPL_Name VARCHAR(255)",
-    "Vehicle VARCHAR(255)",
-    "Received VARCHAR(255)",
-    "Authorized VARCHAR(255)",
-    "Security VARCHAR(255)",
-    "Remark TEXT",
-    "TPL_Remarks TEXT"
-]
-
-column_names = [
-    "Inward_No",
-    "Return_Type",
-    "Benefit_Type",
-    "Date",
-    "Time",
-    "Gate_Entry_No",
-    "Invoice_No",
-    "PO_No",
-    "BOE_No",
-    "Return_Date",
-    "Return_Time",
-    "Supplier",
-    "Material",
-    "Qty",
-    "Department",
-    "Project",
-    "TPL_Name",
-    "Vehicle",
-    "Received",
-    "Authorized",
-    "Security",
-    "Remark",
-    "TPL_Remarks"
-]
-
-serverdb_config = {
-    'user': 'forvia',
-    'password': 'password@123',
-    'host': '10.170.140.103',
-    'port': 3306,
-    'database': 'logistic'
-}
\ No newline at end of file
+# Column definitions and settings (see config.py)
+from config import *
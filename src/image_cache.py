@@ -0,0 +1,81 @@
+import glob
+import os
+
+from instrumentation import log_warning
+from platform_support import data_dir
+
+# Background image of the main window
+BACKGROUND_IMAGE_PATH = os.path.join("..", "image", "3-4.jpg")
+
+# The background is drawn at this multiple of the screen size
+BACKGROUND_SCALE = 2
+
+# Pre-scaled variants of images, one file per source image, size and source modification time
+IMAGE_CACHE_DIR = data_dir("image_cache")
+
+# Variants are stored as high-quality JPEG: several times smaller than PNG and faster to decode
+IMAGE_CACHE_QUALITY = 95
+
+
+def scaled_image_path(source_path, size, cache_dir=IMAGE_CACHE_DIR):
+    """
+    Returns the cache file of `source_path` scaled to `size`.
+
+    The source's modification time is part of the name, so replacing the image invalidates its variants.
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    mtime_ns = os.stat(source_path).st_mtime_ns
+    return os.path.join(cache_dir, f"{stem}_{size[0]}x{size[1]}_{mtime_ns}.jpg")
+
+
+def _store_variant(image, cached_path, source_path, cache_dir):
+    """Writes a scaled variant atomically and removes variants made from an older version of the source."""
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = cached_path + ".tmp"
+    image.convert("RGB").save(temp_path, "JPEG", quality=IMAGE_CACHE_QUALITY)
+    os.replace(temp_path, cached_path)
+
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    current_suffix = "_" + cached_path.rsplit("_", 1)[1]
+    for old_path in glob.glob(os.path.join(cache_dir, f"{stem}_*x*_*.jpg")):
+        if not old_path.endswith(current_suffix):
+            os.remove(old_path)
+
+
+def load_scaled_image(source_path, size, cache_dir=IMAGE_CACHE_DIR):
+    """
+    Returns `source_path` scaled to `size` as a decoded PIL image, using the on-disk cache.
+
+    On a cache hit the stored variant is only decoded; on a miss the source is resized once and the result
+    stored for the next start. This does not touch Tk, so it can run on a worker thread; only turning the
+    result into an ImageTk.PhotoImage has to happen on the Tk thread.
+
+    Parameters:
+    source_path (str): The original image file.
+    size (tuple): Target (width, height) in pixels.
+    cache_dir (str): Directory holding the scaled variants.
+
+    Returns:
+    PIL.Image.Image: The loaded image.
+    """
+    from PIL import Image
+
+    cached_path = scaled_image_path(source_path, size, cache_dir)
+    if os.path.exists(cached_path):
+        try:
+            image = Image.open(cached_path)
+            image.load()
+            return image
+        except OSError as e:
+            # A truncated or unreadable variant is simply rebuilt
+            log_warning("ignoring damaged cached image", path=cached_path, error=str(e))
+
+    with Image.open(source_path) as source:
+        image = source.resize(size)
+
+    try:
+        _store_variant(image, cached_path, source_path, cache_dir)
+    except OSError as e:
+        # Without a writable cache the image is still shown, it is just resized again next time
+        log_warning("failed to cache scaled image", error=str(e))
+    return image
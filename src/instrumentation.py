@@ -0,0 +1,224 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+from config import instrumentation_config
+from errors import TaskCancelled
+from platform_support import data_dir
+
+# Directory of the rotating application log
+LOG_DIR = data_dir("logs")
+
+# File name of the application log inside LOG_DIR
+LOG_FILE_NAME = "inward_logistic.log"
+
+# Logger of the whole application: timed operations, slow operations and diagnostics all go here
+app_log = logging.getLogger("inward_logistic")
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formats every record as one JSON object per line, with the fields passed to log_event() as keys."""
+
+    def format(self, record):
+        entry = {"time": self.formatTime(record, "%Y-%m-%d %H:%M:%S"), "level": record.levelname,
+                 "thread": record.threadName, "message": record.getMessage()}
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(log_dir=LOG_DIR, log_level=None, max_bytes=None, backup_count=None):
+    """
+    Attaches the rotating JSON log file to the application logger; called once at startup.
+
+    If the log directory cannot be created, the records go to stderr instead.
+
+    Parameters:
+    log_dir (str): Directory of the log file.
+    log_level (str): Lowest level written, default instrumentation_config['log_level'].
+    max_bytes (int): Size at which the file is rotated, default instrumentation_config['max_bytes'].
+    backup_count (int): Rotated files kept, default instrumentation_config['backup_count'].
+    """
+    if app_log.handlers:
+        return
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(os.path.join(log_dir, LOG_FILE_NAME),
+                                      maxBytes=max_bytes or instrumentation_config['max_bytes'],
+                                      backupCount=backup_count or instrumentation_config['backup_count'],
+                                      encoding="utf-8")
+    except OSError:
+        handler = logging.StreamHandler()
+    handler.setFormatter(JsonLineFormatter())
+    app_log.addHandler(handler)
+    app_log.setLevel(log_level or instrumentation_config['log_level'])
+    # Records stay in this log and are not repeated by the root logger
+    app_log.propagate = False
+
+
+def log_event(message, level=logging.INFO, exc_info=False, **fields):
+    """
+    Writes a structured record to the application log.
+
+    Parameters:
+    message (str): Short description, e.g. "slow operation".
+    level (int): Logging level of the record.
+    exc_info (bool): Add the traceback of the exception being handled.
+    fields: Values written as separate keys of the JSON line.
+    """
+    app_log.log(level, message, exc_info=exc_info, extra={"fields": fields})
+
+
+def log_debug(message, **fields):
+    """Writes a diagnostic record, e.g. an executed query; only written when log_level is 'DEBUG'."""
+    log_event(message, logging.DEBUG, **fields)
+
+
+def log_warning(message, **fields):
+    """Writes a record about a problem the application recovered from, e.g. a failed background poll."""
+    log_event(message, logging.WARNING, **fields)
+
+
+class Timing:
+    """
+    Measurement of one timed operation. The timed code may set `rows` and `bytes` before the block ends.
+    """
+
+    __slots__ = ("operation", "fields", "rows", "bytes", "elapsed_ms", "error")
+
+    def __init__(self, operation, fields):
+        self.operation = operation
+        self.fields = fields
+        self.rows = None
+        self.bytes = None
+        self.elapsed_ms = None
+        self.error = None
+
+
+class PerfRecorder:
+    """
+    Collects the timings of the hot paths (queries, saves, Excel exports, window builds) per operation.
+
+    The latest `sample_size` timings of every operation are kept in memory for the percentiles shown in
+    Settings. Each timing is also written to the application log: operations taking at least `slow_ms`
+    and failed operations as warnings, all others at INFO level, which the default log level leaves out.
+    """
+
+    def __init__(self, slow_ms=500, sample_size=500):
+        """
+        Parameters:
+        slow_ms (float): Milliseconds from which an operation counts as slow.
+        sample_size (int): Timings kept per operation.
+        """
+        self.slow_ms = slow_ms
+        self.sample_size = sample_size
+        self._samples = {}  # operation -> deque of milliseconds
+        self._totals = {}  # operation -> [count, slow, failed, rows]
+        self._lock = threading.Lock()
+
+    def record(self, timing):
+        """Stores a finished Timing and writes it to the log."""
+        slow = timing.elapsed_ms >= self.slow_ms
+        with self._lock:
+            samples = self._samples.get(timing.operation)
+            if samples is None:
+                samples = self._samples[timing.operation] = deque(maxlen=self.sample_size)
+                self._totals[timing.operation] = [0, 0, 0, 0]
+            samples.append(timing.elapsed_ms)
+            totals = self._totals[timing.operation]
+            totals[0] += 1
+            totals[1] += slow
+            totals[2] += timing.error is not None
+            totals[3] += timing.rows or 0
+
+        fields = {"operation": timing.operation, "ms": round(timing.elapsed_ms, 1)}
+        if timing.rows is not None:
+            fields["rows"] = timing.rows
+        if timing.bytes is not None:
+            fields["bytes"] = timing.bytes
+        fields.update(timing.fields)
+        if timing.error is not None:
+            log_event("operation failed", logging.WARNING, error=timing.error, **fields)
+        elif slow:
+            log_event("slow operation", logging.WARNING, **fields)
+        else:
+            log_event("operation", logging.INFO, **fields)
+
+    def get_stats(self):
+        """
+        Returns the timing figures per operation.
+
+        Returns:
+        dict: Operation -> {"count", "slow", "failed", "rows", "p50_ms", "p95_ms", "max_ms"}; the
+              percentiles and the maximum cover the latest `sample_size` timings.
+        """
+        with self._lock:
+            snapshot = {operation: (sorted(samples), list(self._totals[operation]))
+                        for operation, samples in self._samples.items()}
+        stats = {}
+        for operation, (samples, (count, slow, failed, rows)) in snapshot.items():
+            stats[operation] = {"count": count, "slow": slow, "failed": failed, "rows": rows,
+                                "p50_ms": _percentile(samples, 50), "p95_ms": _percentile(samples, 95),
+                                "max_ms": samples[-1]}
+        return stats
+
+    def reset(self):
+        """Forgets every timing, e.g. before measuring after a configuration change."""
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+
+def _percentile(sorted_samples, percent):
+    """Nearest-rank percentile of an ascending, non-empty list."""
+    rank = max(1, -(-percent * len(sorted_samples) // 100))
+    return sorted_samples[rank - 1]
+
+
+_perf_recorder = PerfRecorder(instrumentation_config['slow_ms'], instrumentation_config['sample_size'])
+
+
+def get_perf_recorder():
+    """Returns the application's PerfRecorder."""
+    return _perf_recorder
+
+
+@contextmanager
+def timed(operation, rows=None, **fields):
+    """
+    Times the `with` block with the monotonic performance counter and records it under `operation`.
+
+    Usage:
+        with timed("search.export", archive=True) as timing:
+            ...
+            timing.rows = record_count
+
+    Parameters:
+    operation (str): Name of the operation, e.g. "entry.insert".
+    rows (int): Rows the operation reads or writes, when known up front.
+    fields: Extra values written to the log with the timing.
+
+    Yields:
+    Timing: The measurement; set its `rows` and `bytes` inside the block.
+    """
+    timing = Timing(operation, fields)
+    timing.rows = rows
+    start = time.perf_counter()
+    try:
+        yield timing
+    except TaskCancelled:
+        # Closing a window is not a failure of the operation
+        timing.fields["cancelled"] = True
+        raise
+    except Exception as err:
+        timing.error = f"{type(err).__name__}: {err}"
+        raise
+    finally:
+        timing.elapsed_ms = (time.perf_counter() - start) * 1000
+        _perf_recorder.record(timing)
@@ -0,0 +1,74 @@
+import importlib
+import importlib.util
+import sys
+import threading
+
+
+def lazy_module(name):
+    """
+    Returns a module that is only executed when one of its attributes is first used.
+
+    The module object is registered in sys.modules right away, so a later `import name` anywhere in
+    the application gets the same object. If the module is already loaded it is returned as is.
+
+    Parameters:
+    name (str): Dotted module name, e.g. "pandas" or "PIL.ImageTk".
+
+    Returns:
+    module: The (not yet executed) module.
+
+    Raises:
+    ModuleNotFoundError: If the module is not installed, so a missing dependency still shows at startup.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+class LazyAttribute:
+    """
+    Stands in for `from module import name` until the name is first used.
+
+    The proxy can be called (to create an instance), used in isinstance() checks and have its attributes
+    read; each of these imports the module once and then forwards to the real object.
+    """
+
+    def __init__(self, module_name, attribute):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """Imports the module (once) and returns the real object."""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = getattr(importlib.import_module(self._module_name), self._attribute)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __instancecheck__(self, instance):
+        return isinstance(instance, self.resolve())
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy {self._module_name}.{self._attribute} ({state})>"
+
+
+def lazy_attribute(module_name, attribute):
+    """Returns a LazyAttribute for `from module_name import attribute`."""
+    return LazyAttribute(module_name, attribute)
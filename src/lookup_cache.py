@@ -0,0 +1,166 @@
+import threading
+import time
+
+from storage import db_connection
+from query_builder import quote_column
+
+# Seconds a cached lookup list is served before it is read from the server again
+LOOKUP_CACHE_TTL = 300
+
+# Entry form fields offering autocomplete, mapped to the inward_logistic column their values come from
+LOOKUP_FIELDS = {
+    "Name of the Supplier": "Supplier",
+    "Department": "Department",
+    "TPL_Name": "TPL_Name"
+}
+
+# Cache key of the project list
+PROJECTS_KEY = "projects"
+
+
+class LookupCache:
+    """
+    A small thread-safe cache for lookup lists (project names, distinct column values) with a TTL.
+
+    Values are loaded on first use by the loader passed to `get()` and served from memory until they
+    are older than `ttl` seconds or explicitly invalidated after a write. Jobs on the task executor and
+    the Tk thread may use the cache at the same time.
+
+    Attributes:
+    stats (dict): Counters for hits (served from memory), misses (loaded from the server),
+                  expired entries and invalidations.
+    """
+
+    def __init__(self, ttl=LOOKUP_CACHE_TTL):
+        """
+        Parameters:
+        ttl (float): Seconds an entry stays valid after it was loaded.
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Bumped by invalidate(), so a load that raced with a write does not cache the old list
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "invalidations": 0}
+
+    def get(self, key, loader):
+        """
+        Returns the cached list for `key`, calling `loader()` when it is missing or expired.
+
+        Parameters:
+        key (str): Cache key, e.g. PROJECTS_KEY or a column name.
+        loader (callable): Function returning the fresh list; it may raise, in which case nothing is cached.
+
+        Returns:
+        list: A copy of the cached list, so callers may modify it freely.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                loaded_at, values = entry
+                if time.monotonic() - loaded_at < self.ttl:
+                    self.stats["hits"] += 1
+                    return list(values)
+                self.stats["expired"] += 1
+                del self._entries[key]
+            self.stats["misses"] += 1
+            generation = self._generation
+
+        # Load outside the lock so a slow query does not block readers of other keys
+        values = list(loader())
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic(), values)
+        return list(values)
+
+    def add(self, key, value):
+        """Adds a value just written to the database to a cached list, keeping it sorted."""
+        if not value:
+            return
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and value not in entry[1]:
+                entry[1].append(value)
+                entry[1].sort()
+
+    def invalidate(self, key=None):
+        """Drops one entry, or every entry when key is None, so the next get() reloads it."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._generation += 1
+            self.stats["invalidations"] += 1
+
+    def get_stats(self):
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+        dict: hits, misses, expired, invalidations and the number of cached entries.
+        """
+        with self._lock:
+            snapshot = dict(self.stats)
+            snapshot["entries"] = len(self._entries)
+        return snapshot
+
+
+_lookup_cache = LookupCache()
+
+
+def get_lookup_cache():
+    """Returns the application's lookup cache."""
+    return _lookup_cache
+
+
+def fetch_project_names():
+    """Reads the project names from the 'projects' table."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT project_name FROM projects")
+        projects = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return projects
+
+
+def fetch_distinct_values(column):
+    """
+    Reads the distinct non-empty values of an inward_logistic column, sorted.
+
+    The result is cached (see cached_distinct_values), so the scan runs at most once per TTL.
+    """
+    quoted = quote_column(column)
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT DISTINCT {quoted} FROM inward_logistic "
+                       f"WHERE {quoted} IS NOT NULL AND {quoted} <> '' ORDER BY {quoted}")
+        values = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return values
+
+
+def cached_project_names():
+    """Returns the project names, served from the lookup cache."""
+    return _lookup_cache.get(PROJECTS_KEY, fetch_project_names)
+
+
+def cached_distinct_values(column):
+    """Returns the distinct values of an inward_logistic column, served from the lookup cache."""
+    return _lookup_cache.get(column, lambda: fetch_distinct_values(column))
+
+
+def invalidate_project_names():
+    """Forgets the cached project list; call after the projects table was written."""
+    _lookup_cache.invalidate(PROJECTS_KEY)
+
+
+def remember_lookup_values(values_by_column):
+    """
+    Adds the values of a record just saved to the cached autocomplete lists.
+
+    Parameters:
+    values_by_column (dict): Column name -> value, e.g. {"Supplier": "ACME"}.
+    """
+    for column, value in values_by_column.items():
+        _lookup_cache.add(column, value)
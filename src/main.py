@@ -2,6 +2,7 @@ from search import *
 from settings import *
 from entry import *
 from edit import *
+from dashboard import *
 
 class Logistics:
     """
@@ -25,168 +26,32 @@ class Logistics:
         The main window is where various GUI components such as labels, buttons, and data displays
         will be placed.
         """
-        self.initialize_user_database()
-        self.initialize_logistic_database()
-        self.initialize_projects_table()
-        print("Database initialization finished")
-        self.main_window(master)
+        self.master = master
 
-    def initialize_logistic_database(self):
-        """
-        Function to initialize the MySQL database for storing inward logistics data.
-        This function ensures that a specific database and table exist.
-        If the table does not exist, it creates a new one with predefined columns.
-        """
+        # Background of the main window; the PhotoImage is built once and kept across logout/login
+        self.background_canvas = None
+        self.background_image = None
 
-        # Database connection details
-        db_config = serverdb_config
+        # Entry, Search and Edit windows are built once and reused until logout
+        self.windows = WindowManager()
 
-        # Define the columns for the table
-        columns = database_columns
-        try:
-            # Create the database connection
-            conn = mysql.connector.connect(**db_config)
-            cursor = conn.cursor()
-
-            # Create the database if it does not exist
-            cursor.execute("CREATE DATABASE IF NOT EXISTS logistic")
-
-            # Use the created database
-            cursor.execute("USE logistic")
-
-            # Create the table if it does not exist
-            cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS inward_logistic (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    {', '.join(columns)}
-                )
-            """)
-
-            # Close the database connection
-            cursor.close()
-            conn.close()
-        except mysql.connector.Error as err:
-            # Show an error messagebox if the connection to the server fails
-            root = tk.Tk()
-            root.withdraw()  # Hides the root window
-            if messagebox.showerror("Connection Error", "Could not connect to server"):
-                root.destroy()
-                sys.exit(1)  # Exit the application with a non-zero status code
-            print(f"Error: {err}")
-
-    def initialize_user_database(self):
-        """
-        Function to initialize the user database for storing login credentials.
-
-        This function ensures that a specific table exists within the logistic database.
-        If the table does not exist, it creates a new one with predefined columns.
-        """
-
-        # Define the database connection details
-        # This includes the host, username, password, and database name
-        # We are using the same database configuration as the server database
-        db_config = serverdb_config
-
-        # Define the columns for the login_users table
-        # We have three columns: user_name, password, and category
-        # Each column is defined with a specific data type and length
-        columns = [
-            "user_name VARCHAR(255)",  # Stores the username as a string
-            "password VARCHAR(255)",  # Stores the password as a string
-            "category VARCHAR(255)"  # Stores the user category as a string
-        ]
-        try:
-            # Create a connection to the MySQL database
-            conn = mysql.connector.connect(**db_config)
-            cursor = conn.cursor()
-
-            # Use the existing logistic database
-            cursor.execute("USE logistic")
-
-            # Create the login_users table if it does not exist
-            cursor.execute(f""" 
-                CREATE TABLE IF NOT EXISTS login_users (
-                    sno INT AUTO_INCREMENT PRIMARY KEY,
-                    {', '.join(columns)}
-                )
-            """)
-
-            # Check if the login_users table is empty
-            cursor.execute("SELECT * FROM login_users")
-            rows = cursor.fetchall()
-
-            if not rows:
-                # Create a default admin user if the table is empty
-                current_month = datetime.now().month
-                current_year = datetime.now().year
-                admin_password = f"password@{current_month}{current_year}"
-                cursor.execute("INSERT INTO login_users (user_name, password, category) VALUES (%s, %s, %s)",
-                               ("Admin", admin_password, "Admin"))
-                conn.commit()
-            else:
-                # Check if the admin user exists and update the password if necessary
-                cursor.execute("SELECT * FROM login_users WHERE user_name = %s", ("Admin",))
-                admin_row = cursor.fetchone()
-                if admin_row:
-                    current_month = datetime.now().month
-                    current_year = datetime.now().year
-                    expected_password = f"password@{current_month}{current_year}"
-                    if admin_row[2] != expected_password:
-                        cursor.execute("UPDATE login_users SET password = %s WHERE user_name = %s",
-                                       (expected_password, "Admin"))
-                        conn.commit()
-
-            # Close the cursor and connection objects
-            cursor.close()
-            conn.close()
-
-        except mysql.connector.Error as err:
-            # Show an error messagebox if the connection to the server fails
-            root = tk.Tk()
-            root.withdraw()  # Hides the root window
-            if messagebox.showerror("Connection Error", "Could not connect to server"):
-                root.destroy()
-                sys.exit(1)  # Exit the application with a non-zero status code
-            print(f"Error: {err}")
+        # Timings of slow operations and other diagnostics go to the rotating log (see instrumentation.py)
+        configure_logging()
+        self.initialize_database()
+        self.main_window(master)
 
-    def initialize_projects_table(self):
+    def initialize_database(self):
         """
-        Function to initialize the projects table within the logistic database.
+        Function to make sure the logistic database schema is ready before the login window is shown.
 
-        This function ensures that a specific table exists within the logistic database.
-        If the table does not exist, it creates a new one with predefined columns.
+        The schema bootstrap (see schema.py) checks the stored schema version in a single query and
+        only runs the table creation and column migrations when `database_columns` or the other table
+        definitions have changed. It also creates the default Admin user and rotates its monthly password.
         """
-
-        # Define the database connection details
-        db_config = serverdb_config
-
-        # Define the columns for the projects table
-        columns = [
-            "project_name VARCHAR(100)",
-            "tpl_name VARCHAR(50)"
-        ]
-
         try:
-            # Create a connection to the MySQL database
-            conn = mysql.connector.connect(**db_config)
-            cursor = conn.cursor()
-
-            # Use the existing logistic database
-            cursor.execute("USE logistic")
-
-            # Create the projects table if it does not exist
-            cursor.execute(f""" 
-                CREATE TABLE IF NOT EXISTS projects (
-                    SNo INT AUTO_INCREMENT PRIMARY KEY,
-                    {', '.join(columns)}
-                )
-            """)
-
-            # Close the cursor and connection objects
-            cursor.close()
-            conn.close()
-
-        except mysql.connector.Error as err:
+            with timed("schema.bootstrap"):
+                bootstrap_schema()
+        except get_storage().Error as err:
             # Show an error messagebox if the connection to the server fails
             root = tk.Tk()
             root.withdraw()  # Hides the root window
@@ -195,19 +60,22 @@ class Logistics:
             if response:
                 root.destroy()
                 sys.exit(1)  # Exit the application with a non-zero status code
-            print(f"Error: {err}")
+            log_warning("database connection failed", error=str(err))
 
     def data_entry_window(self,master):
-        obj_dataEntry = DataEntryWindow(master)
+        obj_dataEntry = self.windows.show("entry", lambda: DataEntryWindow(master))
 
     def search_window(self,master):
-        obj_search = SearchWindow(master,None)
+        obj_search = self.windows.show("search", lambda: SearchWindow(master,None))
 
     def settings_window(self,master):
         obj_settings = SettingsWindow(master)
 
     def edit_window(self,master):
-        obj_edit = EditWindow(master,None)
+        obj_edit = self.windows.show("edit", lambda: EditWindow(master,None))
+
+    def dashboard_window(self,master):
+        obj_dashboard = self.windows.show("dashboard", lambda: DashboardWindow(master))
 
     def validate_numeric_input(self,input_str):
         """
@@ -244,74 +112,52 @@ class Logistics:
             return
 
         # Get user's default download directory
-        download_dir = str(Path.home() / "Downloads")
+        download_dir = downloads_dir()
         destination_path = os.path.join(download_dir, file_name)
 
-        try:
-            # Connect to the database
-            connection = mysql.connector.connect(**serverdb_config)
-
-            # Query to fetch data from the table
-            query = "SELECT * FROM inward_logistic"
-
-            # Use pandas to read the data from the database
-            df = pd.read_sql(query, connection)
-
-            # Save the dataframe to an Excel file
-            df.to_excel(destination_path, index=False)
-
-            # Close the database connection
-            connection.close()
-
-            # Load the workbook and worksheet
-            wb = load_workbook(destination_path)
-            ws = wb.active
-
-            # Set font and alignment
-            font = Font(name='Bookman Old Style', size=11)
-            alignment = Alignment(horizontal='center',vertical = 'center', wrap_text=True)
+        executor = get_task_executor(self.master)
+        # A download is already running for the main window; a second one would write the same file
+        if executor.is_busy(self.master):
+            return
 
-            # Apply formatting to all cells
-            for row in ws.iter_rows():
-                for cell in row:
-                    cell.font = font
-                    cell.alignment = alignment
+        def run_download(task):
+            # Stream the rows from an unbuffered cursor straight into the workbook in a single pass
+            return export_register(destination_path, progress=task.report_progress)
 
-            # Set column width and wrap text
-            for col in ws.columns:
-                col_letter = col[0].column_letter
-                if col_letter in ['A', 'B','C', 'D','E', 'F','G', 'H','I', 'J','K', 'L']:  # First and second columns
-                    ws.column_dimensions[col_letter].width = 20
-                else:  # All other columns
-                    ws.column_dimensions[col_letter].width = 50
+        # Show the export progress in the title bar of the main window
+        title = self.master.title()
 
-            # Save the formatted workbook
-            wb.save(destination_path)
+        def show_progress(record_count):
+            self.master.title(f"{title} - Downloading... {record_count} records")
 
+        def show_downloaded(record_count):
+            self.master.title(title)
             messagebox.showinfo("Success", f"'{file_name}' has been downloaded successfully to {download_dir}")
 
-            # Open the Downloads directory in File Explorer
+            # Open the Downloads directory in the file manager
             try:
-                subprocess.Popen(["explorer", download_dir], shell=True)
+                open_folder(download_dir)
             except Exception as e:
-                print(f"Warning: Failed to open Downloads directory: {e}")
+                log_warning("failed to open the Downloads directory", error=str(e))
 
             # Open the downloaded Excel file
             try:
-                os.startfile(destination_path)  # Works on Windows
+                open_file(destination_path)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to open the file: {str(e)}")
 
-        except Exception as e:
+        def show_error(e):
+            self.master.title(title)
             messagebox.showerror("Error", f"Failed to download the file: {str(e)}")
 
+        executor.submit(run_download, on_success=show_downloaded, on_error=show_error, on_progress=show_progress,
+                        owner=self.master)
+
     def download_filteredData(self,file_name, status_label):
         source_path = file_name
 
-        print("download_filteredData-> ", source_path)
-
         # Get user's default download directory
-        download_dir = str(Path.home() / "Downloads")
+        download_dir = downloads_dir()
         destination_path = os.path.join(download_dir, "Filtered_Inward_Material.xlsx")
 
         if os.path.exists(source_path):
@@ -323,13 +169,13 @@ class Logistics:
                 # Open the Downloads directory in File Explorer, handle errors
                 '''
                 try:
-                    subprocess.Popen(["explorer", download_dir], shell=True)
+                    open_folder(download_dir)
                 except Exception as e:
                     print(f"Warning: Failed to open Downloads directory: {e}")
 
                 # Open the downloaded Excel file
                 try:
-                    os.startfile(destination_path)  # Works on Windows
+                    open_file(destination_path)
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to open the file: {str(e)}")
                 '''
@@ -339,9 +185,22 @@ class Logistics:
             messagebox.showerror("Error", f"'{source_path}' does not exist.")
 
     def logout_function(self,master):
-        """Handles logout logic by resetting the screen and showing the login window again."""
-        #master.destroy()  # Close the main screen
-        self.main_window(master)  # Reopen login window
+        """
+        Handles logout logic by resetting the screen and showing the login window again.
+
+        The main window, its canvas and the background image stay as they are; only the buttons and the
+        reusable windows of the logged-in user are removed, so nothing has to be reloaded for the next login.
+        """
+        for widget in master.place_slaves():
+            widget.destroy()
+        self.windows.destroy_all()
+        get_change_feed(master).stop()
+        get_return_tracker(master).stop()
+        get_register_replica(master).stop()
+        master.unbind('<Escape>')
+        # The layout callback of the main screen refers to the buttons destroyed above
+        master.unbind(SCALING_CHANGED_EVENT)
+        self.login_window(master)  # Reopen login window
 
     def designMainScreen(self, master, username, category):
         """
@@ -364,68 +223,100 @@ class Logistics:
         master.lift()  # Bring the window to the front
         master.focus_force()  # Set focus to the main window
 
-        # Debugging output to confirm username
-        print("User name:", username)
+        # Poll for entries saved at the other gates and push them into the open windows
+        get_change_feed(master).start()
+
+        # Keep the list of overdue and due-soon returnable material current
+        get_return_tracker(master).start()
+
+        # Keep the local copy of the register current, if enabled; the Search and Edit windows search it
+        get_register_replica(master).start()
+
+        # Send the entries queued at this gate, including those left over from an earlier session. The sync
+        # keeps running after a logout so queued entries still reach the server while nobody is logged in.
+        get_entry_sync(master).start()
+
+        log_debug("main screen opened", user=username, category=category)
+
+        # Fonts and positions are scaled for the main window's DPI; the factor is resolved once per window
+        scaling = get_display_scaling()
+        fonts = scaling.fonts(master)
 
         # Create a label for the application title
         labelFrame = Label(master, text="Inward Logistic Handling", justify=CENTER,
-                           font=XXL_FONT, fg='black')
+                           font=fonts["XXL_FONT"], fg='black')
 
         # Create and configure the "Inward Entry" button
         # This button opens the data entry window
         result_btnAddQuestion = partial(self.data_entry_window, master)
         btn_addQues = Button(master, text="Inward Entry", fg="Black", command=result_btnAddQuestion,
-                             font=XL_FONT, width=20, state=NORMAL, bg='RosyBrown1')
+                             font=fonts["XL_FONT"], width=20, state=NORMAL, bg='RosyBrown1')
 
         # Create and configure the "Search" button
         # This button opens the search window
         result_createPaper = partial(self.search_window, master)
         btn_createPaper = Button(master, text="Search", fg="Black", command=result_createPaper,
-                                 font=XL_FONT, width=20, state=NORMAL, bg='RosyBrown1')
+                                 font=fonts["XL_FONT"], width=20, state=NORMAL, bg='RosyBrown1')
 
-        # Initialize btn_edit and btn_settings as None; only used if the user is an Admin
+        # Initialize btn_edit, btn_settings and btn_dashboard as None; only used if the user is an Admin
         btn_edit = None
         btn_settings = None
+        btn_dashboard = None
 
         if category == "Admin":
             # Create and configure the "Edit" button for Admin users only
             btn_edit = Button(master, text="Edit Record", fg="Black", command=lambda: self.edit_window(master),
-                              font=XL_FONT, width=20, state=NORMAL, bg='RosyBrown1')
+                              font=fonts["XL_FONT"], width=20, state=NORMAL, bg='RosyBrown1')
 
             # Create and configure the "Settings" button for Admin users only
             btn_settings = Button(master, text="Settings", fg="Black", command=lambda: self.settings_window(master),
-                                  font=XL_FONT, width=20, state=NORMAL, bg='RosyBrown1')
+                                  font=fonts["XL_FONT"], width=20, state=NORMAL, bg='RosyBrown1')
+
+            # Create and configure the "Dashboard" button for Admin users only
+            btn_dashboard = Button(master, text="Dashboard", fg="Black", command=lambda: self.dashboard_window(master),
+                                   font=fonts["XL_FONT"], width=20, state=NORMAL, bg='RosyBrown1')
 
         # Create and configure the "Download" button
         # This button allows users to download the inward register
         result_downloadmaster = partial(self.download_inward_register, "master")
         btn_usrCtrl = Button(master, text="Download", fg="Black", command=result_downloadmaster,
-                             font=XL_FONT, width=20, state=NORMAL, bg='RosyBrown1')
+                             font=fonts["XL_FONT"], width=20, state=NORMAL, bg='RosyBrown1')
 
         # Create and configure the "Logout" button
         # This button calls the logout function and hides the main window
         btn_logout = Button(master, text="Logout", fg="Black", command=lambda: self.logout_function(master),
-                            font=XL_FONT, width=20, state=NORMAL, bg='RosyBrown1')
+                            font=fonts["XL_FONT"], width=20, state=NORMAL, bg='RosyBrown1')
 
         # Create and configure the "Exit" button
         # This button terminates the application
         btn_exit = Button(master, text="Exit", fg="Black", command=master.destroy,
-                          font=XL_FONT, width=20, state=NORMAL, bg='RosyBrown1')
+                          font=fonts["XL_FONT"], width=20, state=NORMAL, bg='RosyBrown1')
 
-        # Position the buttons on the screen using absolute placement
-        btn_addQues.place(x=65, y=220)  # Position "Inward Entry" button
-        btn_createPaper.place(x=65, y=275)  # Position "Search" button
+        # Panel with the returnable material that is overdue or due soon, right of the buttons
+        returns_panel = ReturnsPanel(master)
 
+        # Number of entries saved at this gate that have not reached the server yet, above the buttons
+        sync_status = SyncStatusLabel(master)
+
+        # Position the buttons on the screen using absolute placement, in pixels at 96 DPI
         if btn_edit:  # If the user is an Admin, include the "Edit" button
-            btn_edit.place(x=65, y=330)  # Position "Edit" button
-            btn_usrCtrl.place(x=65, y=385)  # Position "Download" button
-            btn_settings.place(x=65, y=440)  # Position "Settings" button
-            btn_logout.place(x=65, y=495)  # Position "Logout" button
-            btn_exit.place(x=65, y=550)  # Position "Exit" button
+            positions = [(btn_addQues, 220), (btn_createPaper, 275), (btn_edit, 330), (btn_usrCtrl, 385),
+                         (btn_settings, 440), (btn_dashboard, 495), (btn_logout, 550), (btn_exit, 605)]
         else:  # If the user is not an Admin, exclude "Edit" and "Settings" and adjust button placement
-            btn_usrCtrl.place(x=65, y=330)  # Position "Download" button
-            btn_logout.place(x=65, y=385)  # Position "Logout" button
-            btn_exit.place(x=65, y=440)  # Position "Exit" button
+            positions = [(btn_addQues, 220), (btn_createPaper, 275), (btn_usrCtrl, 330), (btn_logout, 385),
+                         (btn_exit, 440)]
+
+        def place_widgets(event=None):
+            # Called again when the window moved to a monitor with another scaling factor
+            for button, y in positions:
+                button.configure(font=scaling.font("XL_FONT", master))
+                button.place(x=scaling.scaled(65, master), y=scaling.scaled(y, master))
+            labelFrame.configure(font=scaling.font("XXL_FONT", master))
+            returns_panel.place(relx=0.55, y=scaling.scaled(220, master))
+            sync_status.place(x=scaling.scaled(65, master), y=scaling.scaled(170, master))
+
+        place_widgets()
+        master.bind(SCALING_CHANGED_EVENT, place_widgets)
 
         # Bind the 'Escape' key to trigger the Exit button
         master.bind('<Escape>', lambda event=None: btn_exit.invoke())
@@ -578,53 +469,42 @@ class Logistics:
         login_window (tk.Toplevel): The login window, which will be closed upon successful login.
         """
 
-        # Define the database connection details
-        db_config = serverdb_config
-
-        # Initialize login validation flag as False
-        bLoginValid = False
+        # Read the credentials on the Tk thread; the lookup itself runs in the background
+        user_name = userNameText.get().strip()
+        password = passwordText.get().strip()
 
-        # Variable to store the user's category (e.g., "User" or "Admin")
-        category = None
+        def check_credentials(task):
+            # Borrow a pooled connection to the logistic database
+            with timed("login.check"), db_connection() as conn:
+                cursor = conn.cursor()
 
-        try:
-            # Create a connection to the MySQL database
-            conn = mysql.connector.connect(**db_config)
-            cursor = conn.cursor()
-
-            # Use the existing logistic database
-            cursor.execute("USE logistic")
+                # ------------------------- Step 1: Validate User Credentials ------------------------- #
 
-            # ------------------------- Step 1: Validate User Credentials ------------------------- #
+                # Prepare the query to select the user with the given username and password
+                query = "SELECT * FROM login_users WHERE user_name = %s AND password = %s"
 
-            # Prepare the query to select the user with the given username and password
-            query = "SELECT * FROM login_users WHERE user_name = %s AND password = %s"
+                # Execute the query with the given username and password
+                cursor.execute(query, (user_name, password))
 
-            # Execute the query with the given username and password
-            cursor.execute(query, (userNameText.get().strip(), passwordText.get().strip()))
+                # Fetch the result
+                row = cursor.fetchone()
 
-            # Fetch the result
-            row = cursor.fetchone()
+                # Close the cursor; the connection goes back to the pool
+                cursor.close()
 
-            # Check if a matching record is found
-            if row:
-                bLoginValid = True  # Mark login as valid
-                category = row[3]  # Store the user's category (e.g., "User" or "Admin")
-
-            # Close the cursor and connection objects
-            cursor.close()
-            conn.close()
+            # Return the user's category (e.g., "User" or "Admin"), or None if no matching record is found
+            return row[3] if row else None
 
+        def handle_login(category):
             # ------------------------- Step 2: Handle Login Success or Failure ------------------------- #
 
             # If login is valid and the user belongs to an allowed category
-            if bLoginValid and category in ["User", "Admin"]:
+            if category in ["User", "Admin"]:
                 # Update the login label to indicate success
                 labelLogin.configure(fg='green')
                 labelLogin['text'] = "Login Success!!"
 
-                # Print authentication success message to console
-                print("Authentication Success for user:", userNameText.get())
+                log_debug("login succeeded", user=user_name)
 
                 # Retrieve the username from the input field
                 un = userNameText.get()
@@ -645,7 +525,7 @@ class Logistics:
                 # Set focus back to the password field for easy re-entry
                 passwordText.focus()
 
-        except mysql.connector.Error as err:
+        def handle_error(err):
             # Show an error messagebox if the connection to the server fails
             root = tk.Tk()
             root.withdraw()  # Hides the root window
@@ -654,7 +534,12 @@ class Logistics:
             if response:
                 root.destroy()
                 sys.exit(1)  # Exit the application with a non-zero status code
-            print(f"Error: {err}")
+            log_warning("database connection failed", error=str(err))
+
+        executor = get_task_executor(login_window)
+        # Ignore repeated Login clicks while the credentials are being checked
+        if not executor.is_busy(login_window):
+            executor.submit(check_credentials, on_success=handle_login, on_error=handle_error, owner=login_window)
 
     def clear_loginForm(self,userNameText, passwordText):
         """
@@ -685,6 +570,28 @@ class Logistics:
         # Set the focus back to the username entry field for user convenience
         userNameText.focus_set()
 
+    def load_background_image(self, size):
+        """
+        Draws the background image on the main window's canvas.
+
+        A pre-scaled copy for this screen size is read from the image cache (or made once and stored) on a
+        worker thread; only the PhotoImage is created on the Tk thread.
+
+        Parameters:
+        size (tuple): Size (width, height) of the image in pixels.
+        """
+        def show_background(image):
+            # Keep a reference; Tk drops images that are no longer referenced from Python
+            self.background_image = ImageTk.PhotoImage(image)
+            self.background_canvas.create_image(0, 0, anchor="nw", image=self.background_image)
+
+        def show_error(err):
+            log_warning("failed to load the background image", error=str(err))
+
+        get_task_executor(self.background_canvas).submit(
+            lambda task: load_scaled_image(BACKGROUND_IMAGE_PATH, size),
+            on_success=show_background, on_error=show_error, owner=self.background_canvas, busy=False)
+
     # set up the root window
     def main_window(self,root):
         """
@@ -700,8 +607,9 @@ class Logistics:
         # Set the title of the window
         root.title("Inward Logistic Maintenance")
 
-        # Get the screen width and height using pyautogui
-        width, height = pyautogui.size()
+        # Get the screen width and height from Tk (same values as pyautogui.size() for the DPI-aware process,
+        # without loading pyautogui before the login window is shown)
+        width, height = root.winfo_screenwidth(), root.winfo_screenheight()
 
         # Define the geometry of the window dynamically based on screen size
         # Window width is set to 1.35 times smaller than the screen width
@@ -717,21 +625,18 @@ class Logistics:
         # ---------------- Setup Canvas for Background Image ---------------- #
 
         # Get screen dimensions again to set up a full-size canvas
-        canvas_width, canvas_height = pyautogui.size()
+        canvas_width, canvas_height = width, height
 
         # Create a Canvas widget with the full screen dimensions
         canvas = Canvas(root, width=canvas_width, height=canvas_height)
 
-        # Load and resize the background image to twice the screen size for better resolution
-        myimage = ImageTk.PhotoImage(
-            Image.open("..\\image\\3-4.jpg").resize((canvas_width * 2, canvas_height * 2))
-        )
-
-        # Place the image at the top-left corner of the canvas (0,0) with 'nw' (northwest) anchor
-        canvas.create_image(0, 0, anchor="nw", image=myimage)
-
         # Pack the canvas into the root window to make it visible
         canvas.pack()
+        self.background_canvas = canvas
+
+        # The background image (twice the screen size for better resolution) is loaded in the background,
+        # so the login window shows right away and the image appears as soon as it is ready
+        self.load_background_image((canvas_width * BACKGROUND_SCALE, canvas_height * BACKGROUND_SCALE))
 
         # Call the function to display the login window, passing the root window as a parameter
         self.login_window(root)
@@ -743,4 +648,9 @@ class Logistics:
 root = tk.Tk()
 logistics_obj = Logistics(root)
 
+# Stop the background workers and close the pooled database connections once the GUI has exited
+shutdown_task_executor()
+get_storage().close()
+get_register_replica(root).close()
+
 
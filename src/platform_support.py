@@ -0,0 +1,162 @@
+import ctypes
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# The gates run Windows; everything below falls back to portable behaviour on other systems
+IS_WINDOWS = sys.platform == "win32"
+
+# Environment variable that moves the data directory, e.g. to a scratch directory for a load test
+DATA_DIR_ENV = "INWARD_LOGISTIC_DATA_DIR"
+
+# The shared register workbooks live in this folder of the user's OneDrive on the gate PCs
+ONEDRIVE_FOLDER_NAME = "OneDrive - FORVIA"
+SHARED_FOLDER_NAME = "Inward_logistic_master"
+
+# DPI at which the scaling factor is 1.0
+BASE_DPI = 96
+
+_get_dpi_for_window = None
+
+
+def make_process_dpi_aware():
+    """Makes window sizes and positions use physical pixels on Windows; does nothing elsewhere."""
+    if IS_WINDOWS:
+        ctypes.windll.user32.SetProcessDPIAware()
+
+
+def _dpi_for_window(hwnd):
+    """Windows only: returns GetDpiForWindow(hwnd), 0 for an invalid handle."""
+    global _get_dpi_for_window
+    if _get_dpi_for_window is None:
+        _get_dpi_for_window = ctypes.windll.user32.GetDpiForWindow
+        _get_dpi_for_window.restype = ctypes.c_int
+        _get_dpi_for_window.argtypes = [ctypes.c_void_p]
+    return _get_dpi_for_window(hwnd)
+
+
+def get_scaling_factor(widget=None):
+    """
+    Returns the display scaling factor, 1.0 at 96 DPI.
+
+    On Windows this is the DPI of the foreground window. Elsewhere it is read from Tk through `widget`, and
+    without a widget (headless) it is 1.0.
+
+    Parameters:
+    widget (tk.Widget): Any widget on the display, used where the operating system is not asked directly.
+    """
+    if IS_WINDOWS:
+        dpi = _dpi_for_window(ctypes.windll.user32.GetForegroundWindow())
+        if dpi:
+            return dpi / BASE_DPI
+    if widget is not None:
+        return widget.winfo_fpixels("1i") / BASE_DPI
+    return 1.0
+
+
+def window_scaling_factor(widget):
+    """
+    Returns the scaling factor of the monitor that shows `widget`'s window, 1.0 at 96 DPI.
+
+    Unlike get_scaling_factor() this asks about the window itself, so it is right even while another
+    application has the focus, and per monitor when the monitors have different DPI settings.
+
+    Parameters:
+    widget (tk.Widget): Any widget of the window.
+    """
+    if IS_WINDOWS:
+        # GetDpiForWindow answers for the top-level window of any child window handle
+        dpi = _dpi_for_window(widget.winfo_id())
+        if dpi:
+            return dpi / BASE_DPI
+    return widget.winfo_fpixels("1i") / BASE_DPI
+
+
+def window_monitor(widget):
+    """
+    Returns a value that changes when `widget`'s window moves to another monitor: the monitor handle on
+    Windows, the X screen elsewhere.
+    """
+    if IS_WINDOWS:
+        # MONITOR_DEFAULTTONEAREST
+        return ctypes.windll.user32.MonitorFromWindow(ctypes.c_void_p(widget.winfo_id()), 2)
+    return widget.winfo_screen()
+
+
+def data_dir(*parts):
+    """
+    Returns the path of a directory for the application's own files (caches, logs); the caller creates it.
+
+    It is ~/.inward_logistic on every system unless INWARD_LOGISTIC_DATA_DIR points elsewhere.
+
+    Parameters:
+    parts (str): Subdirectories, e.g. "logs".
+    """
+    base = os.environ.get(DATA_DIR_ENV) or os.path.join(str(Path.home()), ".inward_logistic")
+    return os.path.join(base, *parts)
+
+
+def shared_register_dir():
+    """
+    Returns the folder of the shared register workbooks (master register, filtered search results).
+
+    On the gate PCs this is the Inward_logistic_master folder of the user's OneDrive; without a Windows user
+    profile it is a folder of the same name in data_dir().
+    """
+    profile = os.environ.get("USERPROFILE")
+    if profile:
+        return os.path.join(profile, ONEDRIVE_FOLDER_NAME, SHARED_FOLDER_NAME)
+    path = data_dir(SHARED_FOLDER_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def downloads_dir():
+    """Returns the user's Downloads folder; on Linux the XDG download directory when one is configured."""
+    if not IS_WINDOWS:
+        xdg_dir = _xdg_user_dir("DOWNLOAD")
+        if xdg_dir:
+            return xdg_dir
+    return str(Path.home() / "Downloads")
+
+
+def _xdg_user_dir(name):
+    """Reads XDG_<name>_DIR from ~/.config/user-dirs.dirs, or returns None."""
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(str(Path.home()), ".config")
+    try:
+        with open(os.path.join(config_home, "user-dirs.dirs"), encoding="utf-8") as dirs_file:
+            for line in dirs_file:
+                key, _, value = line.strip().partition("=")
+                if key == f"XDG_{name}_DIR":
+                    path = value.strip('"').replace("$HOME", str(Path.home()))
+                    return path if os.path.isdir(path) else None
+    except OSError:
+        pass
+    return None
+
+
+def open_file(path):
+    """
+    Opens a file with its default application (Excel for the exported workbooks).
+
+    Raises:
+    OSError: If there is no application to open it with.
+    """
+    if IS_WINDOWS:
+        os.startfile(path)
+    else:
+        subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", path])
+
+
+def open_folder(path):
+    """
+    Shows a folder in the file manager.
+
+    Raises:
+    OSError: If no file manager could be started.
+    """
+    if IS_WINDOWS:
+        subprocess.Popen(["explorer", path], shell=True)
+    else:
+        subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", path])
@@ -0,0 +1,234 @@
+import re
+
+from config import database_columns, column_names
+
+# Operators offered in the filter rows of the Search and Edit windows. "Contains" and "Not Contains" match the
+# value anywhere in the text and are each other's complement; "Contains Word" matches whole words that start
+# with the typed words, in any order, which a FULLTEXT index can answer.
+FILTER_OPERATORS = ["Equals", "Not Equals", "Starts With", "Contains", "Contains Word", "Not Contains"]
+
+# Every column of inward_logistic, starting with the primary key, in table order
+inward_select_columns = ["id"] + column_names
+
+# Column name -> SQL type (e.g. "Date" -> "DATE"), taken from the table definition in header.py
+column_types = {definition.split(" ", 1)[0]: definition.split(" ", 1)[1].upper() for definition in database_columns}
+column_types["id"] = "INT"
+
+# Shortest word InnoDB puts into a FULLTEXT index (innodb_ft_min_token_size default)
+FULLTEXT_MIN_WORD_LENGTH = 3
+
+# Escape character of the LIKE patterns, named in every LIKE with ESCAPE. MySQL escapes with a backslash by
+# default and SQLite has no default, so the patterns name one both read the same way.
+LIKE_ESCAPE = "!"
+
+# Words of a "Contains Word" value
+FULLTEXT_WORD_PATTERN = re.compile(r"\w+")
+
+# A partial date typed into a "Contains" filter on a DATE column: "2024" or "2024-05"
+PARTIAL_DATE_PATTERN = re.compile(r"^(\d{4})(?:-(\d{1,2}))?$")
+
+
+def escape_like(value):
+    """Escapes the LIKE wildcards in a user value so that '%' and '_' are matched literally (see LIKE_ESCAPE)."""
+    return value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+
+
+def quote_column(column):
+    """
+    Validates a column name against the inward_logistic columns and wraps it in backticks.
+
+    Raises:
+    ValueError: If the column is not part of the table, so user input can never reach the SQL text.
+    """
+    if column not in column_types:
+        raise ValueError(f"Unknown column: {column}")
+    return f"`{column}`"
+
+
+def _partial_date_range(value):
+    """
+    Turns "2024" or "2024-05" into a half-open [start, end) date range, or returns None.
+
+    A range on the raw column can use an index, unlike LIKE on a DATE converted to text.
+    """
+    match = PARTIAL_DATE_PATTERN.match(value)
+    if not match:
+        return None
+    year = int(match.group(1))
+    if match.group(2) is None:
+        return f"{year}-01-01", f"{year + 1}-01-01"
+    month = int(match.group(2))
+    if not 1 <= month <= 12:
+        return None
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year}-{month:02d}-01", f"{next_year}-{next_month:02d}-01"
+
+
+def _fulltext_expression(value):
+    """
+    Turns a "Contains Word" value into a boolean-mode FULLTEXT expression, or returns None.
+
+    Every word must be present as the start of a word in the column ("+word*"), so "steel bolt"
+    finds "Bolts, steel M8". Values with words shorter than the index's minimum token size cannot be
+    answered by the index and fall back to LIKE.
+    """
+    words = FULLTEXT_WORD_PATTERN.findall(value)
+    if not words or any(len(word) < FULLTEXT_MIN_WORD_LENGTH for word in words):
+        return None
+    return " ".join(f"+{word}*" for word in words)
+
+
+def compile_condition(column, operator, value, fulltext_columns=()):
+    """
+    Compiles a single filter row into a parameterized SQL condition.
+
+    Equality and "Starts With" (prefix LIKE 'v%') keep the condition sargable so a B-tree index on the
+    column can be used. A "Contains" on a DATE column with a partial date ("2024-05") becomes a date range;
+    otherwise "Contains" is a substring match. A "Contains Word" on a column with its own FULLTEXT index is
+    answered by MATCH ... AGAINST; without the index every word must appear somewhere in the value.
+
+    Parameters:
+    column (str): Column name, validated against the table.
+    operator (str): One of FILTER_OPERATORS.
+    value (str): The user-entered value; it is only ever passed as a parameter.
+    fulltext_columns (set): Columns with a single-column FULLTEXT index (see schema.get_fulltext_columns).
+
+    Returns:
+    tuple: (sql_fragment, params) where params is a list of values for the %s placeholders.
+
+    Raises:
+    ValueError: If the column or operator is unknown.
+    """
+    quoted = quote_column(column)
+
+    if operator == "Equals":
+        return f"{quoted} = %s", [value]
+    if operator == "Not Equals":
+        return f"{quoted} <> %s", [value]
+    if operator == "Starts With":
+        return f"{quoted} LIKE %s ESCAPE '{LIKE_ESCAPE}'", [escape_like(value) + "%"]
+    if operator == "Contains":
+        if column_types[column] == "DATE":
+            date_range = _partial_date_range(value)
+            if date_range:
+                return f"{quoted} >= %s AND {quoted} < %s", list(date_range)
+        return f"{quoted} LIKE %s ESCAPE '{LIKE_ESCAPE}'", ["%" + escape_like(value) + "%"]
+    if operator == "Contains Word":
+        if column in fulltext_columns:
+            expression = _fulltext_expression(value)
+            if expression:
+                return f"MATCH({quoted}) AGAINST (%s IN BOOLEAN MODE)", [expression]
+        words = FULLTEXT_WORD_PATTERN.findall(value) or [value]
+        condition = " AND ".join([f"{quoted} LIKE %s ESCAPE '{LIKE_ESCAPE}'"] * len(words))
+        return f"({condition})", ["%" + escape_like(word) + "%" for word in words]
+    if operator == "Not Contains":
+        return f"{quoted} NOT LIKE %s ESCAPE '{LIKE_ESCAPE}'", ["%" + escape_like(value) + "%"]
+
+    raise ValueError(f"Unknown operator: {operator}")
+
+
+def compile_filters(filters, fulltext_columns=()):
+    """
+    Compiles the non-empty filter rows into a list of SQL conditions and their parameters.
+
+    Parameters:
+    filters (list): (column, operator, value) tuples. Rows with an empty column, operator or value are skipped.
+    fulltext_columns (set): Columns whose "Contains Word" filter may use MATCH ... AGAINST.
+
+    Returns:
+    tuple: (conditions, params)
+    """
+    conditions = []
+    params = []
+    for column, operator, value in filters:
+        if column and operator and value:
+            condition, condition_params = compile_condition(column, operator, value, fulltext_columns)
+            conditions.append(condition)
+            params.extend(condition_params)
+    return conditions, params
+
+
+def date_filter_start(filters, column="Date"):
+    """
+    Returns the earliest date a row matching the filters can have in `column`, or None if any date can match.
+
+    Used to skip tables that only hold older rows, such as the archive of closed years.
+
+    Parameters:
+    filters (list): (column, operator, value) tuples as used by build_filter_query().
+    column (str): The DATE column to look at.
+
+    Returns:
+    str: The earliest date as "YYYY-MM-DD", or None.
+    """
+    start = None
+    for filter_column, operator, value in filters:
+        if filter_column != column or not value:
+            continue
+        if operator == "Equals" and re.match(r"^\d{4}-\d{2}-\d{2}$", value):
+            bound = value
+        elif operator in ("Contains", "Starts With") and _partial_date_range(value):
+            bound = _partial_date_range(value)[0]
+        else:
+            continue
+        # All filter rows must match, so the latest of the lower bounds applies
+        start = bound if start is None else max(start, bound)
+    return start
+
+
+def build_filter_query(filters, select_columns, table="inward_logistic", order_by=None, limit=None,
+                       fulltext_columns=(), after_id=None, before_id=None):
+    """
+    Compiles the filter rows of the Search/Edit windows into one parameterized SELECT statement.
+
+    The SQL text only depends on the chosen columns and operators, never on the values, so the
+    statement can be prepared once by the server and reused; the values travel as parameters.
+    `after_id`/`before_id` add a keyset bound on the primary key, which together with ORDER BY id and
+    LIMIT reads one page by walking the primary key instead of skipping rows with OFFSET.
+
+    Parameters:
+    filters (list): (column, operator, value) tuples. Rows with an empty column, operator or value are skipped.
+    select_columns (list): Columns the caller needs, e.g. inward_select_columns.
+    table (str): Table to query.
+    order_by (str): Optional ORDER BY clause such as "id DESC".
+    limit (int): Optional row limit.
+    fulltext_columns (set): Columns whose "Contains Word" filter may use MATCH ... AGAINST.
+    after_id (int): Only return rows with id greater than this.
+    before_id (int): Only return rows with id less than this.
+
+    Returns:
+    tuple: (sql, params) ready for cursor.execute(sql, params).
+
+    Raises:
+    ValueError: If a column or operator is unknown.
+    """
+    conditions, params = compile_filters(filters, fulltext_columns)
+    if after_id is not None:
+        conditions.append("`id` > %s")
+        params.append(after_id)
+    if before_id is not None:
+        conditions.append("`id` < %s")
+        params.append(before_id)
+
+    query = f"SELECT {', '.join(quote_column(column) for column in select_columns)} FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return query, params
+
+
+def build_count_query(filters, table="inward_logistic", fulltext_columns=()):
+    """
+    Compiles the filter rows into a parameterized SELECT COUNT(*) statement.
+
+    Returns:
+    tuple: (sql, params) ready for cursor.execute(sql, params).
+    """
+    conditions, params = compile_filters(filters, fulltext_columns)
+    query = f"SELECT COUNT(*) FROM {table}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return query, params
@@ -0,0 +1,291 @@
+import os
+import re
+from datetime import datetime
+
+from storage import db_connection, get_storage
+from query_builder import inward_select_columns, column_types, quote_column
+from schema import get_fulltext_columns
+from export import (StyledSheetWriter, stream_cursor_to_xlsx, register_column_widths, SEARCH_CELL_STYLE,
+                    SEARCH_HEADER_STYLE, SEARCH_WRAP_THRESHOLD)
+from summary import read_summary_state, update_daily_summary
+from archive import build_search_query
+from instrumentation import timed, log_debug
+
+# INSERT statement for one inward record, in the order of the entry form fields.
+# updated_at is stamped on insert too: a record whose lower id commits after a higher one reaches the local
+# replicas (see replica.py) through their updated_at delta, since their id scan has already passed it.
+inward_insert_query = """
+    INSERT INTO inward_logistic (
+        Inward_No, Return_Type, Benefit_Type, Date, Time, Gate_Entry_No, Invoice_No, PO_No, BOE_No,
+        Return_Date, Return_Time, Supplier, Material, Qty, Department, Project, TPL_Name, Vehicle,
+        Received, Authorized, Security, Remark, TPL_Remarks, updated_at
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+"""
+
+# UPDATE statement for one inward record: the form fields in the same order, then the id.
+# updated_at tells the local replicas (see replica.py) that the record changed.
+inward_update_query = """
+    UPDATE inward_logistic
+    SET Inward_No = %s, Return_Type = %s, Benefit_Type = %s, Date = %s, Time = %s, Gate_Entry_No = %s,
+        Invoice_No = %s, PO_No = %s, BOE_No = %s, Return_Date = %s, Return_Time = %s, Supplier = %s, Material = %s,
+        Qty = %s, Department = %s, Project = %s, TPL_Name = %s, Vehicle = %s, Received = %s, Authorized = %s,
+        Security = %s, Remark = %s, TPL_Remarks = %s, updated_at = NOW()
+    WHERE id = %s
+"""
+
+
+def validate_entry(data):
+    """
+    Validates one record read from the entry form and converts its Date and Time fields for the database.
+
+    Parameters:
+    data (list): Field values in the order of database_fields, dates as MM/DD/YY; converted in place.
+
+    Returns:
+    str: An error message, or None if the record can be saved.
+    """
+    # Validate that the quantity (data[13]) is numeric
+    if not re.match(r'^[0-9]+$', data[13]):
+        return "Qty must be numeric"
+
+    # Validate that the invoice number (data[6]) is not empty
+    if data[6].strip() == "":
+        return "Invoice cannot be blank"
+
+    # Convert Date and Time fields to correct format
+    try:
+        data[3] = datetime.strptime(data[3], '%m/%d/%y').strftime('%Y-%m-%d')  # Ensure date format is correct
+        data[9] = datetime.strptime(data[9], '%m/%d/%y').strftime('%Y-%m-%d')  # Ensure return date is correct
+        data[4] = data[4] if ":" in data[4] else "00:00:00"  # Ensure correct time format
+        data[10] = data[10] if ":" in data[10] else "00:00:00"
+    except ValueError:
+        return "Invalid Date or Time format"
+    return None
+
+
+def insert_entry(data):
+    """
+    Saves one validated record and counts it in the daily summary in one transaction.
+
+    Parameters:
+    data (list): Field values as converted by validate_entry().
+
+    Returns:
+    int: The id of the new record.
+    """
+    with timed("entry.insert", rows=1), db_connection() as conn:
+        cursor = conn.cursor()
+        conn.start_transaction()
+        summary_state = read_summary_state(cursor)
+        cursor.execute(inward_insert_query, data)
+        record_id = cursor.lastrowid
+        update_daily_summary(cursor, summary_state, [record_id])
+        conn.commit()
+        cursor.close()
+    return record_id
+
+
+def _insert_rows(cursor, batch):
+    """
+    Inserts (key, data) pairs in the caller's transaction, one multi-row INSERT or row by row (see insert_batch).
+
+    Returns:
+    tuple: (list of (key, new id) of the saved rows, list of (key, error message) of the rejected rows)
+    """
+    storage = get_storage()
+    try:
+        cursor.executemany(inward_insert_query, [data for _, data in batch])
+        # A multi-row INSERT gets consecutive ids starting at lastrowid
+        return [(key, cursor.lastrowid + offset) for offset, (key, _) in enumerate(batch)], []
+    except storage.Error as err:
+        if storage.is_connection_lost(err):
+            raise
+    saved = []
+    failed = []
+    for key, data in batch:
+        try:
+            cursor.execute(inward_insert_query, data)
+            saved.append((key, cursor.lastrowid))
+        except storage.Error as row_err:
+            if storage.is_connection_lost(row_err):
+                raise
+            failed.append((key, str(row_err)))
+    return saved, failed
+
+
+def insert_batch(batch):
+    """
+    Saves a batch of validated records in one transaction.
+
+    The whole batch is sent as one multi-row INSERT (executemany). If the server rejects that statement
+    because of a bad row, the rows are inserted one by one in the same transaction instead: InnoDB only
+    undoes the failing statement, so every good row still goes in.
+
+    Parameters:
+    batch (list): (key, data) pairs; the key identifies the row to the caller, e.g. a Treeview iid.
+
+    Returns:
+    tuple: (keys of the saved rows, list of (key, error message) of the rejected rows)
+
+    Raises:
+    StorageBackend.Error: If the connection was lost; nothing of the batch was saved then.
+    """
+    with timed("entry.batch_insert") as timing, db_connection() as conn:
+        cursor = conn.cursor()
+        conn.start_transaction()
+        summary_state = read_summary_state(cursor)
+        saved, failed = _insert_rows(cursor, batch)
+        update_daily_summary(cursor, summary_state, [record_id for _, record_id in saved])
+        conn.commit()
+        cursor.close()
+        timing.rows = len(saved)
+        timing.fields["failed_rows"] = len(failed)
+    return [key for key, _ in saved], failed
+
+
+def insert_queued_entries(entries):
+    """
+    Saves records queued at the gate (see entry_queue.py) exactly once, in one transaction.
+
+    Every record carries the idempotency key it was given when it was queued. The keys of saved records are
+    stored in inward_entry_keys in the same transaction, so a batch sent again after its commit was lost on
+    the way back (the gate saw a connection error) finds its records already saved and does not repeat them.
+
+    Parameters:
+    entries (list): (entry key, data) pairs, data as converted by validate_entry().
+
+    Returns:
+    tuple: (dict of entry key -> record id of the saved records, including those saved before,
+            list of (entry key, error message) of the records the server rejected)
+
+    Raises:
+    StorageBackend.Error: If the connection was lost; nothing of the batch was saved then.
+    """
+    with timed("entry.sync", rows=len(entries)) as timing, db_connection() as conn:
+        cursor = conn.cursor()
+        conn.start_transaction()
+        summary_state = read_summary_state(cursor)
+        cursor.execute(f"SELECT entry_key, record_id FROM inward_entry_keys "
+                       f"WHERE entry_key IN ({', '.join(['%s'] * len(entries))})", [key for key, _ in entries])
+        already_saved = dict(cursor.fetchall())
+        new_entries = [(key, data) for key, data in entries if key not in already_saved]
+
+        saved, failed = _insert_rows(cursor, new_entries) if new_entries else ([], [])
+        if saved:
+            cursor.executemany("INSERT INTO inward_entry_keys (entry_key, record_id) VALUES (%s, %s)", saved)
+        update_daily_summary(cursor, summary_state, [record_id for _, record_id in saved])
+        conn.commit()
+        cursor.close()
+        timing.fields["duplicates"] = len(already_saved)
+        timing.fields["failed_rows"] = len(failed)
+    already_saved.update(saved)
+    return already_saved, failed
+
+
+def update_record(record_id, values):
+    """
+    Saves the edited fields of one record. The daily summary moves the record from its old
+    day/project/supplier to the new one in the same transaction.
+
+    Parameters:
+    record_id (int): inward_logistic id of the record.
+    values (list): Field values in the order of database_fields.
+    """
+    with timed("record.update", rows=1), db_connection() as connection:
+        cursor = connection.cursor()
+        connection.start_transaction()
+        summary_state = read_summary_state(cursor)
+        update_daily_summary(cursor, summary_state, [record_id], sign=-1)
+        cursor.execute(inward_update_query, (*values, record_id))
+        update_daily_summary(cursor, summary_state, [record_id])
+        connection.commit()
+        cursor.close()
+
+
+def fetch_entries_after(after_id, limit):
+    """
+    Reads the newest records with an id above `after_id`, a short range scan on the primary key.
+
+    Parameters:
+    after_id (int): Highest id the caller already has.
+    limit (int): Most records returned.
+
+    Returns:
+    list: Rows of inward_select_columns, newest first.
+    """
+    columns = ", ".join(quote_column(column) for column in inward_select_columns)
+    with timed("entry.last_entries") as timing, db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {columns} FROM inward_logistic WHERE id > %s ORDER BY id DESC LIMIT {int(limit)}",
+                       (after_id,))
+        entries = cursor.fetchall()
+        cursor.close()
+        timing.rows = len(entries)
+    return entries
+
+
+def search_to_workbook(filters, output_path, include_archive=False, progress=None, storage=None):
+    """
+    Runs a search and writes the styled results to a workbook in one pass.
+
+    Parameters:
+    filters (list): (column, operator, value) tuples as used by build_filter_query().
+    output_path (str): Path of the .xlsx file to create.
+    include_archive (bool): Also search the archive of closed years.
+    progress (callable): Receives the number of rows written after every chunk, e.g. Task.report_progress.
+    storage (StorageBackend): Where to search, e.g. the local replica (see replica.py); default the
+                              application's storage.
+
+    Returns:
+    int: Number of records found.
+    """
+    storage = storage or get_storage()
+    fulltext_columns = get_fulltext_columns() if storage.supports_fulltext else set()
+    with timed("search.export", archive=include_archive, storage=storage.name) as timing, \
+            storage.connection() as connection:
+        cursor = connection.cursor(prepared=True)
+
+        # Compile the filters into a parameterized query; values are never pasted into the SQL text.
+        # "Contains Word" on Material/Remark/TPL_Remarks uses the FULLTEXT index when the server has it.
+        # The archive is only added when asked for and the date filter can match an archived year.
+        query, params, _ = build_search_query(cursor, filters, inward_select_columns,
+                                              fulltext_columns=fulltext_columns,
+                                              include_archive=include_archive)
+        log_debug("search query", query=query, params=params)
+        cursor.execute(query, params)
+
+        # Column widths are sized while the rows are written
+        with StyledSheetWriter(output_path, inward_select_columns,
+                               [column_types[column] for column in inward_select_columns],
+                               SEARCH_CELL_STYLE, SEARCH_HEADER_STYLE,
+                               wrap_threshold=SEARCH_WRAP_THRESHOLD) as writer:
+            record_count = writer.write_cursor(cursor, progress=progress)
+        cursor.close()
+        timing.rows = record_count
+        timing.bytes = os.path.getsize(output_path)
+    return record_count
+
+
+def export_register(destination_path, progress=None):
+    """
+    Writes the whole register to a workbook, streaming the rows from an unbuffered cursor in a single pass.
+
+    Parameters:
+    destination_path (str): Path of the .xlsx file to create.
+    progress (callable): Receives the number of rows written after every chunk, e.g. Task.report_progress.
+
+    Returns:
+    int: Number of records written.
+    """
+    query = f"SELECT {', '.join(quote_column(column) for column in inward_select_columns)} FROM inward_logistic"
+    with timed("register.export") as timing, db_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(query)
+        record_count = stream_cursor_to_xlsx(cursor, destination_path, inward_select_columns,
+                                             [column_types[column] for column in inward_select_columns],
+                                             register_column_widths(len(inward_select_columns)),
+                                             progress=progress)
+        cursor.close()
+        timing.rows = record_count
+        timing.bytes = os.path.getsize(destination_path)
+    return record_count
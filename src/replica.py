@@ -0,0 +1,329 @@
+import tkinter as tk
+from datetime import datetime, timedelta
+from tkinter import TclError
+
+from config import database_columns, replica_config
+from platform_support import data_dir
+from storage import SQLiteBackend, db_connection, get_storage
+from schema import inward_logistic_indexes, migrate_columns, migrate_indexes
+from archive import read_archived_through_year
+from query_builder import inward_select_columns, quote_column
+from task_runner import get_task_executor
+from change_feed import get_change_feed
+from instrumentation import timed, log_warning
+
+# File name of the replica inside the data directory
+REPLICA_FILE_NAME = "replica.sqlite3"
+
+# Columns of the single-row replica_state table of the local copy
+replica_state_columns = [
+    "high_water_id INT NOT NULL",  # Highest inward_logistic id copied from the server
+    "synced_through DATETIME",  # Server time at which the last complete sync started
+    "synced_at DATETIME"  # Local time of the same moment (see RegisterReplica.synced_at)
+]
+
+
+class RegisterReplica:
+    """
+    A copy of inward_logistic in a SQLite file on this PC, which answers the Search and Edit windows locally.
+
+    The first sync seeds the copy by walking the server's primary key, `batch_size` records per transaction;
+    every batch is committed with the highest id copied, so an interrupted seed continues where it stopped.
+    After that every sync, `sync_interval` seconds apart, reads only what changed:
+
+    - new records by `id > high_water_id`, a seek on the primary key,
+    - records saved since the previous sync by `updated_at >= previous sync - overlap` on the idx_updated_at
+      index: the edits, and the new records whose lower id committed after the id scan had passed it. Both
+      INSERT and UPDATE stamp updated_at (see register.py) when the statement runs, which for a transaction
+      that commits late is before the sync that missed it; `overlap` is how late a commit may be,
+    - records moved to the archive (see archive.py) are deleted from the copy by date.
+
+    Entries the change feed delivers are written to the copy right away, so a search right after a save
+    already finds them. Searches that include the archive always go to the server.
+
+    The copy is only used once a sync has completed; until then, and while it is disabled, the windows
+    search the server as before. Subscribers get the time the copy is current as of on the Tk thread.
+
+    Attributes:
+    storage (SQLiteBackend): The local copy.
+    synced_at (datetime): Local time the copy holds every record saved before, except those whose transaction
+                          commits later than `overlap` after this moment; None if not seeded yet.
+    """
+
+    def __init__(self, root, enabled=False, path=None, sync_interval=30, batch_size=5000, overlap=300):
+        """
+        Parameters:
+        root (tk.Tk): The application root, used to schedule the syncs.
+        enabled (bool): Keep the copy and search it.
+        path (str): The copy's file; default replica.sqlite3 in the data directory.
+        sync_interval (float): Seconds between two syncs.
+        batch_size (int): Records copied per transaction.
+        overlap (float): Seconds the edit window of a sync reaches back before the previous sync started.
+        """
+        self.root = root
+        self.enabled = enabled
+        self.storage = SQLiteBackend(path or data_dir(REPLICA_FILE_NAME))
+        self.sync_interval = sync_interval
+        self.batch_size = batch_size
+        self.overlap = overlap
+
+        self.synced_at = None
+        self._opened = False
+        self._subscribers = []
+        self._after_id = None
+        self._in_flight = False
+        self._sync_again = False
+        self._running = False
+        self._feed_subscribed = False
+
+    def subscribe(self, widget, callback):
+        """
+        Registers `callback(synced_at)`, called while `widget` exists, and calls it once right away.
+
+        Parameters:
+        widget (tk.Widget): Widget whose lifetime the subscription follows.
+        callback (callable): Called on the Tk thread with `synced_at`.
+        """
+        self._subscribers.append((widget, callback))
+        callback(self.synced_at)
+
+    def search_storage(self, include_archive=False):
+        """
+        Returns where a search should run: the local copy once it is seeded, otherwise the server.
+
+        Parameters:
+        include_archive (bool): The search includes the archive of closed years, which is not copied.
+        """
+        if self.enabled and self.synced_at is not None and not include_archive:
+            return self.storage
+        return get_storage()
+
+    def start(self):
+        """Opens the copy and keeps it current until stop() is called; does nothing while it is disabled."""
+        if not self.enabled or self._running:
+            return
+        self._running = True
+        if not self._feed_subscribed:
+            # The feed only delivers while the root window is shown, i.e. while a user is logged in
+            get_change_feed(self.root).subscribe(self.root, self.add_new_entries)
+            self._feed_subscribed = True
+        if self._opened:
+            self._schedule(0)
+            return
+
+        def opened(synced_at):
+            self._opened = True
+            self.synced_at = synced_at
+            self._notify()
+            if self._running:
+                self._schedule(0)
+
+        def failed(err):
+            log_warning("replica could not be opened", path=self.storage.path, error=str(err))
+            self._running = False
+
+        get_task_executor(self.root).submit(lambda task: self._open(), on_success=opened, on_error=failed,
+                                            busy=False)
+
+    def stop(self):
+        """Stops syncing, e.g. on logout; a sync in progress finishes its current batch."""
+        self._running = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def sync_now(self):
+        """Syncs right away, e.g. after a record was edited in this application."""
+        if not self._running or not self._opened:
+            return
+        if self._in_flight:
+            self._sync_again = True
+        else:
+            self._schedule(0)
+
+    def _schedule(self, seconds):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(int(seconds * 1000), self._sync)
+
+    def _sync(self):
+        """Tk thread: starts one sync on the task executor."""
+        self._after_id = None
+        if not self._running or self._in_flight:
+            return
+        self._in_flight = True
+        self._sync_again = False
+        get_task_executor(self.root).submit(lambda task: self._pull(), on_success=self._synced,
+                                            on_error=self._failed, busy=False)
+
+    def _synced(self, synced_at):
+        """Tk thread: reports the new freshness and schedules the next sync."""
+        self._in_flight = False
+        self.synced_at = synced_at
+        self._notify()
+        if self._running:
+            self._schedule(0 if self._sync_again else self.sync_interval)
+
+    def _failed(self, err):
+        """Tk thread: keeps serving the copy as it is and tries again at the next interval."""
+        log_warning("replica sync failed", error=str(err))
+        self._in_flight = False
+        if self._running:
+            self._schedule(self.sync_interval)
+
+    def _open(self):
+        """Worker thread: creates or migrates the copy's tables and returns its `synced_at`."""
+        with self.storage.connection() as local:
+            cursor = local.cursor()
+            local.start_transaction()
+            # The ids are the server's, so the key is a plain INTEGER PRIMARY KEY without AUTOINCREMENT
+            self.storage.create_table(cursor, "inward_logistic", "id INTEGER PRIMARY KEY", database_columns)
+            migrate_columns(cursor, "inward_logistic", database_columns, self.storage)
+            migrate_indexes(cursor, "inward_logistic", inward_logistic_indexes, self.storage)
+            self.storage.create_table(cursor, "replica_state", "id TINYINT PRIMARY KEY", replica_state_columns)
+            cursor.execute("INSERT OR IGNORE INTO replica_state (id, high_water_id) VALUES (1, 0)")
+            cursor.execute("SELECT synced_at FROM replica_state WHERE id = 1")
+            synced_at = cursor.fetchone()[0]
+            local.commit()
+            cursor.close()
+        return synced_at
+
+    def _pull(self):
+        """
+        Worker thread: copies the records added, changed and archived on the server since the last sync.
+
+        Returns:
+        datetime: The local time the sync started; every record saved before it is in the copy now.
+        """
+        columns = ", ".join(quote_column(column) for column in inward_select_columns)
+        replace = (f"REPLACE INTO inward_logistic ({columns}) "
+                   f"VALUES ({', '.join(['%s'] * len(inward_select_columns))})")
+
+        with timed("replica.sync") as timing, self.storage.connection() as local, db_connection() as server:
+            local_cursor = local.cursor()
+            server_cursor = server.cursor()
+            local_cursor.execute("SELECT high_water_id, synced_through FROM replica_state WHERE id = 1")
+            high_water_id, synced_through = local_cursor.fetchone()
+
+            # Both clocks are read before anything is copied; what is saved from now on is left to the next sync
+            started_at = datetime.now()
+            server_cursor.execute("SELECT NOW()")
+            server_now = server_cursor.fetchone()[0]
+
+            # New records, one committed batch at a time
+            new_rows = 0
+            while True:
+                server_cursor.execute(f"SELECT {columns} FROM inward_logistic WHERE `id` > %s "
+                                      f"ORDER BY `id` LIMIT {int(self.batch_size)}", (high_water_id,))
+                rows = server_cursor.fetchall()
+                if not rows:
+                    break
+                high_water_id = rows[-1][0]
+                local.start_transaction()
+                local_cursor.executemany(replace, rows)
+                local_cursor.execute("UPDATE replica_state SET high_water_id = %s WHERE id = 1", (high_water_id,))
+                local.commit()
+                new_rows += len(rows)
+                if len(rows) < self.batch_size:
+                    break
+
+            # Records saved since the previous sync: edits and late commits below high_water_id. A seed has
+            # just copied the current values of every record there is.
+            changed_rows = []
+            if synced_through is not None:
+                server_cursor.execute(f"SELECT {columns} FROM inward_logistic WHERE updated_at >= %s AND `id` <= %s",
+                                      (synced_through - timedelta(seconds=self.overlap), high_water_id))
+                changed_rows = server_cursor.fetchall()
+
+            archived_through_year = read_archived_through_year(server_cursor)
+            server_cursor.close()
+
+            local.start_transaction()
+            if changed_rows:
+                local_cursor.executemany(replace, changed_rows)
+            if archived_through_year is not None:
+                local_cursor.execute("DELETE FROM inward_logistic WHERE Date < %s",
+                                     (f"{archived_through_year + 1}-01-01",))
+            local_cursor.execute("UPDATE replica_state SET synced_through = %s, synced_at = %s WHERE id = 1",
+                                 (server_now, started_at))
+            local.commit()
+            local_cursor.close()
+            timing.rows = new_rows + len(changed_rows)
+            timing.fields["changed_rows"] = len(changed_rows)
+        return started_at
+
+    def add_new_entries(self, rows):
+        """
+        Change feed subscriber: writes the new entries to the copy.
+
+        This runs on the Tk thread before the windows' own subscribers, so an Edit window extending its
+        search with the new entries finds them in the copy. It is a small local write; the next sync copies
+        the same rows again by id, which changes nothing.
+        """
+        if self.synced_at is None:
+            return
+        columns = ", ".join(quote_column(column) for column in inward_select_columns)
+        try:
+            with timed("replica.feed", rows=len(rows)), self.storage.connection() as local:
+                cursor = local.cursor()
+                local.start_transaction()
+                cursor.executemany(f"REPLACE INTO inward_logistic ({columns}) "
+                                   f"VALUES ({', '.join(['%s'] * len(inward_select_columns))})", rows)
+                local.commit()
+                cursor.close()
+        except self.storage.Error as err:
+            log_warning("replica could not store new entries", error=str(err))
+
+    def _notify(self):
+        for widget, callback in list(self._subscribers):
+            try:
+                if widget.winfo_exists():
+                    callback(self.synced_at)
+                    continue
+            except TclError:
+                pass
+            self._subscribers.remove((widget, callback))
+
+    def close(self):
+        self.storage.close()
+
+
+_register_replica = None
+
+
+def get_register_replica(widget):
+    """Returns the application's RegisterReplica, creating it on first use for the root of `widget`."""
+    global _register_replica
+    if _register_replica is None:
+        _register_replica = RegisterReplica(widget._root(), **replica_config)
+    return _register_replica
+
+
+class ReplicaStatusLabel:
+    """
+    Tells the Search and Edit windows how fresh the local copy they search is.
+
+    Nothing is shown while the replica is disabled.
+    """
+
+    def __init__(self, master):
+        """
+        Parameters:
+        master (tk.Widget): The window the label is packed into.
+        """
+        self.replica = get_register_replica(master)
+        self.label = tk.Label(master, font=('ariel narrow', 10), bg='wheat')
+        if self.replica.enabled:
+            self.replica.subscribe(self.label, self.show_freshness)
+
+    def pack(self, **kwargs):
+        if self.replica.enabled:
+            self.label.pack(**kwargs)
+
+    def show_freshness(self, synced_at):
+        """Replica subscriber: shows the time the local copy is current as of."""
+        if synced_at is None:
+            self.label.config(text="Local copy is being prepared, searching the server", fg="dark orange")
+        else:
+            self.label.config(text=f"Searching the local copy as of {synced_at:%Y-%m-%d %H:%M:%S} "
+                                   f"(archive searches use the server)", fg="dark green")
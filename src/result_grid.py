@@ -0,0 +1,231 @@
+from storage import get_storage
+from query_builder import build_filter_query, build_count_query, inward_select_columns
+from schema import get_fulltext_columns
+from task_runner import get_task_executor
+from instrumentation import timed, log_warning
+
+# Rows fetched from the server per page
+RESULT_PAGE_SIZE = 200
+
+# Pages kept in the Treeview at most: the visible window plus a prefetch buffer on either side
+RESULT_MAX_PAGES = 3
+
+# Scroll position (fraction of the loaded rows) at which the next/previous page is fetched
+RESULT_FETCH_THRESHOLD = 0.85
+
+
+class KeysetResultGrid:
+    """
+    A virtualized result grid on top of a ttk.Treeview, paging through inward_logistic by keyset on `id`.
+
+    Only a window of at most `max_pages` pages lives in the Treeview at any time. When the user scrolls
+    close to the end of the loaded window the next page is fetched with `id > last_id ORDER BY id LIMIT n`,
+    and pages that scroll far out of view at the other end are removed from the Treeview. Scrolling back up
+    fetches the previous page with `id < first_id ORDER BY id DESC LIMIT n`. Both walk the primary key, so
+    every page costs the same no matter how deep into the result the user is.
+
+    Treeview items use the record id as their iid, so a record can be found with `tree.exists(str(id))`.
+    All queries run on the task executor; the Treeview is only touched from the Tk thread.
+    """
+
+    def __init__(self, tree, v_scroll, columns=inward_select_columns, page_size=RESULT_PAGE_SIZE,
+                 max_pages=RESULT_MAX_PAGES, fetch_threshold=RESULT_FETCH_THRESHOLD):
+        """
+        Parameters:
+        tree (ttk.Treeview): The Treeview to fill; its first column must be the record id.
+        v_scroll (ttk.Scrollbar): The vertical scrollbar attached to the Treeview.
+        columns (list): Columns selected for each row, starting with "id".
+        page_size (int): Rows per page.
+        max_pages (int): Pages kept in the Treeview at most.
+        fetch_threshold (float): Scroll fraction that triggers fetching the neighbouring page.
+        """
+        self.tree = tree
+        self.v_scroll = v_scroll
+        self.columns = columns
+        self.page_size = page_size
+        self.max_rows = page_size * max_pages
+        self.fetch_threshold = fetch_threshold
+
+        self.filters = []
+        self.fulltext_columns = ()
+        self.storage = None
+        self.has_more_after = False
+        self.has_more_before = False
+        self.active = False
+        self._loading = False
+        self.executor = get_task_executor(tree)
+        self.owner = tree.winfo_toplevel()
+
+        # The grid needs to see scroll positions to know when to fetch; it forwards them to the scrollbar
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        self.v_scroll.configure(command=self.tree.yview)
+
+    def load(self, filters, fulltext_columns=None, on_loaded=None, on_error=None, storage=None):
+        """
+        Runs a new search in the background and shows its first page.
+
+        Parameters:
+        filters (list): (column, operator, value) tuples as used by build_filter_query().
+        fulltext_columns (set): Columns whose "Contains Word" filter may use MATCH ... AGAINST; when None they
+                                are looked up with get_fulltext_columns() in the background.
+        on_loaded (callable): Called on the Tk thread with the total number of matching records.
+        on_error (callable): Called on the Tk thread with the exception if the search failed.
+        storage (StorageBackend): Where to search, e.g. the local replica (see replica.py); the pages of this
+                                  search are read from it too. Default the application's storage.
+        """
+        storage = storage or get_storage()
+
+        def fetch_first_page(task):
+            if fulltext_columns is not None:
+                columns = fulltext_columns
+            else:
+                columns = get_fulltext_columns() if storage.supports_fulltext else set()
+            count_query, count_params = build_count_query(filters, fulltext_columns=columns)
+            with timed("grid.count", storage=storage.name), storage.connection() as connection:
+                cursor = connection.cursor(prepared=True)
+                cursor.execute(count_query, count_params)
+                record_count = cursor.fetchone()[0]
+                cursor.close()
+            task.check_cancelled()
+            return record_count, columns, self._fetch_page(storage, filters, columns)
+
+        def show_first_page(result):
+            record_count, columns, (rows, has_more) = result
+            self.filters = filters
+            self.fulltext_columns = columns
+            self.storage = storage
+            self.tree.delete(*self.tree.get_children())
+            self.has_more_before = False
+            self.has_more_after = has_more
+            self.active = True
+            for row in rows:
+                self.tree.insert("", "end", iid=str(row[0]), values=row)
+            self.tree.yview_moveto(0)
+            if on_loaded:
+                on_loaded(record_count)
+
+        self.executor.submit(fetch_first_page, on_success=show_first_page, on_error=on_error, owner=self.owner)
+
+    def clear(self):
+        """Removes all rows and forgets the current search; pages still in flight are ignored."""
+        self.tree.delete(*self.tree.get_children())
+        self.filters = []
+        self.fulltext_columns = ()
+        self.storage = None
+        self.has_more_after = False
+        self.has_more_before = False
+        self.active = False
+        self._loading = False
+
+    def load_new_rows(self, on_added=None):
+        """
+        Appends rows added to the table after the last loaded one, e.g. when the change feed reports new entries.
+
+        Only the end of the current search is extended: the new rows are fetched with the search's own filters
+        by `id > last_id`, so rows that do not match never appear. While more pages are still waiting below the
+        loaded window nothing is fetched; scrolling down reaches the new rows anyway.
+
+        Parameters:
+        on_added (callable): Called on the Tk thread with the number of rows appended.
+        """
+        if not self.active or self._loading or self.has_more_after:
+            return
+        children = self.tree.get_children()
+        after_id = int(children[-1]) if children else 0
+
+        def show(result):
+            self.append_page(result)
+            if on_added and result[0]:
+                on_added(len(result[0]))
+
+        self._load_page(show, after_id=after_id)
+
+    def _fetch_page(self, storage, filters, fulltext_columns, after_id=None, before_id=None):
+        """
+        Fetches one page next to a keyset bound. Runs on a worker thread.
+
+        Returns:
+        tuple: (rows in ascending id order, whether more rows exist beyond this page)
+        """
+        query, params = build_filter_query(filters, self.columns,
+                                           order_by="`id` DESC" if before_id is not None else "`id`",
+                                           limit=self.page_size + 1, fulltext_columns=fulltext_columns,
+                                           after_id=after_id, before_id=before_id)
+        with timed("grid.page") as timing, storage.connection() as connection:
+            cursor = connection.cursor(prepared=True)
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            cursor.close()
+            timing.rows = len(rows)
+
+        # One extra row tells whether another page exists without a separate query
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if before_id is not None:
+            rows.reverse()
+        return rows, has_more
+
+    def _first_visible_index(self):
+        items = len(self.tree.get_children())
+        return int(round(self.tree.yview()[0] * items)), items
+
+    def append_page(self, result):
+        """Shows the page after the last loaded row and drops rows from the top beyond max_rows."""
+        rows, self.has_more_after = result
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[0]), values=row)
+
+        first_visible, items = self._first_visible_index()
+        overflow = items - self.max_rows
+        if overflow > 0:
+            self.tree.delete(*self.tree.get_children()[:overflow])
+            self.has_more_before = True
+            # Keep the same record at the top of the view after removing rows above it
+            self.tree.yview_moveto(max(first_visible - overflow, 0) / (items - overflow))
+
+    def prepend_page(self, result):
+        """Shows the page before the first loaded row and drops rows from the bottom beyond max_rows."""
+        rows, self.has_more_before = result
+        first_visible, _ = self._first_visible_index()
+        for index, row in enumerate(rows):
+            self.tree.insert("", index, iid=str(row[0]), values=row)
+
+        children = self.tree.get_children()
+        overflow = len(children) - self.max_rows
+        if overflow > 0:
+            self.tree.delete(*children[-overflow:])
+            self.has_more_after = True
+        # Keep the same record at the top of the view after inserting rows above it
+        self.tree.yview_moveto((first_visible + len(rows)) / len(self.tree.get_children()))
+
+    def _on_scroll(self, first, last):
+        """yscrollcommand of the Treeview: update the scrollbar and fetch a neighbouring page when needed."""
+        self.v_scroll.set(first, last)
+        children = self.tree.get_children()
+        if self._loading or not children:
+            return
+        if float(last) >= self.fetch_threshold and self.has_more_after:
+            self._load_page(self.append_page, after_id=int(children[-1]))
+        elif float(first) <= 1 - self.fetch_threshold and self.has_more_before:
+            self._load_page(self.prepend_page, before_id=int(children[0]))
+
+    def _load_page(self, show_page, after_id=None, before_id=None):
+        """Fetches a neighbouring page in the background, never more than one at a time."""
+        self._loading = True
+        storage, filters, fulltext_columns = self.storage, self.filters, self.fulltext_columns
+
+        def fetch(task):
+            return self._fetch_page(storage, filters, fulltext_columns, after_id=after_id, before_id=before_id)
+
+        def show(result):
+            self._loading = False
+            # Ignore pages of a search that has been replaced in the meantime
+            if filters is self.filters:
+                show_page(result)
+
+        def failed(err):
+            self._loading = False
+            log_warning("failed to load a result page", error=str(err))
+
+        # Scrolling in the background needs no busy cursor
+        self.executor.submit(fetch, on_success=show, on_error=failed, owner=self.owner, busy=False)
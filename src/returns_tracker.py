@@ -0,0 +1,319 @@
+import time
+import tkinter as tk
+from datetime import date, timedelta
+from tkinter import TclError, ttk, messagebox
+
+from config import return_tracker_config
+from storage import db_connection
+from query_builder import inward_select_columns
+from task_runner import get_task_executor
+from change_feed import get_change_feed
+from instrumentation import timed, log_warning
+
+# Return_Type of material that has to come back, and of material that is back
+RETURNABLE = "Returnable"
+RETURNED = "Returned"
+
+# Columns of a tracked item, in the order of the tuples kept by ReturnTracker
+RETURN_ITEM_COLUMNS = ("id", "Return_Date", "Return_Time", "Supplier", "Material", "Invoice_No")
+
+# Positions of those columns in the rows delivered by the change feed (inward_select_columns)
+_FEED_POSITIONS = [inward_select_columns.index(column) for column in RETURN_ITEM_COLUMNS]
+_FEED_RETURN_TYPE = inward_select_columns.index("Return_Type")
+
+
+class ReturnTracker:
+    """
+    Keeps the returnable material that is overdue or due within `due_soon_days` in memory.
+
+    The items are read with `Return_Type = 'Returnable' AND Return_Date <= horizon`, a range scan on the
+    idx_return_due index, so only the few open returns are ever read. After the first scan the list is kept
+    current incrementally:
+
+    - new entries arrive through the change feed and are added if they are returnable and due soon,
+    - when the date moves on, only the return dates that came into range are read,
+    - records edited or marked returned in this application are re-read by id,
+    - a complete re-read every `full_scan_interval` seconds picks up edits made at the other gates.
+
+    Subscribers get the items (id -> tuple of RETURN_ITEM_COLUMNS) and today's date on the Tk thread
+    whenever the list or the date changed.
+    """
+
+    def __init__(self, root, due_soon_days=3, scan_interval=60, full_scan_interval=900):
+        """
+        Parameters:
+        root (tk.Tk): The application root, used to schedule the scans.
+        due_soon_days (int): Days ahead within which a return counts as due soon.
+        scan_interval (float): Seconds between two checks of the date.
+        full_scan_interval (float): Seconds between two complete re-reads.
+        """
+        self.root = root
+        self.due_soon_days = due_soon_days
+        self.scan_interval = scan_interval
+        self.full_scan_interval = full_scan_interval
+
+        self.items = {}
+        self.today = None
+        self.horizon = None  # Latest return date that has been read
+        self.last_full_scan = 0.0
+        self._subscribers = []
+        self._after_id = None
+        self._running = False
+        self._feed_subscribed = False
+
+    def subscribe(self, widget, callback):
+        """
+        Registers `callback(items, today)`, called while `widget` exists, and calls it once right away.
+
+        Parameters:
+        widget (tk.Widget): Widget whose lifetime the subscription follows.
+        callback (callable): Called on the Tk thread with the items and today's date.
+        """
+        self._subscribers.append((widget, callback))
+        if self.today is not None:
+            callback(self.items, self.today)
+
+    def start(self):
+        """Reads the open returns and keeps them current until stop() is called."""
+        if self._running:
+            return
+        self._running = True
+        self.items = {}
+        self.today = self.horizon = None
+        if not self._feed_subscribed:
+            # The feed only delivers while the root window is shown, i.e. while a user is logged in
+            get_change_feed(self.root).subscribe(self.root, self.add_new_entries)
+            self._feed_subscribed = True
+        self._tick()
+
+    def stop(self):
+        """Stops scanning, e.g. on logout."""
+        self._running = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        """Tk thread: starts a complete or a date-range scan when one is due, then reschedules itself."""
+        self._after_id = None
+        if not self._running:
+            return
+        today = date.today()
+        horizon = today + timedelta(days=self.due_soon_days)
+
+        if time.monotonic() - self.last_full_scan >= self.full_scan_interval or self.horizon is None:
+            self.last_full_scan = time.monotonic()
+            self._submit(lambda task: self._fetch_due(None, horizon), today, horizon, replace=True)
+        elif horizon > self.horizon:
+            old_horizon = self.horizon
+            self._submit(lambda task: self._fetch_due(old_horizon, horizon), today, horizon, replace=False)
+        elif today != self.today:
+            self.today = today
+            self._notify()
+        self._after_id = self.root.after(int(self.scan_interval * 1000), self._tick)
+
+    def _submit(self, job, today, horizon, replace):
+        def apply(rows):
+            if not self._running:
+                return
+            if replace:
+                self.items = {}
+            for row in rows:
+                self.items[row[0]] = tuple(row)
+            self.today, self.horizon = today, horizon
+            self._notify()
+
+        def failed(err):
+            # The next tick tries again with a complete scan
+            log_warning("return tracker scan failed", error=str(err))
+            self.horizon = None
+
+        get_task_executor(self.root).submit(job, on_success=apply, on_error=failed, busy=False)
+
+    @staticmethod
+    def _fetch_due(after_date, through_date):
+        """Worker thread: reads the open returns with a return date in (after_date, through_date]."""
+        query = (f"SELECT {', '.join(RETURN_ITEM_COLUMNS)} FROM inward_logistic "
+                 f"WHERE Return_Type = %s AND Return_Date <= %s")
+        params = [RETURNABLE, through_date]
+        if after_date is not None:
+            query += " AND Return_Date > %s"
+            params.append(after_date)
+        with timed("returns.scan", full=after_date is None) as timing, db_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute(query + " ORDER BY Return_Date, id", params)
+            rows = cursor.fetchall()
+            cursor.close()
+            timing.rows = len(rows)
+        return rows
+
+    def add_new_entries(self, rows):
+        """Change feed subscriber: adds new returnable entries that are already due soon."""
+        if self.horizon is None:
+            return
+        added = False
+        for row in rows:
+            return_date = row[_FEED_POSITIONS[1]]
+            if row[_FEED_RETURN_TYPE] == RETURNABLE and return_date is not None and return_date <= self.horizon:
+                self.items[row[0]] = tuple(row[position] for position in _FEED_POSITIONS)
+                added = True
+        if added:
+            self._notify()
+
+    def refresh_records(self, record_ids):
+        """
+        Re-reads records changed in this application, e.g. after an edit, and updates or drops their items.
+
+        Parameters:
+        record_ids (list): inward_logistic ids of the changed records.
+        """
+        if self.horizon is None or not record_ids:
+            return
+        record_ids = [int(record_id) for record_id in record_ids]
+        horizon = self.horizon
+
+        def fetch(task):
+            with db_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(f"SELECT {', '.join(RETURN_ITEM_COLUMNS)} FROM inward_logistic "
+                               f"WHERE id IN ({', '.join(['%s'] * len(record_ids))}) "
+                               f"AND Return_Type = %s AND Return_Date <= %s", (*record_ids, RETURNABLE, horizon))
+                rows = cursor.fetchall()
+                cursor.close()
+            return rows
+
+        def apply(rows):
+            for record_id in record_ids:
+                self.items.pop(record_id, None)
+            for row in rows:
+                self.items[row[0]] = tuple(row)
+            self._notify()
+
+        get_task_executor(self.root).submit(fetch, on_success=apply,
+                                            on_error=lambda err: log_warning("return tracker refresh failed",
+                                                                             error=str(err)),
+                                            busy=False)
+
+    def mark_returned(self, record_id, on_done=None, on_error=None):
+        """
+        Records that the material of `record_id` is back by setting its Return_Type to 'Returned'.
+
+        Parameters:
+        record_id (int): inward_logistic id of the record.
+        on_done (callable): Called on the Tk thread once the record was updated.
+        on_error (callable): Called on the Tk thread with the exception if the update failed.
+        """
+        def run_update(task):
+            with db_connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("UPDATE inward_logistic SET Return_Type = %s, updated_at = NOW() WHERE id = %s",
+                               (RETURNED, record_id))
+                connection.commit()
+                cursor.close()
+
+        def apply(_):
+            self.items.pop(record_id, None)
+            self._notify()
+            if on_done:
+                on_done()
+
+        get_task_executor(self.root).submit(run_update, on_success=apply, on_error=on_error)
+
+    def _notify(self):
+        for widget, callback in list(self._subscribers):
+            try:
+                if widget.winfo_exists():
+                    callback(self.items, self.today)
+                    continue
+            except TclError:
+                pass
+            self._subscribers.remove((widget, callback))
+
+
+_return_tracker = None
+
+
+def get_return_tracker(widget):
+    """Returns the application's ReturnTracker, creating it on first use for the root of `widget`."""
+    global _return_tracker
+    if _return_tracker is None:
+        _return_tracker = ReturnTracker(widget._root(), **return_tracker_config)
+    return _return_tracker
+
+
+class ReturnsPanel:
+    """
+    Main-screen panel listing overdue (red) and due-soon (yellow) returnable material.
+
+    The Treeview is patched item by item from the tracker's list: only rows that appeared, changed or
+    disappeared are touched, so the panel stays responsive however often the tracker reports.
+    """
+
+    def __init__(self, master):
+        """
+        Parameters:
+        master (tk.Tk): The main window the panel is placed on.
+        """
+        self.tracker = get_return_tracker(master)
+        self.frame = tk.Frame(master, bd=4, relief='ridge', bg='wheat')
+
+        self.title_label = tk.Label(self.frame, text="Returnable Material Due", font=('ariel narrow', 12, 'bold'),
+                                    bg='wheat')
+        self.title_label.pack(pady=2)
+
+        columns = ("Return Date", "Supplier", "Material", "Invoice No")
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=8)
+        for column in columns:
+            self.tree.heading(column, text=column, anchor="center")
+            self.tree.column(column, width=90 if column == "Return Date" else 130, anchor="center")
+        self.tree.tag_configure("overdue", background="misty rose")
+        self.tree.tag_configure("due_soon", background="light yellow")
+        v_scroll = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=v_scroll.set)
+
+        mark_button = tk.Button(self.frame, text="Mark Returned", command=self.mark_returned,
+                                font=('ariel narrow', 10), width=14, bg='light cyan')
+        mark_button.pack(side="bottom", pady=4)
+        v_scroll.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tracker.subscribe(self.tree, self.show_items)
+
+    def place(self, **kwargs):
+        self.frame.place(**kwargs)
+
+    def show_items(self, items, today):
+        """Tracker subscriber: patches the Treeview to the current list, overdue items first."""
+        ordered = sorted(items.values(), key=lambda item: (item[1], item[0]))
+        wanted = {str(item[0]) for item in ordered}
+        for iid in self.tree.get_children():
+            if iid not in wanted:
+                self.tree.delete(iid)
+
+        overdue = 0
+        for index, (record_id, return_date, return_time, supplier, material, invoice_no) in enumerate(ordered):
+            iid = str(record_id)
+            tag = "overdue" if return_date < today else "due_soon"
+            overdue += tag == "overdue"
+            values = (return_date, supplier, material, invoice_no)
+            if not self.tree.exists(iid):
+                self.tree.insert("", index, iid=iid, values=values, tags=(tag,))
+            else:
+                self.tree.item(iid, values=values, tags=(tag,))
+                if self.tree.index(iid) != index:
+                    self.tree.move(iid, "", index)
+
+        self.title_label.config(text=f"Returnable Material Due: {overdue} overdue, "
+                                     f"{len(ordered) - overdue} due soon",
+                                fg="red" if overdue else "black")
+
+    def mark_returned(self):
+        """Marks the selected item as returned after confirmation."""
+        selected = self.tree.selection()
+        if not selected:
+            return
+        values = self.tree.item(selected[0], "values")
+        if messagebox.askyesno("Mark Returned", f"Has the material '{values[2]}' from {values[1]} been returned?",
+                               parent=self.frame):
+            self.tracker.mark_returned(int(selected[0]), on_error=lambda err: messagebox.showerror(
+                "Database Error", f"Error: {err}", parent=self.frame))
@@ -0,0 +1,119 @@
+from tkinter import TclError
+
+import header
+from platform_support import window_scaling_factor, window_monitor
+
+# Fonts of header.py offered pre-scaled by DisplayScaling.font()
+SCALED_FONT_NAMES = ("NORM_FONT", "NORM_FONT_MEDIUM_HIGH", "NORM_FONT_MEDIUM_LOW", "TIMES_NEW_ROMAN_BIG",
+                     "NORM_VERDANA_FONT", "BOLD_VERDANA_FONT", "LARGE_VERDANA_FONT", "XXL_FONT", "XL_FONT", "L_FONT")
+
+# Virtual event sent to a window whose scaling factor changed, e.g. after it was moved to another monitor
+SCALING_CHANGED_EVENT = "<<ScalingChanged>>"
+
+# Points per inch; Tk font sizes are given in points
+POINTS_PER_INCH = 72
+
+
+class DisplayScaling:
+    """
+    Resolves the DPI scaling factor once per Toplevel and caches it together with the scaled fonts.
+
+    The factor is read from the window itself (see window_scaling_factor()), not from whichever window has
+    the focus, and only the first time a widget of that window asks. Afterwards scaled() and font() are
+    dictionary lookups. When a window is moved or resized, its monitor is compared once the events have
+    settled; only if it is on another monitor the factor is read again. When the factor changed, the
+    cached fonts are dropped and the window receives SCALING_CHANGED_EVENT so it can lay itself out again.
+    """
+
+    def __init__(self):
+        self._windows = {}  # Toplevel path -> [factor, monitor, pending check]
+        self._bound = set()  # Toplevel paths whose events are bound
+        self._fonts = {}  # (font name, factor) -> font tuple
+
+    def _window(self, widget):
+        toplevel = widget.winfo_toplevel()
+        key = str(toplevel)
+        entry = self._windows.get(key)
+        if entry is None:
+            entry = self._windows[key] = [window_scaling_factor(toplevel), window_monitor(toplevel), None]
+            if key not in self._bound:
+                self._bound.add(key)
+                toplevel.bind("<Configure>", lambda event: self._schedule_check(toplevel, event), add="+")
+                toplevel.bind("<Destroy>", lambda event: self._forget(toplevel, event), add="+")
+        return entry
+
+    def factor(self, widget):
+        """Returns the scaling factor of `widget`'s window, 1.0 at 96 DPI."""
+        return self._window(widget)[0]
+
+    def scaled(self, value, widget):
+        """Returns `value` (pixels at 96 DPI) scaled for `widget`'s window."""
+        return int(value * self._window(widget)[0])
+
+    def font(self, name, widget):
+        """
+        Returns a header.py font (e.g. "XL_FONT") sized for `widget`'s window.
+
+        The size is given in pixels (a negative Tk size), so text has the same physical size on every
+        monitor instead of following the DPI Tk read at startup.
+
+        Parameters:
+        name (str): One of SCALED_FONT_NAMES.
+        widget (tk.Widget): Any widget of the window the font is for.
+        """
+        factor = self._window(widget)[0]
+        font = self._fonts.get((name, factor))
+        if font is None:
+            family, points, *style = getattr(header, name)
+            pixels = round(points * 96 / POINTS_PER_INCH * factor)
+            font = self._fonts[(name, factor)] = (family, -pixels, *style)
+        return font
+
+    def fonts(self, widget):
+        """Returns every font of SCALED_FONT_NAMES sized for `widget`'s window, by name."""
+        return {name: self.font(name, widget) for name in SCALED_FONT_NAMES}
+
+    def _schedule_check(self, toplevel, event):
+        # Configure also fires for every child widget; moving or resizing fires it many times in a row
+        entry = self._windows.get(str(toplevel))
+        if event.widget is not toplevel or entry is None or entry[2] is not None:
+            return
+        entry[2] = toplevel.after_idle(lambda: self._check(toplevel))
+
+    def _check(self, toplevel):
+        entry = self._windows.get(str(toplevel))
+        if entry is None:
+            return
+        entry[2] = None
+        try:
+            monitor = window_monitor(toplevel)
+            if monitor == entry[1]:
+                return
+            entry[1] = monitor
+            factor = window_scaling_factor(toplevel)
+            if factor != entry[0]:
+                entry[0] = factor
+                toplevel.event_generate(SCALING_CHANGED_EVENT)
+        except TclError:
+            pass
+
+    def _forget(self, toplevel, event):
+        if event.widget is toplevel:
+            self._windows.pop(str(toplevel), None)
+            self._bound.discard(str(toplevel))
+
+    def invalidate(self, widget=None):
+        """Forgets the cached factor of `widget`'s window, or of all windows, e.g. after a settings change."""
+        if widget is None:
+            self._windows.clear()
+        else:
+            self._windows.pop(str(widget.winfo_toplevel()), None)
+        self._fonts.clear()
+
+
+_display_scaling = DisplayScaling()
+
+
+def get_display_scaling():
+    """Returns the application's DisplayScaling."""
+    return _display_scaling
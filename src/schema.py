@@ -0,0 +1,331 @@
+import hashlib
+from datetime import datetime
+
+from config import database_columns
+from storage import db_connection, get_storage
+from instrumentation import log_warning
+
+# Bump this whenever the DDL below changes in a way that is not captured by the column lists
+SCHEMA_REVISION = 1
+
+# Columns of the login_users table: user_name, password and category
+login_users_columns = [
+    "user_name VARCHAR(255)",  # Stores the username as a string
+    "password VARCHAR(255)",  # Stores the password as a string
+    "category VARCHAR(255)"  # Stores the user category as a string
+]
+
+# Columns of the projects table
+projects_columns = [
+    "project_name VARCHAR(100)",
+    "tpl_name VARCHAR(50)"
+]
+
+# Columns of the inward_daily_summary table: entries and quantity per day, project, supplier, department and
+# benefit type (see summary.py). The five key columns are too long for one primary key, so rows are keyed by
+# the MD5 of the combination instead.
+inward_daily_summary_columns = [
+    "Date DATE NOT NULL",
+    "Project VARCHAR(255) NOT NULL",
+    "Supplier VARCHAR(255) NOT NULL",
+    "Department VARCHAR(255) NOT NULL",
+    "Benefit_Type VARCHAR(255) NOT NULL",
+    "entry_count INT NOT NULL",
+    "qty_sum BIGINT NOT NULL"
+]
+
+# Columns of the single-row inward_summary_state table: how far the last rebuild of the summary got
+inward_summary_state_columns = [
+    "through_id INT NOT NULL",  # Highest inward_logistic id already counted by the rebuild
+    "complete TINYINT NOT NULL"  # 1 once the rebuild has finished and every write updates the summary
+]
+
+# Columns of the single-row inward_archive_state table: the latest year moved to inward_logistic_archive
+inward_archive_state_columns = [
+    "archived_through_year INT"
+]
+
+# Columns of the inward_entry_keys table: the idempotency key of every record saved from a gate's queue
+# (see entry_queue.py) and the id it got, so a queued record resent after a lost commit is not saved twice
+inward_entry_keys_columns = [
+    "record_id INT NOT NULL"
+]
+
+# Columns of inward_logistic beyond the form fields: when a record was last saved, set by every INSERT and
+# UPDATE of the application (NULL for records saved before the column existed). The local replicas
+# (see replica.py) read the changes since their last sync by it.
+inward_logistic_sync_columns = [
+    "updated_at DATETIME"
+]
+
+# Table name -> (primary key definition, column definitions)
+schema_tables = {
+    "inward_logistic": ("id INT AUTO_INCREMENT PRIMARY KEY", database_columns + inward_logistic_sync_columns),
+    "login_users": ("sno INT AUTO_INCREMENT PRIMARY KEY", login_users_columns),
+    "projects": ("SNo INT AUTO_INCREMENT PRIMARY KEY", projects_columns),
+    "inward_daily_summary": ("summary_key CHAR(32) PRIMARY KEY", inward_daily_summary_columns),
+    "inward_summary_state": ("id TINYINT PRIMARY KEY", inward_summary_state_columns),
+    # Closed years of inward_logistic (see archive.py). Every unique key of a partitioned table must contain
+    # the partitioning column, so the primary key is (id, Date); the ids are the ones the rows had before.
+    "inward_logistic_archive": ("id INT NOT NULL, PRIMARY KEY (id, Date)", database_columns),
+    "inward_archive_state": ("id TINYINT PRIMARY KEY", inward_archive_state_columns),
+    "inward_entry_keys": ("entry_key CHAR(32) PRIMARY KEY", inward_entry_keys_columns),
+}
+
+# Table name -> options appended to its CREATE TABLE statement on the MySQL server.
+# The archive is partitioned by year; archive.py splits a partition per archived year off p_future.
+schema_table_options = {
+    "inward_logistic_archive": "PARTITION BY RANGE (YEAR(`Date`)) (PARTITION p_future VALUES LESS THAN MAXVALUE)",
+}
+
+# Secondary indexes on the columns users filter by, plus FULLTEXT indexes for "Contains Word" on free text.
+# MATCH() must name exactly the columns of one FULLTEXT index, so every text column gets its own.
+# Backends without FULLTEXT support (SQLite, see storage.py) only get the B-tree indexes.
+# Index name -> (index type, indexed columns)
+inward_logistic_indexes = {
+    "idx_invoice_no": ("INDEX", ("Invoice_No",)),
+    "idx_po_no": ("INDEX", ("PO_No",)),
+    "idx_supplier": ("INDEX", ("Supplier",)),
+    "idx_project": ("INDEX", ("Project",)),
+    "idx_date": ("INDEX", ("Date",)),
+    "idx_material": ("INDEX", ("Material",)),
+    "idx_return_due": ("INDEX", ("Return_Type", "Return_Date")),
+    "ft_material": ("FULLTEXT", ("Material",)),
+    "ft_remark": ("FULLTEXT", ("Remark",)),
+    "ft_tpl_remarks": ("FULLTEXT", ("TPL_Remarks",)),
+}
+
+# The dashboard always reads one date range of the summary
+inward_daily_summary_indexes = {
+    "idx_summary_date": ("INDEX", ("Date",)),
+}
+
+# The archive gets the same B-tree indexes; InnoDB does not support FULLTEXT indexes on partitioned tables,
+# so "Contains Word" on the archive always uses LIKE
+inward_logistic_archive_indexes = {name: (index_type, columns)
+                                   for name, (index_type, columns) in inward_logistic_indexes.items()
+                                   if index_type != "FULLTEXT"}
+
+# The replicas ask for the records edited since their last sync; the archive has no updated_at column
+inward_logistic_sync_indexes = {
+    "idx_updated_at": ("INDEX", ("updated_at",)),
+}
+
+# Table name -> indexes maintained by the schema bootstrap
+schema_indexes = {
+    "inward_logistic": {**inward_logistic_indexes, **inward_logistic_sync_indexes},
+    "inward_daily_summary": inward_daily_summary_indexes,
+    "inward_logistic_archive": inward_logistic_archive_indexes,
+}
+
+# Index names owned by the bootstrap; only these are ever dropped when they are no longer declared
+MANAGED_INDEX_PREFIXES = ("idx_", "ft_")
+
+# Columns with a single-column FULLTEXT index, read once from the server (see get_fulltext_columns)
+_fulltext_columns = None
+
+
+def schema_fingerprint():
+    """
+    Computes the version string stored in the schema_meta table.
+
+    The fingerprint changes whenever SCHEMA_REVISION, any of the column lists (including
+    `database_columns` in header.py) or the declared indexes change, which is what triggers the migration path on startup.
+
+    Returns:
+    str: "<revision>:<hash of the table definitions>".
+    """
+    spec = []
+    for table, (primary_key, columns) in schema_tables.items():
+        spec.append(f"{table}({primary_key},{','.join(columns)}){schema_table_options.get(table, '')}")
+    for table, indexes in schema_indexes.items():
+        for name, (index_type, columns) in sorted(indexes.items()):
+            spec.append(f"{table}.{name}:{index_type}({','.join(columns)})")
+    digest = hashlib.sha1("|".join(spec).encode("utf-8")).hexdigest()[:16]
+    return f"{SCHEMA_REVISION}:{digest}"
+
+
+def expected_admin_password():
+    """Returns the Admin password for the current month, e.g. 'password@52025'."""
+    now = datetime.now()
+    return f"password@{now.month}{now.year}"
+
+
+def bootstrap_schema():
+    """
+    Makes sure the logistic schema is current, using a single round trip when nothing has changed.
+
+    One query reads the stored schema version together with the Admin password and the number of
+    users. If the version matches `schema_fingerprint()`, all DDL is skipped and only the monthly
+    Admin password rotation is applied when needed. Otherwise the tables are created, missing or
+    changed columns are migrated, and the new version is recorded.
+
+    Raises:
+    StorageBackend.Error: If the database cannot be reached or a statement fails.
+    """
+    expected_version = schema_fingerprint()
+    storage = get_storage()
+
+    with db_connection() as conn:
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                SELECT (SELECT version FROM schema_meta WHERE id = 1),
+                       (SELECT password FROM login_users WHERE user_name = 'Admin' LIMIT 1),
+                       (SELECT COUNT(*) FROM login_users)
+            """)
+            stored_version, admin_password, user_count = cursor.fetchone()
+        except storage.Error as err:
+            if not storage.is_missing_table(err):
+                raise
+            stored_version, admin_password, user_count = None, None, 0
+
+        if stored_version != expected_version:
+            log_warning("schema outdated, migrating", stored_version=stored_version,
+                        expected_version=expected_version)
+            apply_schema(cursor)
+            upsert = storage.upsert_clause("schema_meta", ["id"], {"version": storage.inserted("version"),
+                                                                   "updated_at": storage.inserted("updated_at")})
+            cursor.execute(f"INSERT INTO schema_meta (id, version, updated_at) VALUES (1, %s, NOW()) {upsert}",
+                           (expected_version,))
+            cursor.execute("SELECT (SELECT password FROM login_users WHERE user_name = 'Admin' LIMIT 1), "
+                           "(SELECT COUNT(*) FROM login_users)")
+            admin_password, user_count = cursor.fetchone()
+
+        # Create a default admin user if the table is empty, otherwise rotate the Admin password
+        if not user_count:
+            cursor.execute("INSERT INTO login_users (user_name, password, category) VALUES (%s, %s, %s)",
+                           ("Admin", expected_admin_password(), "Admin"))
+        elif admin_password is not None and admin_password != expected_admin_password():
+            cursor.execute("UPDATE login_users SET password = %s WHERE user_name = %s",
+                           (expected_admin_password(), "Admin"))
+
+        # Only pay for a COMMIT round trip when something was actually written
+        if conn.in_transaction:
+            conn.commit()
+        cursor.close()
+
+
+def apply_schema(cursor):
+    """
+    Creates every table that does not exist yet and migrates the columns and indexes of existing tables.
+
+    Parameters:
+    cursor: Cursor on a connection to the logistic database.
+    """
+    storage = get_storage()
+    storage.create_table(cursor, "schema_meta", "id TINYINT PRIMARY KEY",
+                         ["version VARCHAR(64)", "updated_at DATETIME"])
+
+    for table, (primary_key, columns) in schema_tables.items():
+        storage.create_table(cursor, table, primary_key, columns, schema_table_options.get(table, ''))
+        migrate_columns(cursor, table, columns)
+        migrate_indexes(cursor, table, schema_indexes.get(table, {}))
+
+
+def _normalize_type(column_type):
+    """Lower-cases a column type and drops integer display widths, e.g. 'int(11)' -> 'int'."""
+    column_type = column_type.strip().lower()
+    for int_type in ("tinyint", "smallint", "mediumint", "bigint", "int"):
+        if column_type.startswith(int_type + "("):
+            return int_type + column_type[column_type.index(")") + 1:]
+    return column_type
+
+
+def migrate_columns(cursor, table, columns, storage=None):
+    """
+    Adds missing columns and changes the type of columns whose definition changed.
+
+    Columns which are no longer listed are left untouched so that no data is ever dropped.
+
+    Parameters:
+    cursor: Cursor on a connection to the logistic database.
+    table (str): Name of the table to migrate.
+    columns (list): Column definitions such as "Supplier VARCHAR(255)".
+    storage (StorageBackend): Backend the cursor belongs to; default the application's storage.
+    """
+    storage = storage or get_storage()
+    existing = {name.lower(): _normalize_type(column_type)
+                for name, column_type in storage.read_columns(cursor, table)}
+
+    added = []
+    modified = []
+    previous = None
+    for definition in columns:
+        name, column_type = definition.split(" ", 1)
+        current_type = existing.get(name.lower())
+        if current_type is None:
+            added.append((name, column_type, previous))
+        elif current_type != _normalize_type(column_type):
+            modified.append((name, column_type))
+        previous = name
+
+    if added or modified:
+        log_warning("migrating table", table=table, added=[name for name, _, _ in added],
+                    modified=[name for name, _ in modified])
+        storage.alter_columns(cursor, table, added, modified)
+
+
+def migrate_indexes(cursor, table, indexes, storage=None):
+    """
+    Creates declared indexes which are missing and rebuilds those whose columns changed.
+
+    Bootstrap-managed indexes (idx_*/ft_*) that are no longer declared are dropped; any other index is left
+    alone. FULLTEXT indexes are skipped on backends without FULLTEXT support.
+
+    Parameters:
+    cursor: Cursor on a connection to the logistic database.
+    table (str): Name of the table to migrate.
+    indexes (dict): Index name -> (index type, indexed columns), e.g. inward_logistic_indexes.
+    storage (StorageBackend): Backend the cursor belongs to; default the application's storage.
+    """
+    global _fulltext_columns
+
+    storage = storage or get_storage()
+    if not storage.supports_fulltext:
+        indexes = {name: (index_type, columns) for name, (index_type, columns) in indexes.items()
+                   if index_type != "FULLTEXT"}
+    existing = storage.read_indexes(cursor, table)
+
+    dropped = [name for name in existing if name.startswith(MANAGED_INDEX_PREFIXES) and name not in indexes]
+    added = []
+    for name, (index_type, columns) in indexes.items():
+        if name in existing:
+            if [column.lower() for column in existing[name][1]] == [column.lower() for column in columns]:
+                continue
+            dropped.append(name)
+        added.append((name, index_type, columns))
+
+    if dropped or added:
+        log_warning("migrating indexes", table=table, dropped=dropped, added=[name for name, _, _ in added])
+        storage.alter_indexes(cursor, table, dropped, added)
+
+    # The set of FULLTEXT indexes may have changed; read it again on next use
+    _fulltext_columns = None
+
+
+def get_fulltext_columns(table="inward_logistic"):
+    """
+    Returns the columns of `table` that have their own single-column FULLTEXT index.
+
+    The answer is read from the database once per process and cached, so the Search and Edit windows only
+    route "Contains Word" to MATCH ... AGAINST when the index really exists. It is empty on backends without
+    FULLTEXT support.
+
+    Returns:
+    set: Column names, e.g. {"Material", "Remark", "TPL_Remarks"}.
+    """
+    global _fulltext_columns
+    if _fulltext_columns is None:
+        storage = get_storage()
+        if not storage.supports_fulltext:
+            _fulltext_columns = set()
+            return _fulltext_columns
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            indexes = storage.read_indexes(cursor, table)
+            cursor.close()
+        _fulltext_columns = {columns[0] for index_type, columns in indexes.values()
+                             if index_type == "FULLTEXT" and len(columns) == 1}
+    return _fulltext_columns
@@ -1,6 +1,6 @@
 from common_utils import *
 
-class SearchWindow:
+class SearchWindow(ReusableWindow):
     def __init__(self, master, download_callback):
         """
         Initializes the search window for filtering and displaying data from an Excel file.
@@ -15,6 +15,11 @@ class SearchWindow:
         self.heading_frame = None
         self.remove_button = None
         self.download_button = None
+        # Status text of the last search and the entries saved since, reported by the change feed
+        self.search_status = None
+        self.new_entry_count = 0
+        # Whether searches also read the archive of closed years (see archive.py)
+        self.include_archive = None
         self.master = master  # Store the parent window reference
         self.download_callback = download_callback  # Store the download callback function
 
@@ -25,20 +30,31 @@ class SearchWindow:
         self.fields = column_names
 
         # Define the file path of the source Excel file containing data
-        self.file_name = os.path.join(
-            os.path.join(os.environ["USERPROFILE"], "OneDrive - FORVIA"),
-            "Inward_logistic_master", "Inward Material Register.xlsx"
-        )
+        self.file_name = os.path.join(shared_register_dir(), "Inward Material Register.xlsx")
 
         # Define the file path where the filtered data will be saved
-        self.output_filename = os.path.join(
-            os.path.join(os.environ["USERPROFILE"], "OneDrive - FORVIA"),
-            "Inward_logistic_master", "Filtered_Inward_Material.xlsx"
-        )
+        self.output_filename = os.path.join(shared_register_dir(), "Filtered_Inward_Material.xlsx")
 
         # Call method to create and display the search window
         self.create_search_window()
 
+    @property
+    def toplevel(self):
+        return self.search_window
+
+    def reset_window(self):
+        """Restores a single empty filter row, the initial status text and the disabled Download button."""
+        while len(self.filter_rows) > 1:
+            self.remove_filter_row()
+        column_var, operator_option, entry_var, _ = self.filter_rows[0]
+        column_var.set("")
+        operator_option.set("")
+        entry_var.set("")
+        self.search_status = None
+        self.include_archive.set(False)
+        self.status_label.config(text="Select Filter and Press Search", fg="green")
+        self.download_button.configure(bg='lightgrey', disabledforeground="darkgrey", state=DISABLED)
+
     def create_search_window(self):
         """
         Creates and configures the search window where users can filter data from an Excel file.
@@ -64,6 +80,9 @@ class SearchWindow:
         # Disable resizing of the search window
         self.search_window.resizable(width=False, height=False)
 
+        # Closing only hides the window; it is reused the next time Search is clicked
+        self.search_window.protocol("WM_DELETE_WINDOW", self.hide_window)
+
         # Create UI frames to organize different sections of the window
         self.heading_frame = tk.Frame(self.search_window, bg='wheat')  # Header section
         self.filter_frame = tk.Frame(self.search_window, bd=4, relief='ridge', bg='wheat')  # Filter fields section
@@ -89,6 +108,10 @@ class SearchWindow:
         self.filter_frame.pack(padx=10, pady=10, fill=tk.X)  # Filter section
         self.button_frame.pack(pady=10)  # Buttons section
         self.status_label.pack(pady=5)  # Status label
+        ReplicaStatusLabel(self.search_window).pack()  # Freshness of the local copy, if searched
+
+        # The exported workbook is a snapshot; the status tells when entries were saved after it
+        get_change_feed(self.search_window).subscribe(self.status_label, self.show_new_entries)
 
     def add_filter_row(self):
         """
@@ -96,7 +119,7 @@ class SearchWindow:
 
         Each filter row consists of:
         - A dropdown to select the column to filter.
-        - A dropdown to choose the filtering operator (Equals, Not Equals, Contains, Not Contains).
+        - A dropdown to choose the filtering operator (Equals, Not Equals, Starts With, Contains, Not Contains).
         - A text entry field where the user inputs the value to filter by.
         """
         # Create a frame to hold the filter row components
@@ -116,8 +139,8 @@ class SearchWindow:
         tk.Label(filter_row, text="Operator", font=('ariel narrow', 10), bg='wheat').pack(side=tk.LEFT, padx=5)
 
         # Create a dropdown for selecting an operator (equality, containment, etc.)
-        operator_option = ttk.Combobox(filter_row, values=["Equals", "Not Equals", "Contains", "Not Contains"],
-                                       width=10, state='readonly')
+        operator_option = ttk.Combobox(filter_row, values=FILTER_OPERATORS,
+                                       width=13, state='readonly')
         operator_option.pack(side=tk.LEFT, padx=5)
 
         # Create a text entry field for entering the filter value
@@ -138,7 +161,6 @@ class SearchWindow:
         """
         Expands/Shrinks the search window by 30 pixels in height.
         """
-        print("Calling update_window_size , and requesting :  ",update_type)
         self.search_window.update_idletasks()  # Ensure the window is updated before getting its size
         if update_type == "extend":
             width, height, x, y = map(int,
@@ -175,10 +197,8 @@ class SearchWindow:
     def download_filteredData(self):
         source_path = self.output_filename
 
-        print("download_filteredData-> ", source_path)
-
         # Get user's default download directory
-        download_dir = str(Path.home() / "Downloads")
+        download_dir = downloads_dir()
         destination_path = os.path.join(download_dir, "Filtered_Inward_Material.xlsx")
 
         if os.path.exists(source_path):
@@ -190,13 +210,13 @@ class SearchWindow:
                 # Open the Downloads directory in File Explorer, handle errors
                 '''
                 try:
-                    subprocess.Popen(["explorer", download_dir], shell=True)
+                    open_folder(download_dir)
                 except Exception as e:
                     print(f"Warning: Failed to open Downloads directory: {e}")
 
                 # Open the downloaded Excel file
                 try:
-                    os.startfile(destination_path)  # Works on Windows
+                    open_file(destination_path)
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to open the file: {str(e)}")
                 '''
@@ -227,6 +247,12 @@ class SearchWindow:
         # Bind "Enter" key to trigger the search button
         self.search_window.bind("<Return>", lambda event: self.search_data())
 
+        # Check box to also search the archive of closed years
+        self.include_archive = tk.BooleanVar(value=False)
+        archive_check = tk.Checkbutton(self.button_frame, text="Archive", variable=self.include_archive,
+                                       font=('ariel narrow', 10), bg='wheat', activebackground='wheat')
+        archive_check.pack(side=tk.LEFT, padx=5, pady=5)
+
         # Bind "Alt" + "+" to add a filter row
         self.search_window.bind("<Alt-Key-plus>", lambda event: self.add_filter_row())
 
@@ -244,112 +270,69 @@ class SearchWindow:
         self.search_window.bind("<Alt-Key-d>", lambda event: result_download())
 
         # Button to close the search window
-        close_button = tk.Button(self.button_frame, text="Close", command=self.search_window.destroy,
+        close_button = tk.Button(self.button_frame, text="Close", command=self.hide_window,
                                  font=('ariel narrow', 10), width=10, bg='light cyan')
         close_button.pack(side=tk.LEFT, padx=10, pady=5)
         # Bind "Escape" key to close the window
-        self.search_window.bind("<Escape>", lambda event: self.search_window.destroy())
+        self.search_window.bind("<Escape>", self.hide_window)
 
     def search_data(self):
-        try:
-            # Connect to the database
-            connection = mysql.connector.connect(**serverdb_config)
-            cursor = connection.cursor()
-
-            # Base query
-            query = "SELECT * FROM inward_logistic WHERE  1=1"
-            print("Initial query : ", query)
-            # Build the query based on filters
-            for column_var, operator_option, entry_var, _ in self.filter_rows:
-                column = column_var.get()
-                operator = operator_option.get()
-                value = entry_var.get().strip()
-                print("Column  : ", column, "operator : ",operator,"value :",value)
-                if column and operator and value:
-                    column = f"`{column}`"  # Enclose column name in backticks
-                    if operator == "Equals":
-                        query += f" AND {column} = '{value}'"
-                    elif operator == "Not Equals":
-                        query += f" AND {column} != '{value}'"
-                    elif operator == "Contains":
-                        query += f" AND {column} LIKE '%{value}%'"
-                    elif operator == "Not Contains":
-                        query += f" AND {column} NOT LIKE '%{value}%'"
-
-            # Execute the query
-            print("Final query : ", query)
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-            # Get column names
-            columns = [desc[0] for desc in cursor.description]
-
-            # Convert to DataFrame
-            df = pd.DataFrame(rows, columns=columns)
-
-            # Close the database connection
-            cursor.close()
-            connection.close()
-
-            # Display record count and save results
-            record_count = len(df)
-            self.status_label.config(
-                text=f"{record_count} records found, Use 'Download' for viewing search results" if record_count else "0 records found",
-                fg="green" if record_count else "red"
-            )
-
-            df.to_excel(self.output_filename, index=False)
-
-            # Load the Excel file for formatting
-            wb = load_workbook(self.output_filename)
-            ws = wb.active
-
-            # Define header styling
-            header_fill = PatternFill(start_color="D9FFFF", end_color="D9FFFF", fill_type="solid")  # Light cyan
-            header_font = Font(name="Bookman Old Style", size=11, bold=True)  # Bold font for headers
-            header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)  # Center align
-
-            # Apply styles to header row
-            for col_num, col_name in enumerate(df.columns, start=1):
-                col_letter = get_column_letter(col_num)
-                cell = ws[f"{col_letter}1"]  # Get header cell
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-
-                # Adjust column width based on column name length
-                ws.column_dimensions[col_letter].width = len(col_name) + 5  # Increase slightly for better fit
-
-            # Apply font style, adjust column width, and wrap text for data rows
-            for col_num, col_cells in enumerate(ws.columns, start=1):
-                max_length = max((len(str(cell.value or "")) for cell in col_cells[1:]),
-                                 default=0)  # Handle empty columns
-                col_letter = get_column_letter(col_num)
-
-                for cell in col_cells[1:]:  # Skip header row
-                    cell.font = Font(name="Bookman Old Style", size=11)
-                    cell.alignment = Alignment(vertical="center",
-                                               wrap_text=len(str(cell.value or "")) > 50)  # Handle None values
-
-                # Adjust column width based on content, capped at 50
-                ws.column_dimensions[col_letter].width = min(
-                    max(max_length + 5, ws.column_dimensions[col_letter].width), 50)
-
-            wb.save(self.output_filename)
-
-            print(f"Filtered data saved to {self.output_filename}")
+        """
+        Runs the search and writes the styled results to the output workbook on a background thread.
+
+        The filter values are read here on the Tk thread; the query and the Excel export run as a job
+        on the task executor while the window shows a busy cursor and the number of rows exported so far.
+        """
+        executor = get_task_executor(self.search_window)
+        if executor.is_busy(self.search_window):
+            return  # A search is already running
+
+        # Collect (column, operator, value) from every filter row
+        filters = [(column_var.get(), operator_option.get(), entry_var.get().strip())
+                   for column_var, operator_option, entry_var, _ in self.filter_rows]
+        output_filename = self.output_filename
+        include_archive = self.include_archive.get()
+        # The local copy of the register answers the search once it is seeded (see replica.py)
+        storage = get_register_replica(self.search_window).search_storage(include_archive)
+
+        def run_search(task):
+            # Query and Excel export run in one pass on a pooled connection (see register.py)
+            return search_to_workbook(filters, output_filename, include_archive=include_archive,
+                                      progress=task.report_progress, storage=storage)
+
+        def show_progress(row_count):
+            self.status_label.config(text=f"Searching... {row_count} records exported", fg="green")
+
+        def show_results(record_count):
+            # Display record count
+            self.search_status = f"{record_count} records found, Use 'Download' for viewing search results" if record_count else "0 records found"
+            self.new_entry_count = 0
+            self.status_label.config(text=self.search_status, fg="green" if record_count else "red")
 
             if record_count > 0:
                 self.download_button.configure(bg='light cyan', highlightbackground='light cyan', fg='black',
                                                state=ACTIVE)
                 try:
-                    os.startfile(self.output_filename)  # Works on Windows
+                    open_file(output_filename)
                 except Exception as e:
                     messagebox.showerror("Error", f"Failed to open the file: {str(e)}")
 
-        except Exception as e:
+        def show_error(e):
+            self.status_label.config(text="Select Filter and Press Search", fg="green")
             messagebox.showerror("Error", f"Failed to search the database: {str(e)}")
 
+        self.status_label.config(text="Searching...", fg="green")
+        executor.submit(run_search, on_success=show_results, on_error=show_error,
+                        on_progress=show_progress, owner=self.search_window)
+
+    def show_new_entries(self, rows):
+        """Change feed subscriber: counts the entries saved since the last search in the status text."""
+        if self.search_status is None:
+            return
+        self.new_entry_count += len(rows)
+        self.status_label.config(text=f"{self.search_status} ({self.new_entry_count} new entries since, "
+                                      f"search again to include them)")
+
     def display_filtered_data(self, df):
         # Remove any existing widgets from the table frame to refresh the data display
         for widget in self.table_frame.winfo_children():
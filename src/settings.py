@@ -26,6 +26,16 @@ class SettingsWindow:
         self.users_menu.add_command(label="Create", command=self.create_user)
         self.users_menu.add_command(label="Change Password", command=self.change_password)
 
+        # Create the 'Register' menu
+        self.register_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Register", menu=self.register_menu)
+        self.register_menu.add_command(label="Archive Closed Years", command=self.archive_register)
+
+        # Create the 'Performance' menu
+        self.performance_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Performance", menu=self.performance_menu)
+        self.performance_menu.add_command(label="Operation Timings", command=self.show_timings)
+
         self.settings_window.mainloop()
 
     def create_project(self):
@@ -94,6 +104,9 @@ class SettingsWindow:
         self.modify_window.grid_columnconfigure(0, weight=1)
         self.modify_window.grid_columnconfigure(1, weight=1)
 
+        # Fill the project drop-down from the lookup cache
+        self.load_projects()
+
 
     def create_user(self):
         self.user_window = tk.Toplevel(self.settings_window)
@@ -150,34 +163,202 @@ class SettingsWindow:
                                         font=('ariel narrow', 10), width=15, bg='light cyan')
         btn_change_password.grid(row=2, column=0, padx=5, pady=5)
 
+    def archive_register(self):
+        self.archive_window = tk.Toplevel(self.settings_window)
+        self.archive_window.title("Archive Closed Years")
+        self.archive_window.geometry('{}x{}+{}+{}'.format(480, 150, int(self.width / 2.6), int(self.height / 3)))
+        self.archive_window.configure(bg='wheat')
+
+        lbl_year = tk.Label(self.archive_window, text="Archive up to year:", font=('ariel narrow', 12), bg='wheat')
+        lbl_year.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+
+        self.archive_year_dropdown = ttk.Combobox(self.archive_window, font=('ariel narrow', 10), state="readonly",
+                                                  width=38)
+        self.archive_year_dropdown.grid(row=0, column=1, padx=5, pady=5, sticky="we")
+
+        self.archive_status = tk.Label(self.archive_window, text="", font=('ariel narrow', 10), bg='wheat')
+        self.archive_status.grid(row=1, column=0, columnspan=2, padx=5, pady=5)
+
+        # Create a frame for the buttons
+        button_frame = tk.Frame(self.archive_window, width=200, height=100, bd=4, relief='ridge', bg='wheat')
+        button_frame.grid(row=2, column=0, columnspan=2, pady=5)
+
+        btn_archive = tk.Button(button_frame, text="Archive", command=self.start_archive,
+                                font=('ariel narrow', 10), width=10, bg='light cyan')
+        btn_archive.grid(row=0, column=0, padx=5, pady=5)
+
+        btn_close_archive = tk.Button(button_frame, text="Close", command=self.archive_window.destroy,
+                                      font=('ariel narrow', 10), width=10, bg='light cyan')
+        btn_close_archive.grid(row=0, column=1, padx=5, pady=5)
+
+        self.archive_window.grid_columnconfigure(0, weight=1)
+        self.archive_window.grid_columnconfigure(1, weight=1)
+
+        def fill_years(years):
+            if not self.archive_year_dropdown.winfo_exists():
+                return
+            self.archive_year_dropdown["values"] = years
+            self.archive_year_dropdown.set(years[-1] if years else "")
+            if not years:
+                self.archive_status.config(text="No closed years left in the register")
+
+        get_task_executor(self.settings_window).submit(lambda task: archivable_years(), on_success=fill_years,
+                                                       on_error=lambda err: self.show_archive_error(
+                                                           err, "Could not read the closed years"),
+                                                       owner=self.archive_window, busy=False)
+
+    def start_archive(self):
+        year = self.archive_year_dropdown.get()
+        if not year:
+            messagebox.showwarning("Warning", "No year selected!", parent=self.archive_window)
+            return
+        executor = get_task_executor(self.archive_window)
+        if executor.is_busy(self.archive_window):
+            return
+        if not messagebox.askyesno("Archive", f"Move all entries up to the end of {year} to the archive?\n"
+                                              f"They stay searchable with the 'Archive' option of the Search window.",
+                                   parent=self.archive_window):
+            return
+
+        def show_progress(archived_year, moved, year_rows):
+            self.archive_status.config(text=f"Archiving {archived_year}: {moved} of {year_rows} entries moved")
+
+        def show_result(total_moved):
+            self.archive_status.config(text=f"{total_moved} entries archived")
+            messagebox.showinfo("Success", f"{total_moved} entries moved to the archive", parent=self.archive_window)
+
+        # Closing the window stops the move after the current chunk; starting it again continues
+        executor.submit(lambda task: archive_years(int(year), progress=task.report_progress),
+                        on_success=show_result,
+                        on_error=lambda err: self.show_archive_error(
+                            err, "Archiving stopped; the entries moved so far stay archived, "
+                                 "start it again to continue"),
+                        on_progress=show_progress, owner=self.archive_window)
+
+    def show_archive_error(self, err, message):
+        """
+        Reports a failed archive job in the archive window, e.g. a failed partition split or a lock wait timeout.
+
+        Only a lost connection to the server takes the application-wide connection error path.
+        """
+        storage = get_storage()
+        if isinstance(err, storage.Error) and storage.is_connection_lost(err):
+            self.show_connection_error(err)
+            return
+        log_warning("archive job failed", error=str(err))
+        self.archive_status.config(text=f"{message}: {err}")
+        messagebox.showerror("Archive Error", f"{message}.\n\nError: {err}", parent=self.archive_window)
+
+    def show_timings(self):
+        self.timings_window = tk.Toplevel(self.settings_window)
+        self.timings_window.title("Operation Timings")
+        self.timings_window.geometry('{}x{}+{}+{}'.format(820, 400, int(self.width / 4), int(self.height / 4)))
+        self.timings_window.configure(bg='wheat')
+
+        # One row per timed operation; the percentiles cover its latest timings since the application started
+        columns = ("Operation", "Count", "p50 ms", "p95 ms", "Max ms", "Slow", "Failed", "Rows")
+        table_frame = tk.Frame(self.timings_window, bg='wheat')
+        table_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        self.timings_tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=12)
+        for column in columns:
+            self.timings_tree.heading(column, text=column, anchor="center")
+            self.timings_tree.column(column, width=200 if column == "Operation" else 80,
+                                     anchor="w" if column == "Operation" else "center")
+        self.timings_tree.tag_configure("slow", background="light yellow")
+        v_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.timings_tree.yview)
+        self.timings_tree.configure(yscrollcommand=v_scroll.set)
+        v_scroll.pack(side="right", fill="y")
+        self.timings_tree.pack(side="left", fill="both", expand=True)
+
+        lbl_log = tk.Label(self.timings_window, text=f"Slow operations (p95 of {get_perf_recorder().slow_ms} ms or more) "
+                                                     f"are highlighted. Log: {os.path.join(LOG_DIR, LOG_FILE_NAME)}",
+                           font=('ariel narrow', 10), bg='wheat')
+        lbl_log.pack(padx=5, pady=2)
+
+        # Create a frame for the buttons
+        button_frame = tk.Frame(self.timings_window, width=200, height=100, bd=4, relief='ridge', bg='wheat')
+        button_frame.pack(pady=5)
+
+        btn_refresh = tk.Button(button_frame, text="Refresh", command=self.fill_timings,
+                                font=('ariel narrow', 10), width=10, bg='light cyan')
+        btn_refresh.grid(row=0, column=0, padx=5, pady=5)
+
+        btn_reset = tk.Button(button_frame, text="Reset", command=self.reset_timings,
+                              font=('ariel narrow', 10), width=10, bg='light cyan')
+        btn_reset.grid(row=0, column=1, padx=5, pady=5)
+
+        btn_close_timings = tk.Button(button_frame, text="Close", command=self.timings_window.destroy,
+                                      font=('ariel narrow', 10), width=10, bg='light cyan')
+        btn_close_timings.grid(row=0, column=2, padx=5, pady=5)
+
+        self.fill_timings()
+
+    def fill_timings(self):
+        """Shows the current figures of every timed operation, slowest p95 first."""
+        recorder = get_perf_recorder()
+        stats = recorder.get_stats()
+        self.timings_tree.delete(*self.timings_tree.get_children())
+        for operation, figures in sorted(stats.items(), key=lambda item: item[1]["p95_ms"], reverse=True):
+            self.timings_tree.insert("", "end", values=(
+                operation, figures["count"], f"{figures['p50_ms']:.1f}", f"{figures['p95_ms']:.1f}",
+                f"{figures['max_ms']:.1f}", figures["slow"], figures["failed"], figures["rows"]),
+                tags=("slow",) if figures["p95_ms"] >= recorder.slow_ms else ())
+
+    def reset_timings(self):
+        if messagebox.askyesno("Reset", "Forget all timings collected so far?", parent=self.timings_window):
+            get_perf_recorder().reset()
+            self.fill_timings()
+
+    def run_db_task(self, job, on_done):
+        """
+        Runs a database job on the task executor and hands its outcome to `on_done` on the Tk thread.
+
+        Parameters:
+        job (callable): Function taking the Task and doing the database work; it must not touch widgets.
+        on_done (callable): Called with the job's return value to show the result to the user.
+        """
+        executor = get_task_executor(self.settings_window)
+        # One settings change at a time; repeated clicks while it runs are ignored
+        if executor.is_busy(self.settings_window):
+            return
+        # Settings changes are writes: closing the window must not drop one still waiting for a worker
+        executor.submit(job, on_success=on_done, on_error=self.show_connection_error, owner=self.settings_window,
+                        cancellable=False)
+
+    def show_connection_error(self, err):
+        root = tk.Tk()
+        root.withdraw()
+        response = messagebox.askokcancel("Connection Error", "Could not connect to server. Application will close.")
+        if response:
+            root.destroy()
+            sys.exit(1)
+        log_warning("database connection failed", error=str(err))
+
     def save_project(self):
         project_name = self.entry_project_name.get().strip()
         if project_name:
-            db_config = serverdb_config
-            try:
-                conn = mysql.connector.connect(**db_config)
-                cursor = conn.cursor()
-                cursor.execute("USE logistic")
-                query = "SELECT * FROM projects WHERE project_name = %s"
-                cursor.execute(query, (project_name,))
-                if cursor.fetchone():
+            def insert_project(task):
+                with db_connection() as conn:
+                    cursor = conn.cursor()
+                    query = "SELECT * FROM projects WHERE project_name = %s"
+                    cursor.execute(query, (project_name,))
+                    exists = cursor.fetchone() is not None
+                    if not exists:
+                        query = "INSERT INTO projects (project_name, tpl_name) VALUES (%s, %s)"
+                        cursor.execute(query, (project_name, None))
+                        conn.commit()
+                        invalidate_project_names()
+                    cursor.close()
+                return exists
+
+            def show_result(exists):
+                if exists:
                     messagebox.showwarning("Warning", "Project already exists!")
                 else:
-                    query = "INSERT INTO projects (project_name, tpl_name) VALUES (%s, %s)"
-                    cursor.execute(query, (project_name, None))
-                    conn.commit()
                     messagebox.showinfo("Success", "Project Added Successfully")
                     self.entry_project_name.delete(0, tk.END)
-                cursor.close()
-                conn.close()
-            except mysql.connector.Error as err:
-                root = tk.Tk()
-                root.withdraw()
-                response = messagebox.askokcancel("Connection Error", "Could not connect to server. Application will close.")
-                if response:
-                    root.destroy()
-                    sys.exit(1)
-                print(f"Error: {err}")
+
+            self.run_db_task(insert_project, show_result)
         else:
             messagebox.showwarning("Warning", "Enter a valid project name!")
 
@@ -190,32 +371,30 @@ class SettingsWindow:
         if not new_project_name:
             messagebox.showwarning("Warning", "Enter a new project name!")
             return
-        db_config = serverdb_config
-        try:
-            conn = mysql.connector.connect(**db_config)
-            cursor = conn.cursor()
-            cursor.execute("USE logistic")
-            query = "SELECT * FROM projects WHERE project_name = %s"
-            cursor.execute(query, (selected_project,))
-            if cursor.fetchone():
-                query = "UPDATE projects SET project_name = %s WHERE project_name = %s"
-                cursor.execute(query, (new_project_name, selected_project))
-                conn.commit()
+
+        def rename_project(task):
+            with db_connection() as conn:
+                cursor = conn.cursor()
+                query = "SELECT * FROM projects WHERE project_name = %s"
+                cursor.execute(query, (selected_project,))
+                found = cursor.fetchone() is not None
+                if found:
+                    query = "UPDATE projects SET project_name = %s WHERE project_name = %s"
+                    cursor.execute(query, (new_project_name, selected_project))
+                    conn.commit()
+                    invalidate_project_names()
+                cursor.close()
+            return found
+
+        def show_result(found):
+            if found:
                 messagebox.showinfo("Success", "Project Modified Successfully")
                 self.entry_modify_project.delete(0, tk.END)
+                self.load_projects()
             else:
                 messagebox.showwarning("Warning", "Selected project not found!")
-            cursor.close()
-            conn.close()
 
-        except mysql.connector.Error as err:
-            root = tk.Tk()
-            root.withdraw()
-            response = messagebox.askokcancel("Connection Error", "Could not connect to server. Application will close.")
-            if response:
-                root.destroy()
-                sys.exit(1)
-            print(f"Error: {err}")
+        self.run_db_task(rename_project, show_result)
 
 
     def save_user(self):
@@ -223,34 +402,29 @@ class SettingsWindow:
         password = self.entry_password.get().strip()
         category = self.category_var.get().strip()
         if username and password and category:
-            db_config = serverdb_config
-            try:
-                conn = mysql.connector.connect(**db_config)
-                cursor = conn.cursor()
-                cursor.execute("USE logistic")
-                query = "SELECT * FROM login_users WHERE user_name = %s"
-                cursor.execute(query, (username,))
-                if cursor.fetchone():
+            def insert_user(task):
+                with db_connection() as conn:
+                    cursor = conn.cursor()
+                    query = "SELECT * FROM login_users WHERE user_name = %s"
+                    cursor.execute(query, (username,))
+                    exists = cursor.fetchone() is not None
+                    if not exists:
+                        query = "INSERT INTO login_users (user_name, password, category) VALUES (%s, %s, %s)"
+                        cursor.execute(query, (username, password, category))
+                        conn.commit()
+                    cursor.close()
+                return exists
+
+            def show_result(exists):
+                if exists:
                     messagebox.showwarning("Warning", "User already exists!")
                 else:
-                    query = "INSERT INTO login_users (user_name, password, category) VALUES (%s, %s, %s)"
-                    cursor.execute(query, (username, password, category))
-                    conn.commit()
                     messagebox.showinfo("Success", "User Created Successfully")
                     self.entry_username.delete(0, tk.END)
                     self.entry_password.delete(0, tk.END)
                     self.category_var.set("User")
-                cursor.close()
-                conn.close()
-            except mysql.connector.Error as err:
-                root = tk.Tk()
-                root.withdraw()
-                response = messagebox.askokcancel("Connection Error",
-                                                  "Could not connect to server. Application will close.")
-                if response:
-                    root.destroy()
-                    sys.exit(1)
-                print(f"Error: {err}")
+
+            self.run_db_task(insert_user, show_result)
         else:
             messagebox.showwarning("Warning", "Enter valid user details!")
 
@@ -259,46 +433,40 @@ class SettingsWindow:
         username = self.entry_username.get().strip()
         new_password = self.entry_new_password.get().strip()
         if username and new_password:
-            db_config = serverdb_config
-            try:
-                conn = mysql.connector.connect(**db_config)
-                cursor = conn.cursor()
-                cursor.execute("USE logistic")
-                query = "SELECT * FROM login_users WHERE user_name = %s"
-                cursor.execute(query, (username,))
-                if cursor.fetchone():
-                    query = "UPDATE login_users SET password = %s WHERE user_name = %s"
-                    cursor.execute(query, (new_password, username))
-                    conn.commit()
+            def change_user_password(task):
+                with db_connection() as conn:
+                    cursor = conn.cursor()
+                    query = "SELECT * FROM login_users WHERE user_name = %s"
+                    cursor.execute(query, (username,))
+                    found = cursor.fetchone() is not None
+                    if found:
+                        query = "UPDATE login_users SET password = %s WHERE user_name = %s"
+                        cursor.execute(query, (new_password, username))
+                        conn.commit()
+                    cursor.close()
+                return found
+
+            def show_result(found):
+                if found:
                     messagebox.showinfo("Success", "Password Changed Successfully")
                     self.entry_new_password.delete(0, tk.END)
                 else:
                     messagebox.showwarning("Warning", "User not found!")
-                cursor.close()
-                conn.close()
-            except mysql.connector.Error as err:
-                root = tk.Tk()
-                root.withdraw()
-                response = messagebox.askokcancel("Connection Error",
-                                                  "Could not connect to server. Application will close.")
-                if response:
-                    root.destroy()
-                    sys.exit(1)
-                print(f"Error: {err}")
+
+            self.run_db_task(change_user_password, show_result)
         else:
             messagebox.showwarning("Warning", "Enter valid username and new password!")
 
 
     def load_projects(self):
-        if os.path.exists("projects.txt"):
-            with open("projects.txt", "r") as file:
-                projects = file.read().splitlines()
-                self.project_dropdown["values"] = projects
-                if projects:
-                    self.project_dropdown.set(projects[0])
-                else:
-                    self.project_dropdown["values"] = []
-                    self.project_dropdown.set("")
-        else:
-            self.project_dropdown["values"] = []
-            self.project_dropdown.set("")
\ No newline at end of file
+        """Fills the project drop-down of the Modify Project window from the cached project list."""
+        def fill_projects(projects):
+            if not self.project_dropdown.winfo_exists():
+                return
+            self.project_dropdown["values"] = projects
+            self.project_dropdown.set(projects[0] if projects else "")
+
+        get_task_executor(self.settings_window).submit(lambda task: cached_project_names(),
+                                                       on_success=fill_projects,
+                                                       on_error=self.show_connection_error,
+                                                       owner=self.modify_window, busy=False)
@@ -0,0 +1,580 @@
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from config import storage_config
+from platform_support import data_dir
+
+# Environment variable that selects the backend instead of storage_config['backend'], e.g. "sqlite" in CI
+STORAGE_BACKEND_ENV = "INWARD_LOGISTIC_STORAGE"
+
+# File name of the SQLite database inside the data directory
+SQLITE_FILE_NAME = "logistic.sqlite3"
+
+# MySQL server error raised when a table does not exist yet
+ER_NO_SUCH_TABLE = 1146
+
+# Primary keys declared as "<column> INT AUTO_INCREMENT PRIMARY KEY" in schema.py
+AUTO_INCREMENT_KEY_PATTERN = re.compile(r"^(\w+) INT AUTO_INCREMENT PRIMARY KEY$", re.IGNORECASE)
+
+# Column types compared case-insensitively, as with the server's default collation
+TEXT_TYPE_PATTERN = re.compile(r"^(VARCHAR|CHAR|TEXT)\b", re.IGNORECASE)
+
+# Collation given to the text columns of a SQLite table
+SQLITE_TEXT_COLLATION = " COLLATE NOCASE"
+
+# A quoted string literal or identifier, whose text is left alone, or a %s placeholder
+SQLITE_PLACEHOLDER_PATTERN = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|`[^`]*`|%s")
+
+
+class StorageBackend(ABC):
+    """
+    The database the register (inward_logistic), the users (login_users) and the projects are stored in.
+
+    The application's SQL is written once, in MySQL's dialect with %s placeholders and backtick quoting. A
+    backend runs it on its database and supplies the pieces that differ between databases: the connections,
+    the upsert and row locking clauses, and the introspection and DDL used by the schema bootstrap
+    (see schema.py). get_storage() returns the backend chosen in storage_config. A backend that lacks one of
+    the abstract methods fails when it is created, not in the middle of a migration.
+
+    Attributes:
+    name (str): 'mysql' or 'sqlite'.
+    Error (type): Base class of the errors raised by the backend's database driver.
+    supports_fulltext (bool): FULLTEXT indexes and MATCH ... AGAINST are available.
+    supports_partitions (bool): Tables can be partitioned, like the archive of closed years (see archive.py).
+    lock_shared_clause (str): Appended to a SELECT in a transaction to lock the rows read against writers.
+    lock_update_clause (str): Appended to a SELECT in a transaction to lock the rows read for an update.
+    """
+
+    name = None
+    Error = Exception
+    supports_fulltext = False
+    supports_partitions = False
+    lock_shared_clause = ""
+    lock_update_clause = ""
+
+    @abstractmethod
+    def connection(self):
+        """
+        Borrows a connection for the duration of a `with` block; uncommitted work is rolled back at the end.
+
+        The connection offers the part of MySQL Connector's interface the application uses: cursor(),
+        start_transaction(), commit(), rollback() and in_transaction.
+        """
+
+    def is_connection_lost(self, err):
+        """Returns True if `err` means the connection itself is gone, so a retry needs a new one."""
+        return False
+
+    @abstractmethod
+    def is_missing_table(self, err):
+        """Returns True if `err` was raised because a table does not exist yet."""
+
+    @abstractmethod
+    def inserted(self, column):
+        """Returns the expression for the value a conflicting INSERT tried to write to `column`."""
+
+    @abstractmethod
+    def upsert_clause(self, table, key_columns, assignments):
+        """
+        Returns the clause that turns an INSERT into an update of the row whose key already exists.
+
+        Parameters:
+        table (str): Table the INSERT writes to.
+        key_columns (list): Columns of the primary key the conflict is detected on.
+        assignments (dict): Column -> SQL expression of its new value; inserted() refers to the new row.
+        """
+
+    @abstractmethod
+    def create_table(self, cursor, table, primary_key, columns, options=""):
+        """
+        Creates a table unless it exists.
+
+        Parameters:
+        cursor: Cursor on a connection of this backend.
+        table (str): Name of the table.
+        primary_key (str): Primary key definition from schema.py, e.g. "id INT AUTO_INCREMENT PRIMARY KEY".
+        columns (list): Column definitions such as "Supplier VARCHAR(255)".
+        options (str): MySQL table options such as a PARTITION BY clause.
+        """
+
+    @abstractmethod
+    def read_columns(self, cursor, table):
+        """Returns (column name, declared type) of every column of an existing table."""
+
+    @abstractmethod
+    def read_indexes(self, cursor, table):
+        """Returns index name -> (index type, [indexed columns]) for the secondary indexes of a table."""
+
+    @abstractmethod
+    def alter_columns(self, cursor, table, added, modified):
+        """
+        Adds and changes columns of an existing table.
+
+        Parameters:
+        added (list): (column name, type, name of the column it follows or None) of the new columns.
+        modified (list): (column name, type) of the columns whose type changed.
+        """
+
+    @abstractmethod
+    def alter_indexes(self, cursor, table, dropped, added):
+        """
+        Drops and creates secondary indexes of a table.
+
+        Parameters:
+        dropped (list): Names of the indexes to drop.
+        added (list): (index name, index type, indexed columns) of the indexes to create.
+        """
+
+    def get_stats(self):
+        """Returns the connection counters of the backend."""
+        return {}
+
+    def close(self):
+        """Closes the idle connections, e.g. when the application exits."""
+
+
+class MySQLBackend(StorageBackend):
+    """The plant's MySQL server in serverdb_config, through the shared connection pool (see db_pool.py)."""
+
+    name = "mysql"
+    supports_fulltext = True
+    supports_partitions = True
+    lock_shared_clause = " LOCK IN SHARE MODE"
+    lock_update_clause = " FOR UPDATE"
+
+    def __init__(self):
+        # MySQL Connector is only needed when the server is used, so the SQLite backend runs without it
+        import mysql.connector
+        import db_pool
+        self.Error = mysql.connector.Error
+        self._db_pool = db_pool
+
+    def connection(self):
+        return self._db_pool.db_connection()
+
+    def is_connection_lost(self, err):
+        return getattr(err, "errno", None) in self._db_pool.CONNECTION_LOST_ERRNOS
+
+    def is_missing_table(self, err):
+        return getattr(err, "errno", None) == ER_NO_SUCH_TABLE
+
+    def inserted(self, column):
+        return f"VALUES(`{column}`)"
+
+    def upsert_clause(self, table, key_columns, assignments):
+        # The key columns are implied: any unique key of the table can raise the conflict
+        return "ON DUPLICATE KEY UPDATE " + ", ".join(f"{table}.`{column}` = {expression}"
+                                                      for column, expression in assignments.items())
+
+    def create_table(self, cursor, table, primary_key, columns, options=""):
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                {primary_key},
+                {', '.join(columns)}
+            ) {options}
+        """)
+
+    def read_columns(self, cursor, table):
+        cursor.execute("""
+            SELECT COLUMN_NAME, COLUMN_TYPE FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """, (table,))
+        return cursor.fetchall()
+
+    def read_indexes(self, cursor, table):
+        cursor.execute("""
+            SELECT INDEX_NAME, INDEX_TYPE, COLUMN_NAME FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME <> 'PRIMARY'
+            ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """, (table,))
+        indexes = {}
+        for index_name, index_type, column_name in cursor.fetchall():
+            indexes.setdefault(index_name, ("FULLTEXT" if index_type == "FULLTEXT" else "INDEX", []))[1].append(
+                column_name)
+        return indexes
+
+    def alter_columns(self, cursor, table, added, modified):
+        alterations = [f"ADD COLUMN `{name}` {column_type}" + (f" AFTER `{previous}`" if previous else "")
+                       for name, column_type, previous in added]
+        alterations += [f"MODIFY COLUMN `{name}` {column_type}" for name, column_type in modified]
+        if alterations:
+            cursor.execute(f"ALTER TABLE {table} {', '.join(alterations)}")
+
+    def alter_indexes(self, cursor, table, dropped, added):
+        # B-tree changes go into one ALTER TABLE; InnoDB only builds a single FULLTEXT index per ALTER
+        alterations = [f"DROP INDEX `{name}`" for name in dropped]
+        fulltext = []
+        for name, index_type, columns in added:
+            column_list = ", ".join(f"`{column}`" for column in columns)
+            if index_type == "FULLTEXT":
+                fulltext.append(f"ADD FULLTEXT INDEX `{name}` ({column_list})")
+            else:
+                alterations.append(f"ADD INDEX `{name}` ({column_list})")
+        if alterations:
+            cursor.execute(f"ALTER TABLE {table} {', '.join(alterations)}")
+        for clause in fulltext:
+            cursor.execute(f"ALTER TABLE {table} {clause}")
+
+    def get_stats(self):
+        return self._db_pool.get_pool().get_stats()
+
+    def close(self):
+        self._db_pool.get_pool().close_all()
+
+
+@lru_cache(maxsize=512)
+def _sqlite_query(query):
+    """
+    Translates MySQL's %s placeholders into SQLite's; backtick quoting is understood by SQLite as is.
+
+    A %s inside a quoted literal, e.g. a DATE_FORMAT pattern, is text and stays as it is.
+    """
+    return SQLITE_PLACEHOLDER_PATTERN.sub(lambda match: "?" if match.group() == "%s" else match.group(), query)
+
+
+class SQLiteCursor:
+    """A sqlite3 cursor taking the application's %s queries, with MySQL Connector's lastrowid semantics."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.lastrowid = None
+
+    def execute(self, query, params=()):
+        self._cursor.execute(_sqlite_query(query), params or ())
+        self.lastrowid = self._cursor.lastrowid
+
+    def executemany(self, query, seq_params):
+        """
+        Runs a statement for every parameter set, all or nothing.
+
+        On the server a batch INSERT is one multi-row statement: a bad row rejects the whole statement and
+        lastrowid is the id of the first row. The savepoint and the lastrowid below behave the same way.
+        """
+        self._cursor.execute("SAVEPOINT executemany")
+        try:
+            self._cursor.executemany(_sqlite_query(query), seq_params)
+        except sqlite3.Error:
+            self._cursor.execute("ROLLBACK TO executemany")
+            self._cursor.execute("RELEASE executemany")
+            raise
+        row_count = self._cursor.rowcount
+        self._cursor.execute("RELEASE executemany")
+        self.lastrowid = None
+        if row_count > 0 and query.lstrip().upper().startswith("INSERT"):
+            last_id = self._cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.lastrowid = last_id - row_count + 1
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """A sqlite3 connection in autocommit mode with the part of MySQL Connector's interface the application uses."""
+
+    # Results are read on demand from the database file, so nothing is ever left unread on the connection
+    unread_result = False
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, prepared=False, buffered=None):
+        # sqlite3 keeps its own cache of prepared statements, so `prepared` needs nothing extra
+        return SQLiteCursor(self._connection.cursor())
+
+    def start_transaction(self):
+        # SQLite locks the whole database instead of rows. Taking the write lock up front serializes the
+        # writers at this point, which is what the row locks (FOR UPDATE, LOCK IN SHARE MODE) do on the server.
+        self._connection.execute("BEGIN IMMEDIATE")
+
+    @property
+    def in_transaction(self):
+        return self._connection.in_transaction
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+def _convert_date(value):
+    try:
+        return date.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+def _convert_time(value):
+    # The server returns TIME columns as timedelta; so does this backend
+    try:
+        hours, minutes, seconds = value.decode().split(":")
+        return timedelta(hours=int(hours), minutes=int(minutes), seconds=float(seconds))
+    except ValueError:
+        return value.decode()
+
+
+def _convert_datetime(value):
+    try:
+        return datetime.fromisoformat(value.decode())
+    except ValueError:
+        return value.decode()
+
+
+def _adapt_time(value):
+    total_seconds = int(value.total_seconds())
+    return f"{total_seconds // 3600:02d}:{total_seconds % 3600 // 60:02d}:{total_seconds % 60:02d}"
+
+
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("TIME", _convert_time)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" ", "seconds"))
+sqlite3.register_adapter(timedelta, _adapt_time)
+
+
+def _sql_md5(value):
+    return None if value is None else hashlib.md5(str(value).encode("utf-8")).hexdigest()
+
+
+def _sql_concat_ws(separator, *values):
+    return separator.join(str(value) for value in values if value is not None)
+
+
+def _sql_greatest(*values):
+    return None if any(value is None for value in values) else max(values)
+
+
+def _sql_now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+# MySQL functions used by the application's SQL which SQLite does not have: name -> (argument count, function)
+SQLITE_FUNCTIONS = {
+    "MD5": (1, _sql_md5),
+    "CONCAT_WS": (-1, _sql_concat_ws),
+    "GREATEST": (-1, _sql_greatest),
+    "NOW": (0, _sql_now),
+}
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    A local SQLite database file with the tables and B-tree indexes of the server, for CI, load tests and
+    gates without a connection to the server.
+
+    The database runs in WAL mode, so searches keep reading while an entry is saved. Text columns compare
+    case-insensitively like the server's default collation, which also lets prefix LIKE ("Starts With") use
+    the indexes. There are no FULLTEXT indexes ("Contains Word" uses LIKE) and no partitions.
+    """
+
+    name = "sqlite"
+    Error = sqlite3.Error
+
+    def __init__(self, path=None, busy_timeout=10):
+        """
+        Parameters:
+        path (str): The database file, created on first use; default logistic.sqlite3 in the data directory.
+        busy_timeout (float): Seconds a writer waits for another writer to finish before failing.
+        """
+        self.path = path or data_dir(SQLITE_FILE_NAME)
+        self.busy_timeout = busy_timeout
+        # Connections are reused like the server's pool; SQLite connections are cheap, so there is no limit
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # A connection is used by one thread at a time, but not always by the thread that opened it
+        connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                     detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        for name, (argument_count, function) in SQLITE_FUNCTIONS.items():
+            connection.create_function(name, argument_count, function)
+        with self._lock:
+            self._created += 1
+        return SQLiteConnection(connection)
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+            except sqlite3.Error:
+                conn.close()
+                with self._lock:
+                    self._created -= 1
+
+    def is_missing_table(self, err):
+        return isinstance(err, sqlite3.OperationalError) and str(err).startswith("no such table")
+
+    def inserted(self, column):
+        return f"excluded.`{column}`"
+
+    def upsert_clause(self, table, key_columns, assignments):
+        keys = ", ".join(f"`{column}`" for column in key_columns)
+        return f"ON CONFLICT ({keys}) DO UPDATE SET " + ", ".join(f"`{column}` = {expression}"
+                                                                 for column, expression in assignments.items())
+
+    @staticmethod
+    def _column_definition(definition):
+        name, column_type = definition.split(" ", 1)
+        if TEXT_TYPE_PATTERN.match(column_type):
+            return f"{definition}{SQLITE_TEXT_COLLATION}"
+        return definition
+
+    def create_table(self, cursor, table, primary_key, columns, options=""):
+        # Only an INTEGER PRIMARY KEY is filled in automatically; AUTOINCREMENT never hands out an id twice,
+        # as on the server. The options (partitioning) have no SQLite counterpart.
+        # A table constraint such as "PRIMARY KEY (id, Date)" must follow the column definitions here.
+        match = AUTO_INCREMENT_KEY_PATTERN.match(primary_key)
+        if match:
+            primary_key = f"`{match.group(1)}` INTEGER PRIMARY KEY AUTOINCREMENT"
+        key_column, _, key_constraint = primary_key.partition(", PRIMARY KEY")
+        definitions = [key_column] + [self._column_definition(definition) for definition in columns]
+        if key_constraint:
+            definitions.append("PRIMARY KEY" + key_constraint)
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})")
+
+    def read_columns(self, cursor, table):
+        cursor.execute(f"PRAGMA table_info({table})")
+        # (cid, name, type, notnull, default, pk); the type is the declaration without the constraints
+        return [(row[1], row[2] + (" NOT NULL" if row[3] else "")) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _index_name(table, name):
+        # Index names are unique per database in SQLite, not per table
+        return f"{table}_{name}"
+
+    def read_indexes(self, cursor, table):
+        cursor.execute(f"PRAGMA index_list({table})")
+        # Origin 'c' are the indexes created with CREATE INDEX, not those of the primary key
+        names = [row[1] for row in cursor.fetchall() if row[3] == "c"]
+        indexes = {}
+        for name in names:
+            cursor.execute(f"PRAGMA index_info(`{name}`)")
+            columns = [row[2] for row in sorted(cursor.fetchall())]
+            prefix = self._index_name(table, "")
+            indexes[name[len(prefix):] if name.startswith(prefix) else name] = ("INDEX", columns)
+        return indexes
+
+    def alter_columns(self, cursor, table, added, modified):
+        # New columns go to the end; the application always names the columns it reads. SQLite cannot change
+        # a column's type, and need not: a column stores any value, its declared type only guides conversion.
+        for name, column_type, _ in added:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {self._column_definition(f'`{name}` {column_type}')}")
+
+    def alter_indexes(self, cursor, table, dropped, added):
+        for name in dropped:
+            cursor.execute(f"DROP INDEX IF EXISTS `{self._index_name(table, name)}`")
+        for name, index_type, columns in added:
+            column_list = ", ".join(f"`{column}`" for column in columns)
+            cursor.execute(f"CREATE INDEX `{self._index_name(table, name)}` ON {table} ({column_list})")
+
+    def get_stats(self):
+        with self._lock:
+            return {"open": self._created, "idle": self._idle.qsize()}
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+def create_storage(name):
+    """
+    Creates the backend called `name` with the settings of storage_config.
+
+    Raises:
+    ValueError: If there is no backend of that name.
+    """
+    if name == "mysql":
+        return MySQLBackend()
+    if name == "sqlite":
+        return SQLiteBackend(storage_config['sqlite_path'], storage_config['sqlite_busy_timeout'])
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """
+    Returns the application's storage backend, created on first use.
+
+    It is storage_config['backend'] unless the INWARD_LOGISTIC_STORAGE environment variable names another.
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage(os.environ.get(STORAGE_BACKEND_ENV) or storage_config['backend'])
+    return _storage
+
+
+def use_storage(backend):
+    """Makes `backend` the application's storage, e.g. a SQLiteBackend on a scratch file in a load test."""
+    global _storage
+    with _storage_lock:
+        _storage = backend
+
+
+def db_connection():
+    """
+    Borrows a connection of the application's storage for the duration of a `with` block.
+
+    Usage:
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            ...
+
+    The connection is returned when the block exits and uncommitted work is rolled back.
+    """
+    return get_storage().connection()
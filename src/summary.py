@@ -0,0 +1,173 @@
+from storage import db_connection, get_storage
+from instrumentation import timed
+
+# Dashboard grouping -> column of inward_daily_summary
+SUMMARY_DIMENSIONS = {
+    "Project": "Project",
+    "Supplier": "Supplier",
+    "Department": "Department",
+    "Benefit Type": "Benefit_Type",
+    "Date": "Date"
+}
+
+# inward_logistic ids counted per transaction while the summary is rebuilt
+SUMMARY_REBUILD_CHUNK = 20000
+
+# Adds (sign = 1) or removes (sign = -1) the selected inward_logistic rows to/from the daily summary.
+# Empty key columns are stored as '' because they are part of the row's key; rows without a Date are not counted.
+# {upsert} is the storage backend's clause adding the counts to an existing row (see _summary_upsert_clause).
+_summary_upsert_query = """
+    INSERT INTO inward_daily_summary
+        (summary_key, Date, Project, Supplier, Department, Benefit_Type, entry_count, qty_sum)
+    SELECT MD5(CONCAT_WS(CHAR(31), Date, Project, Supplier, Department, Benefit_Type)),
+           Date, Project, Supplier, Department, Benefit_Type, %s * COUNT(*), %s * COALESCE(SUM(Qty), 0)
+    FROM (
+        SELECT Date, COALESCE(Project, '') AS Project, COALESCE(Supplier, '') AS Supplier,
+               COALESCE(Department, '') AS Department, COALESCE(Benefit_Type, '') AS Benefit_Type, Qty
+        FROM {table}
+        WHERE Date IS NOT NULL AND {where}
+    ) AS changed
+    GROUP BY Date, Project, Supplier, Department, Benefit_Type
+    {upsert}
+"""
+
+
+def _summary_upsert_clause():
+    storage = get_storage()
+    return storage.upsert_clause("inward_daily_summary", ["summary_key"], {
+        "entry_count": f"inward_daily_summary.entry_count + {storage.inserted('entry_count')}",
+        "qty_sum": f"inward_daily_summary.qty_sum + {storage.inserted('qty_sum')}"
+    })
+
+
+def _apply_to_summary(cursor, where, params, sign, table="inward_logistic"):
+    cursor.execute(_summary_upsert_query.format(table=table, where=where, upsert=_summary_upsert_clause()),
+                   (sign, sign, *params))
+
+
+def _count_into_summary(cursor, where, params):
+    """Counts the rows of the register and of its archive (see archive.py) selected by `where`."""
+    _apply_to_summary(cursor, where, params, 1)
+    _apply_to_summary(cursor, where, params, 1, table="inward_logistic_archive")
+
+
+def read_summary_state(cursor, lock=True):
+    """
+    Reads how far the daily summary has been built.
+
+    Writers call this first in their transaction: the shared lock makes a rebuild wait until the write has
+    committed, and a rebuild in progress makes the write wait until the current chunk is counted.
+
+    Parameters:
+    cursor: Cursor on a connection inside a transaction (when locking).
+    lock (bool): Take a shared lock on the state row.
+
+    Returns:
+    tuple: (through_id, complete); (0, False) when the summary has never been built.
+    """
+    cursor.execute("SELECT through_id, complete FROM inward_summary_state WHERE id = 1"
+                   + (get_storage().lock_shared_clause if lock else ""))
+    row = cursor.fetchone()
+    return (row[0], bool(row[1])) if row else (0, False)
+
+
+def update_daily_summary(cursor, state, record_ids, sign=1):
+    """
+    Adds saved records to the daily summary, or removes them before they are changed.
+
+    Call this in the same transaction as the write: with sign=1 after an INSERT or UPDATE, with sign=-1
+    before an UPDATE. Records the summary does not cover yet (a rebuild has not reached them) are skipped;
+    the rebuild counts them with their final values.
+
+    Parameters:
+    cursor: Cursor of the writing transaction.
+    state (tuple): The result of read_summary_state() for this transaction.
+    record_ids (list): inward_logistic ids of the records.
+    sign (int): 1 to add the records, -1 to remove them.
+    """
+    through_id, complete = state
+    covered = [int(record_id) for record_id in record_ids if complete or int(record_id) <= through_id]
+    if covered:
+        _apply_to_summary(cursor, f"id IN ({', '.join(['%s'] * len(covered))})", covered, sign)
+
+
+def build_daily_summary(progress=None, restart=False, chunk_size=SUMMARY_REBUILD_CHUNK):
+    """
+    Builds the daily summary from inward_logistic and its archive by id range, resuming an interrupted build.
+
+    Every chunk of ids is counted and recorded as `through_id` in its own short transaction, so the
+    gates keep saving while the build runs and an interrupted build continues where it stopped. The last
+    step counts whatever was entered during the build and marks the summary complete, after which every
+    write updates it incrementally.
+
+    Parameters:
+    progress (callable): Called as progress(through_id, max_id) after each chunk, e.g. Task.report_progress.
+    restart (bool): Discard a partial build instead of resuming it. A complete summary is always counted
+                    again from scratch, e.g. after data was changed outside the application.
+    chunk_size (int): ids counted per transaction.
+    """
+    storage = get_storage()
+    with db_connection() as conn:
+        cursor = conn.cursor()
+
+        conn.start_transaction()
+        through_id, complete = read_summary_state(cursor, lock=False)
+        if restart or complete or not through_id:
+            # Taking the state row first waits for writers still updating the old summary
+            reset = storage.upsert_clause("inward_summary_state", ["id"], {"through_id": "0", "complete": "0"})
+            cursor.execute(f"INSERT INTO inward_summary_state (id, through_id, complete) VALUES (1, 0, 0) {reset}")
+            cursor.execute("DELETE FROM inward_daily_summary")
+            through_id = 0
+        cursor.execute("SELECT GREATEST((SELECT COALESCE(MAX(id), 0) FROM inward_logistic), "
+                       "(SELECT COALESCE(MAX(id), 0) FROM inward_logistic_archive))")
+        max_id = cursor.fetchone()[0]
+        conn.commit()
+
+        while through_id < max_id:
+            upper_id = min(through_id + chunk_size, max_id)
+            with timed("summary.rebuild_chunk"):
+                conn.start_transaction()
+                cursor.execute("SELECT through_id FROM inward_summary_state WHERE id = 1"
+                               + storage.lock_update_clause)
+                cursor.fetchall()
+                _count_into_summary(cursor, "id > %s AND id <= %s", (through_id, upper_id))
+                cursor.execute("UPDATE inward_summary_state SET through_id = %s WHERE id = 1", (upper_id,))
+                conn.commit()
+            through_id = upper_id
+            if progress:
+                progress(through_id, max_id)
+
+        # Records entered during the build have ids above max_id and were skipped by the writers
+        conn.start_transaction()
+        cursor.execute("SELECT through_id FROM inward_summary_state WHERE id = 1" + storage.lock_update_clause)
+        cursor.fetchall()
+        _count_into_summary(cursor, "id > %s", (through_id,))
+        cursor.execute("UPDATE inward_summary_state SET through_id = "
+                       "(SELECT COALESCE(MAX(id), 0) FROM inward_logistic), complete = 1 WHERE id = 1")
+        conn.commit()
+        cursor.close()
+
+
+def fetch_summary(start_date, end_date, dimension):
+    """
+    Reads entries and quantity per value of one dimension between two dates from the daily summary.
+
+    Parameters:
+    start_date (date): First day of the range.
+    end_date (date): Last day of the range.
+    dimension (str): A key of SUMMARY_DIMENSIONS.
+
+    Returns:
+    tuple: (rows of (value, entries, quantity), summary state as returned by read_summary_state())
+    """
+    column = SUMMARY_DIMENSIONS[dimension]
+    order_by = "`Date`" if column == "Date" else "2 DESC"
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        state = read_summary_state(cursor, lock=False)
+        cursor.execute(f"SELECT `{column}`, SUM(entry_count), SUM(qty_sum) FROM inward_daily_summary "
+                       f"WHERE Date BETWEEN %s AND %s GROUP BY `{column}` HAVING SUM(entry_count) > 0 "
+                       f"ORDER BY {order_by}", (start_date, end_date))
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows, state
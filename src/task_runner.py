@@ -0,0 +1,234 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import messagebox, TclError
+
+from errors import TaskCancelled
+from instrumentation import log_event
+
+# Worker threads running database and file jobs
+TASK_WORKERS = 3
+
+# How often (milliseconds) the Tk thread collects finished jobs and progress reports
+TASK_POLL_INTERVAL_MS = 50
+
+
+class Task:
+    """
+    Handle of a job submitted to the TaskExecutor.
+
+    The job receives its Task as the only argument. It can report progress with `report_progress()`,
+    which also raises TaskCancelled once the task was cancelled, so long jobs stop at their next
+    progress report. The Tk side can call `cancel()` at any time.
+
+    A task that is not `cancellable` (a write) is not cancelled when its owner window is hidden or closed:
+    it always runs, and an error is still shown if the window is gone by then.
+    """
+
+    def __init__(self, executor, owner, on_success, on_error, on_progress, busy, cancellable=True):
+        self.owner = owner
+        self.busy = busy
+        self.cancellable = cancellable
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self._executor = executor
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Asks the job to stop; its success/error callbacks will not be called."""
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        """Raises TaskCancelled if the task was cancelled. Call this from the job between steps."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, *args):
+        """
+        Sends a progress report to the Tk thread, where it is passed to on_progress(*args).
+
+        Raises:
+        TaskCancelled: If the task was cancelled in the meantime.
+        """
+        self.check_cancelled()
+        if self.on_progress:
+            self._executor._events.put(("progress", self, args))
+
+
+class TaskExecutor:
+    """
+    Runs database and file jobs on a thread pool so the Tk mainloop never blocks.
+
+    Jobs must not touch Tk widgets: read the widget values first, do the slow work in the job, and
+    update the UI in `on_success`, which runs on the Tk thread. Results travel back through a queue
+    that the Tk thread drains with `after()` while jobs are active.
+
+    A job can be tied to an `owner` window: the window shows a busy cursor while its jobs run, and
+    when the window is closed its pending jobs are cancelled and their callbacks skipped. Writes are
+    submitted with cancellable=False so that closing the window never drops a save still waiting in the queue.
+    """
+
+    def __init__(self, root, max_workers=TASK_WORKERS, poll_interval=TASK_POLL_INTERVAL_MS):
+        """
+        Parameters:
+        root (tk.Tk): The application root, used to schedule polling on the Tk thread.
+        max_workers (int): Number of worker threads.
+        poll_interval (int): Milliseconds between two polls of the result queue.
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task-worker")
+        self._events = queue.Queue()
+        self._active = set()
+        self._busy_counts = {}
+        self._polling = False
+
+    def submit(self, job, on_success=None, on_error=None, on_progress=None, owner=None, busy=True,
+               cancellable=True):
+        """
+        Runs `job(task)` on a worker thread.
+
+        Parameters:
+        job (callable): Function taking the Task; its return value is passed to on_success.
+        on_success (callable): Called on the Tk thread with the job's result.
+        on_error (callable): Called on the Tk thread with the exception; defaults to an error messagebox.
+        on_progress (callable): Called on the Tk thread with the arguments of task.report_progress().
+        owner (tk.Widget): Window the job belongs to; closing it cancels the job.
+        busy (bool): Show a busy cursor on the owner while the job runs.
+        cancellable (bool): Hiding or closing the owner cancels the job; pass False for writes.
+
+        Returns:
+        Task: Handle that can be used to cancel the job.
+        """
+        task = Task(self, owner, on_success, on_error, on_progress, busy and owner is not None, cancellable)
+        self._active.add(task)
+        if task.busy:
+            self._set_busy(owner, 1)
+        self._pool.submit(self._run, task, job)
+        self._ensure_polling()
+        return task
+
+    def _run(self, task, job):
+        """Worker thread: runs the job and queues its outcome for the Tk thread."""
+        try:
+            task.check_cancelled()
+            self._events.put(("success", task, job(task)))
+        except TaskCancelled:
+            self._events.put(("cancelled", task, None))
+        except Exception as err:
+            log_event("background job failed", level=logging.ERROR, exc_info=True)
+            self._events.put(("error", task, err))
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    @staticmethod
+    def _owner_alive(task):
+        if task.owner is None:
+            return True
+        try:
+            return bool(task.owner.winfo_exists())
+        except TclError:
+            return False
+
+    def _poll(self):
+        """Tk thread: delivers progress reports and results, then reschedules itself while jobs run."""
+        while True:
+            try:
+                kind, task, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                self._deliver(kind, task, payload)
+            except Exception:
+                # A failing callback must not stop the delivery of other results
+                log_event("background job callback failed", level=logging.ERROR, exc_info=True, kind=kind)
+
+        # Jobs of windows that have been closed in the meantime are not worth finishing
+        for task in self._active:
+            if task.cancellable and not self._owner_alive(task):
+                task.cancel()
+
+        if self._active:
+            self.root.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
+
+    def _deliver(self, kind, task, payload):
+        """Tk thread: passes one queued event of a task to the matching callback."""
+        alive = self._owner_alive(task)
+        if kind == "progress":
+            if alive and not task.cancelled:
+                task.on_progress(*payload)
+            return
+
+        self._active.discard(task)
+        if task.busy:
+            self._set_busy(task.owner, -1)
+        if not alive and kind == "error" and not task.cancellable:
+            # The window of a failed write is gone; the user must still learn that it was not saved
+            messagebox.showerror("Error", str(payload))
+            return
+        if not alive or task.cancelled or kind == "cancelled":
+            return
+        if kind == "success":
+            if task.on_success:
+                task.on_success(payload)
+        elif task.on_error:
+            task.on_error(payload)
+        else:
+            messagebox.showerror("Error", str(payload), parent=task.owner)
+
+    def _set_busy(self, owner, delta):
+        """Keeps a per-window count of running jobs and shows the watch cursor while it is non-zero."""
+        count = self._busy_counts.get(owner, 0) + delta
+        if count > 0:
+            self._busy_counts[owner] = count
+        else:
+            self._busy_counts.pop(owner, None)
+        try:
+            owner.configure(cursor="watch" if count > 0 else "")
+        except TclError:
+            pass
+
+    def cancel_owner(self, owner):
+        """Cancels every pending read of `owner`, e.g. when the window is hidden for later reuse."""
+        for task in self._active:
+            if task.owner is owner and task.cancellable:
+                task.cancel()
+
+    def is_busy(self, owner):
+        """Returns True while jobs submitted for `owner` are still running."""
+        return self._busy_counts.get(owner, 0) > 0
+
+    def shutdown(self):
+        """Cancels pending jobs and stops the worker threads without waiting for running ones."""
+        for task in self._active:
+            task.cancel()
+        self._pool.shutdown(wait=False)
+
+
+_executor = None
+
+
+def get_task_executor(widget):
+    """Returns the application's TaskExecutor, creating it on first use for the root of `widget`."""
+    global _executor
+    if _executor is None:
+        _executor = TaskExecutor(widget._root())
+    return _executor
+
+
+def shutdown_task_executor():
+    """Stops the application's TaskExecutor, if one was created."""
+    if _executor is not None:
+        _executor.shutdown()
@@ -0,0 +1,115 @@
+from abc import ABC, abstractmethod
+from tkinter import TclError
+
+from task_runner import get_task_executor
+from instrumentation import timed
+
+
+class ReusableWindow(ABC):
+    """
+    Mixin for windows that are built once and afterwards only hidden and shown again.
+
+    A subclass provides `toplevel` (its tk.Toplevel) and `reset_window()`, which puts the widgets back into
+    the state of a freshly built window. Closing the window calls `hide_window()` instead of destroy().
+    """
+
+    # Modal windows grab all input while they are shown
+    modal = False
+
+    @property
+    @abstractmethod
+    def toplevel(self):
+        """The window's tk.Toplevel."""
+
+    def reset_window(self):
+        """Restores the initial state of the widgets; called before the window is shown again."""
+
+    def hide_window(self, event=None):
+        """Hides the window for later reuse and stops its pending background reads; writes still finish."""
+        get_task_executor(self.toplevel).cancel_owner(self.toplevel)
+        self.toplevel.grab_release()
+        self.toplevel.withdraw()
+
+    def reopen(self):
+        """Resets and shows the hidden window."""
+        self.reset_window()
+        self.toplevel.deiconify()
+        self.toplevel.lift()
+        self.toplevel.focus()
+        if self.modal:
+            self.toplevel.grab_set()
+
+
+class WindowManager:
+    """
+    Builds each application window on first use and reuses it afterwards.
+
+    Building the entry form means creating dozens of widgets and several calendars; showing a hidden,
+    reset window is a fraction of that. Every open is timed until the window's layout is done, and the
+    times are kept per window so built and reused opens can be compared; they are also recorded with
+    the other timed operations (see instrumentation.py).
+
+    Attributes:
+    open_times (dict): Window name -> list of (milliseconds, reused) for every open.
+    """
+
+    def __init__(self):
+        self._windows = {}
+        self.open_times = {}
+
+    @staticmethod
+    def _exists(window):
+        try:
+            return bool(window.toplevel.winfo_exists())
+        except TclError:
+            return False
+
+    def show(self, name, factory):
+        """
+        Shows the window registered as `name`, building it with `factory()` if it does not exist yet.
+
+        Parameters:
+        name (str): Key of the window, e.g. "entry".
+        factory (callable): Builds and returns the ReusableWindow.
+
+        Returns:
+        ReusableWindow: The shown window.
+        """
+        with timed(f"window.{name}") as timing:
+            window = self._windows.get(name)
+            reused = window is not None and self._exists(window)
+            # Built and reused opens are recorded as separate operations, e.g. "window.entry.reused"
+            timing.operation += ".reused" if reused else ".built"
+            if reused:
+                window.reopen()
+            else:
+                window = factory()
+                self._windows[name] = window
+
+            # Count the time until Tk has laid the window out, not just until the widgets exist
+            window.toplevel.update_idletasks()
+        self.open_times.setdefault(name, []).append((timing.elapsed_ms, reused))
+        return window
+
+    def get_open_stats(self):
+        """
+        Returns the open latency per window.
+
+        Returns:
+        dict: Window name -> {"built_ms": first build time, "reused_ms": average reuse time, "opens": count}.
+        """
+        stats = {}
+        for name, times in self.open_times.items():
+            built = [elapsed for elapsed, reused in times if not reused]
+            reused = [elapsed for elapsed, was_reused in times if was_reused]
+            stats[name] = {"built_ms": built[0] if built else None,
+                           "reused_ms": sum(reused) / len(reused) if reused else None,
+                           "opens": len(times)}
+        return stats
+
+    def destroy_all(self):
+        """Destroys every managed window, e.g. on logout, so the next user starts with fresh windows."""
+        for window in self._windows.values():
+            if self._exists(window):
+                window.toplevel.destroy()
+        self._windows.clear()
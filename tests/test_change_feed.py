@@ -0,0 +1,99 @@
+"""
+Tests of the change feed's polls (src/change_feed.py) against a SQLite database standing in for the server.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# The application's files (logs, caches) go to a scratch directory
+DATA_DIR = tempfile.mkdtemp(prefix="inward_logistic_test_")
+os.environ["INWARD_LOGISTIC_DATA_DIR"] = DATA_DIR
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage import SQLiteBackend, db_connection, use_storage  # noqa: E402
+from schema import bootstrap_schema  # noqa: E402
+from change_feed import CHANGE_FEED_RESCAN_IDS, ChangeFeed  # noqa: E402
+
+
+def tearDownModule():
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+def commit_entries(*record_ids):
+    """Commits records with the given ids, standing in for gates whose transactions commit in that order."""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("INSERT INTO inward_logistic (id, Invoice_No) VALUES (%s, %s)",
+                           [(record_id, f"INV{record_id}") for record_id in record_ids])
+        conn.commit()
+        cursor.close()
+
+
+def delivered_ids(rows):
+    return [row[0] for row in rows]
+
+
+class ChangeFeedFetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=DATA_DIR)
+        self.server = SQLiteBackend(os.path.join(self.directory, "server.sqlite3"))
+        use_storage(self.server)
+        bootstrap_schema()
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_first_poll_delivers_nothing(self):
+        commit_entries(1, 2, 3)
+        self.assertEqual((3, set(), []), ChangeFeed._fetch(None, []))
+
+    def test_first_poll_remembers_missing_ids_as_gaps(self):
+        commit_entries(1, 3)
+        self.assertEqual((3, {2}, []), ChangeFeed._fetch(None, []))
+
+    def test_idle_table_has_no_gaps(self):
+        commit_entries(1, 2)
+        last_seen, gaps, rows = ChangeFeed._fetch(None, [])
+        commit_entries(3, 4)
+        last_seen, gaps, rows = ChangeFeed._fetch(last_seen, sorted(gaps))
+        self.assertEqual((4, set(), [3, 4]), (last_seen, gaps, delivered_ids(rows)))
+        self.assertEqual((4, set(), []), ChangeFeed._fetch(last_seen, sorted(gaps)))
+
+    def test_late_commit_of_a_lower_id_is_delivered_once(self):
+        commit_entries(1)
+        last_seen, gaps, rows = ChangeFeed._fetch(None, [])
+
+        # Gate A holds ids 2 and 3 in an open transaction while gate B commits id 4
+        commit_entries(4)
+        last_seen, gaps, rows = ChangeFeed._fetch(last_seen, sorted(gaps))
+        self.assertEqual((4, {2, 3}, [4]), (last_seen, gaps, delivered_ids(rows)))
+
+        commit_entries(2, 3)
+        last_seen, gaps, rows = ChangeFeed._fetch(last_seen, sorted(gaps))
+        self.assertEqual((4, set(), [2, 3]), (last_seen, gaps, delivered_ids(rows)))
+        self.assertEqual([], ChangeFeed._fetch(last_seen, sorted(gaps))[2])
+
+    def test_gap_is_given_up_after_the_look_back(self):
+        commit_entries(1)
+        last_seen, gaps, rows = ChangeFeed._fetch(None, [])
+        commit_entries(3)
+        last_seen, gaps, rows = ChangeFeed._fetch(last_seen, sorted(gaps))
+        self.assertEqual({2}, gaps)
+
+        # Id 2 was rolled back; once the table has grown past the look-back it is no longer asked for
+        commit_entries(3 + CHANGE_FEED_RESCAN_IDS)
+        last_seen, gaps, rows = ChangeFeed._fetch(last_seen, sorted(gaps))
+        self.assertEqual([3 + CHANGE_FEED_RESCAN_IDS], delivered_ids(rows))
+        self.assertNotIn(2, gaps)
+        self.assertEqual(CHANGE_FEED_RESCAN_IDS - 1, len(gaps))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests of the gate's entry queue (src/entry_queue.py) against a SQLite database standing in for the server.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# The application's files (logs, caches) go to a scratch directory
+DATA_DIR = tempfile.mkdtemp(prefix="inward_logistic_test_")
+os.environ["INWARD_LOGISTIC_DATA_DIR"] = DATA_DIR
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage import SQLiteBackend, db_connection, use_storage  # noqa: E402
+from schema import bootstrap_schema  # noqa: E402
+from register import insert_queued_entries  # noqa: E402
+from entry_queue import EntryJournal, EntrySync  # noqa: E402
+
+
+def tearDownModule():
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+def entry_values(invoice_no):
+    """Field values of one record as validate_entry() leaves them."""
+    return ["IN1", "Returnable", "Benefit", "2025-01-02", "10:00:00", "G1", invoice_no, "PO", "BOE",
+            "2025-01-09", "10:00:00", "Supplier", "Material", "5", "Department", "Project", "TPL",
+            "Vehicle", "Received", "Authorized", "Security", "Remark", "TPL Remarks"]
+
+
+def register_invoices():
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT Invoice_No FROM inward_logistic ORDER BY id")
+        rows = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return rows
+
+
+class FakeRoot:
+    """Stands in for the Tk root: records the delays the attempts are scheduled with instead of running them."""
+
+    def __init__(self):
+        self.delays = []
+
+    def after(self, milliseconds, callback):
+        self.delays.append(milliseconds / 1000)
+        return len(self.delays)
+
+    def after_cancel(self, after_id):
+        pass
+
+
+class EntryQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=DATA_DIR)
+        self.server = SQLiteBackend(os.path.join(self.directory, "server.sqlite3"))
+        use_storage(self.server)
+        bootstrap_schema()
+        self.journal = EntryJournal(os.path.join(self.directory, "entry_queue.sqlite3"))
+        self.root = FakeRoot()
+        self.sync = EntrySync(self.root, self.journal, sync_interval=2, max_sync_interval=10, backoff=2)
+
+    def tearDown(self):
+        self.journal.close()
+        self.server.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_batch_sent_twice_is_saved_once(self):
+        self.journal.append(entry_values("INV1"))
+        self.journal.append(entry_values("INV2"))
+
+        # The first attempt committed, but the gate saw a connection error and kept the entries
+        first = insert_queued_entries(self.journal.peek(10))[0]
+        saved_ids = self.sync._send()
+
+        self.assertEqual(sorted(first.values()), sorted(saved_ids))
+        self.assertEqual(["INV1", "INV2"], register_invoices())
+        self.assertEqual((0, 0), self.journal.counts())
+
+    def test_rejected_entry_stays_in_the_journal(self):
+        self.journal.append(entry_values("INV1"))
+        self.journal.append(entry_values("INV2")[:-1])  # One value short, which the database rejects
+
+        self.sync._send()
+
+        self.assertEqual(["INV1"], register_invoices())
+        self.assertEqual((0, 1), self.journal.counts())
+        [(data, error)] = self.journal.rejected()
+        self.assertEqual(entry_values("INV2")[:-1], data)
+        self.assertTrue(error)
+        # It is not sent again with the next batches, only after retry_rejected()
+        self.assertEqual([], self.journal.peek(10))
+        self.journal.retry_rejected()
+        self.assertEqual((1, 0), self.journal.counts())
+
+    def test_backoff_grows_to_the_maximum_and_resets_after_a_success(self):
+        self.sync._running = True
+        self.journal.append(entry_values("INV1"))
+
+        for _ in range(4):
+            self.sync._failed(ConnectionError("server unreachable"))
+        self.assertEqual([2, 4, 8, 10], self.root.delays)
+        self.assertFalse(self.sync.online)
+
+        # An attempt that reaches the database while entries are still waiting
+        self.sync._sent([])
+        self.assertTrue(self.sync.online)
+        self.assertEqual(2, self.root.delays[-1])
+        self.sync._failed(ConnectionError("server unreachable"))
+        self.assertEqual(2, self.root.delays[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests of the filter compilation of the Search and Edit windows (src/query_builder.py).
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import sqlite3
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from query_builder import (build_filter_query, compile_condition, escape_like,  # noqa: E402
+                           _partial_date_range)
+
+
+def matching_materials(operator, value, materials):
+    """Runs one compiled filter row on an in-memory table and returns the matching Material values."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE inward_logistic (id INTEGER PRIMARY KEY, Material TEXT COLLATE NOCASE)")
+    connection.executemany("INSERT INTO inward_logistic (Material) VALUES (?)", [(m,) for m in materials])
+    query, params = build_filter_query([("Material", operator, value)], ["Material"], order_by="`id`")
+    rows = connection.execute(query.replace("%s", "?"), params).fetchall()
+    connection.close()
+    return [row[0] for row in rows]
+
+
+class EscapeLikeTest(unittest.TestCase):
+
+    def test_wildcards_and_escape_character_are_escaped(self):
+        self.assertEqual("100!%", escape_like("100%"))
+        self.assertEqual("a!_b", escape_like("a_b"))
+        self.assertEqual("x!!y", escape_like("x!y"))
+        # The escape character is escaped first, so the escapes added for % and _ are not doubled
+        self.assertEqual("!!!%!_", escape_like("!%_"))
+
+    def test_quotes_are_left_to_the_parameter(self):
+        self.assertEqual("O'Brien", escape_like("O'Brien"))
+
+
+class CompileConditionTest(unittest.TestCase):
+
+    def test_values_are_parameters(self):
+        value = "x' OR '1'='1"
+        for operator in ("Equals", "Not Equals", "Starts With", "Contains", "Not Contains"):
+            condition, params = compile_condition("Supplier", operator, value)
+            self.assertNotIn(value, condition)
+            self.assertNotIn("'1'", condition)
+            self.assertEqual(1, condition.count("%s"))
+            self.assertEqual(1, len(params))
+
+    def test_equals_keeps_the_value_as_is(self):
+        self.assertEqual(("`Supplier` = %s", ["50%_off!"]), compile_condition("Supplier", "Equals", "50%_off!"))
+        self.assertEqual(("`Supplier` <> %s", ["it's"]), compile_condition("Supplier", "Not Equals", "it's"))
+
+    def test_like_values_are_escaped(self):
+        self.assertEqual(("`Supplier` LIKE %s ESCAPE '!'", ["50!%!_off!!%"]),
+                         compile_condition("Supplier", "Starts With", "50%_off!"))
+        self.assertEqual(("`Supplier` LIKE %s ESCAPE '!'", ["%it's!%%"]),
+                         compile_condition("Supplier", "Contains", "it's%"))
+        self.assertEqual(("`Supplier` NOT LIKE %s ESCAPE '!'", ["%a!_b%"]),
+                         compile_condition("Supplier", "Not Contains", "a_b"))
+
+    def test_unknown_column_raises(self):
+        with self.assertRaises(ValueError):
+            compile_condition("Supplier`; DROP TABLE inward_logistic; --", "Equals", "x")
+
+    def test_unknown_operator_raises(self):
+        with self.assertRaises(ValueError):
+            compile_condition("Supplier", "Matches", "x")
+
+
+class ContainsTest(unittest.TestCase):
+
+    MATERIALS = ["Bolt M8", "rod, steel", "Steel rod 10mm", "Washer"]
+
+    def test_contains_is_a_substring_match_even_with_a_fulltext_index(self):
+        self.assertEqual(("`Material` LIKE %s ESCAPE '!'", ["%olt%"]),
+                         compile_condition("Material", "Contains", "olt", fulltext_columns={"Material"}))
+        self.assertEqual(["Bolt M8"], matching_materials("Contains", "olt", self.MATERIALS))
+        self.assertEqual(["Steel rod 10mm"], matching_materials("Contains", "steel rod", self.MATERIALS))
+
+    def test_contains_and_not_contains_are_complements(self):
+        for value in ("olt", "steel rod", "rod", "x"):
+            contains = matching_materials("Contains", value, self.MATERIALS)
+            not_contains = matching_materials("Not Contains", value, self.MATERIALS)
+            self.assertEqual(sorted(self.MATERIALS), sorted(contains + not_contains))
+            self.assertFalse(set(contains) & set(not_contains))
+
+    def test_contains_word_uses_the_fulltext_index(self):
+        self.assertEqual(("MATCH(`Material`) AGAINST (%s IN BOOLEAN MODE)", ["+steel* +rod*"]),
+                         compile_condition("Material", "Contains Word", "steel rod", fulltext_columns={"Material"}))
+
+    def test_contains_word_without_index_needs_every_word(self):
+        self.assertEqual(("(`Material` LIKE %s ESCAPE '!' AND `Material` LIKE %s ESCAPE '!')", ["%steel%", "%rod%"]),
+                         compile_condition("Material", "Contains Word", "steel rod"))
+        self.assertEqual(["rod, steel", "Steel rod 10mm"],
+                         matching_materials("Contains Word", "steel rod", self.MATERIALS))
+
+    def test_contains_word_with_short_words_falls_back_to_like(self):
+        condition, params = compile_condition("Material", "Contains Word", "M8", fulltext_columns={"Material"})
+        self.assertNotIn("MATCH", condition)
+        self.assertEqual(["%M8%"], params)
+
+
+class PartialDateTest(unittest.TestCase):
+
+    def test_year_and_month_ranges_are_half_open(self):
+        self.assertEqual(("2024-01-01", "2025-01-01"), _partial_date_range("2024"))
+        self.assertEqual(("2024-05-01", "2024-06-01"), _partial_date_range("2024-5"))
+        self.assertEqual(("2024-12-01", "2025-01-01"), _partial_date_range("2024-12"))
+
+    def test_other_values_are_no_range(self):
+        for value in ("2024-13", "2024-00", "24", "2024-05-01", "May 2024"):
+            self.assertIsNone(_partial_date_range(value))
+
+    def test_contains_on_a_date_column_uses_the_range(self):
+        self.assertEqual(("`Date` >= %s AND `Date` < %s", ["2024-12-01", "2025-01-01"]),
+                         compile_condition("Date", "Contains", "2024-12"))
+
+
+class BuildFilterQueryTest(unittest.TestCase):
+
+    def test_empty_filter_rows_are_skipped(self):
+        query, params = build_filter_query([("Supplier", "Equals", ""), ("", "Equals", "x")], ["id", "Supplier"])
+        self.assertEqual("SELECT `id`, `Supplier` FROM inward_logistic", query)
+        self.assertEqual([], params)
+
+    def test_keyset_after_id(self):
+        query, params = build_filter_query([("Supplier", "Equals", "ACME")], ["id"], order_by="`id`", limit=201,
+                                           after_id=400)
+        self.assertEqual("SELECT `id` FROM inward_logistic WHERE `Supplier` = %s AND `id` > %s "
+                         "ORDER BY `id` LIMIT 201", query)
+        self.assertEqual(["ACME", 400], params)
+
+    def test_keyset_before_id(self):
+        query, params = build_filter_query([], ["id"], order_by="`id` DESC", limit=201, before_id=400)
+        self.assertEqual("SELECT `id` FROM inward_logistic WHERE `id` < %s ORDER BY `id` DESC LIMIT 201", query)
+        self.assertEqual([400], params)
+
+    def test_unknown_select_column_raises(self):
+        with self.assertRaises(ValueError):
+            build_filter_query([], ["id", "password"])
+
+
+if __name__ == "__main__":
+    unittest.main()
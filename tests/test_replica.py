@@ -0,0 +1,123 @@
+"""
+Tests of the local read replica (src/replica.py) against a SQLite database standing in for the server.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+# The application's files (logs, caches) go to a scratch directory
+DATA_DIR = tempfile.mkdtemp(prefix="inward_logistic_test_")
+os.environ["INWARD_LOGISTIC_DATA_DIR"] = DATA_DIR
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage import SQLiteBackend, db_connection, use_storage  # noqa: E402
+from schema import bootstrap_schema  # noqa: E402
+from register import insert_entry, update_record  # noqa: E402
+from replica import RegisterReplica  # noqa: E402
+
+
+def tearDownModule():
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+def entry_values(invoice_no):
+    """Field values of one record as validate_entry() leaves them."""
+    return ["IN1", "Returnable", "Benefit", "2025-01-02", "10:00:00", "G1", invoice_no, "PO", "BOE",
+            "2025-01-09", "10:00:00", "Supplier", "Material", "5", "Department", "Project", "TPL",
+            "Vehicle", "Received", "Authorized", "Security", "Remark", "TPL Remarks"]
+
+
+def server_now():
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT NOW()")
+        now = cursor.fetchone()[0]
+        cursor.close()
+    return now
+
+
+def commit_entry(record_id, invoice_no, saved_at):
+    """
+    Commits one record with the id and the updated_at stamp it got when its INSERT ran.
+
+    SQLite serializes writers, so two gates' transactions cannot really overlap here. A transaction that
+    commits late is replayed as what its commit leaves behind: a lower id than records committed before it,
+    stamped with the time its statement ran.
+    """
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO inward_logistic (id, Invoice_No, Date, updated_at) VALUES (%s, %s, %s, %s)",
+                       (record_id, invoice_no, "2025-01-02", saved_at))
+        conn.commit()
+        cursor.close()
+
+
+def replica_invoices(replica):
+    with replica.storage.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, Invoice_No FROM inward_logistic ORDER BY id")
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+class RegisterReplicaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=DATA_DIR)
+        self.server = SQLiteBackend(os.path.join(self.directory, "server.sqlite3"))
+        use_storage(self.server)
+        bootstrap_schema()
+        self.replica = RegisterReplica(None, enabled=True, path=os.path.join(self.directory, "replica.sqlite3"),
+                                       batch_size=2)
+        self.replica._open()
+
+    def tearDown(self):
+        self.replica.close()
+        self.server.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_insert_stamps_updated_at(self):
+        # Without the stamp a late-committing record could only be found by its id, which the replica has passed
+        record_id = insert_entry(entry_values("INV1"))
+        with db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT updated_at FROM inward_logistic WHERE id = %s", (record_id,))
+            self.assertIsNotNone(cursor.fetchone()[0])
+            cursor.close()
+
+    def test_late_commit_of_a_lower_id_is_copied(self):
+        commit_entry(1, "INV1", server_now())
+        commit_entry(2, "INV2", server_now())
+        self.replica._pull()
+
+        # Gate A's INSERT runs and gets id 3, then gate B saves id 4 and commits first
+        gate_a_saved_at = server_now()
+        commit_entry(4, "INV4", server_now())
+        self.replica._pull()
+        self.assertEqual([1, 2, 4], [record_id for record_id, _ in replica_invoices(self.replica)])
+
+        # Gate A commits after the id scan has passed id 3; the updated_at delta still finds it
+        commit_entry(3, "INV3", gate_a_saved_at)
+        self.replica._pull()
+        self.assertEqual([(1, "INV1"), (2, "INV2"), (3, "INV3"), (4, "INV4")], replica_invoices(self.replica))
+
+    def test_edit_is_copied(self):
+        commit_entry(1, "INV1", server_now())
+        self.replica._pull()
+
+        update_record(1, entry_values("INV1-EDITED"))
+        synced_at = self.replica._pull()
+
+        self.assertEqual([(1, "INV1-EDITED")], replica_invoices(self.replica))
+        self.assertLessEqual(synced_at, datetime.now())
+
+
+if __name__ == "__main__":
+    unittest.main()
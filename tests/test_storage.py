@@ -0,0 +1,105 @@
+"""
+Tests of the SQLite storage backend (src/storage.py): the translation of the application's MySQL dialect
+and the batch semantics of executemany.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+# The application's files (logs, caches) go to a scratch directory
+DATA_DIR = tempfile.mkdtemp(prefix="inward_logistic_test_")
+os.environ["INWARD_LOGISTIC_DATA_DIR"] = DATA_DIR
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage import SQLiteBackend, _sqlite_query  # noqa: E402
+
+
+def tearDownModule():
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+class SqliteQueryTest(unittest.TestCase):
+
+    def test_placeholders_are_translated(self):
+        self.assertEqual("SELECT id FROM t WHERE a = ? AND b LIKE ? ESCAPE '!'",
+                         _sqlite_query("SELECT id FROM t WHERE a = %s AND b LIKE %s ESCAPE '!'"))
+
+    def test_placeholder_text_inside_literals_is_kept(self):
+        self.assertEqual("SELECT '%s', 'it''s %s', `x%s` FROM t WHERE a = ?",
+                         _sqlite_query("SELECT '%s', 'it''s %s', `x%s` FROM t WHERE a = %s"))
+
+
+class SQLiteBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=DATA_DIR)
+        self.storage = SQLiteBackend(os.path.join(self.directory, "test.sqlite3"))
+
+    def tearDown(self):
+        self.storage.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def select(self, query, params=()):
+        with self.storage.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+            cursor.close()
+        return row
+
+    def test_string_literal_with_placeholder_text_is_not_a_parameter(self):
+        self.assertEqual(("%s", "x"), self.select("SELECT '%s', %s", ("x",)))
+
+    def test_mysql_functions(self):
+        self.assertEqual((hashlib.md5(b"abc").hexdigest(), None), self.select("SELECT MD5(%s), MD5(NULL)", ("abc",)))
+        # CONCAT_WS skips NULLs like MySQL's
+        self.assertEqual(("a|1|c",), self.select("SELECT CONCAT_WS('|', %s, %s, NULL, %s)", ("a", 1, "c")))
+        # GREATEST is NULL as soon as one value is
+        self.assertEqual((7, None), self.select("SELECT GREATEST(3, 7, 5), GREATEST(3, NULL)"))
+        now = datetime.strptime(self.select("SELECT NOW()")[0], "%Y-%m-%d %H:%M:%S")
+        self.assertLess(abs((datetime.now() - now).total_seconds()), 5)
+
+    def test_executemany_is_all_or_nothing(self):
+        with self.storage.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("CREATE TABLE item (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL)")
+            cursor.executemany("INSERT INTO item (name) VALUES (%s)", [("a",), ("b",)])
+            self.assertEqual(1, cursor.lastrowid)
+
+            # The middle row is rejected, so neither of its neighbours is kept
+            with self.assertRaises(sqlite3.IntegrityError):
+                cursor.executemany("INSERT INTO item (name) VALUES (%s)", [("c",), (None,), ("d",)])
+            cursor.execute("SELECT name FROM item ORDER BY id")
+            self.assertEqual([("a",), ("b",)], cursor.fetchall())
+
+            cursor.executemany("INSERT INTO item (name) VALUES (%s)", [("e",), ("f",)])
+            first_id = cursor.lastrowid
+            cursor.execute("SELECT id FROM item WHERE name = %s", ("e",))
+            self.assertEqual((first_id,), cursor.fetchone())
+            cursor.close()
+
+    def test_failed_executemany_keeps_the_surrounding_transaction(self):
+        with self.storage.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+            conn.start_transaction()
+            cursor.execute("INSERT INTO item (name) VALUES (%s)", ("a",))
+            with self.assertRaises(sqlite3.IntegrityError):
+                cursor.executemany("INSERT INTO item (name) VALUES (%s)", [("b",), (None,)])
+            self.assertTrue(conn.in_transaction)
+            conn.commit()
+            cursor.execute("SELECT name FROM item")
+            self.assertEqual([("a",)], cursor.fetchall())
+            cursor.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
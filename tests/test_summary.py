@@ -0,0 +1,109 @@
+"""
+Tests of the daily summary (src/summary.py) against a SQLite database standing in for the server.
+
+Run from the repository root:
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# The application's files (logs, caches) go to a scratch directory
+DATA_DIR = tempfile.mkdtemp(prefix="inward_logistic_test_")
+os.environ["INWARD_LOGISTIC_DATA_DIR"] = DATA_DIR
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from storage import SQLiteBackend, db_connection, use_storage  # noqa: E402
+from schema import bootstrap_schema  # noqa: E402
+from register import insert_entry, update_record  # noqa: E402
+from summary import build_daily_summary  # noqa: E402
+
+
+def tearDownModule():
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+def entry_values(day, supplier, project, qty):
+    """Field values of one record as validate_entry() leaves them."""
+    return ["IN1", "Returnable", "Benefit", day, "10:00:00", "G1", "INV", "PO", "BOE",
+            "2025-01-09", "10:00:00", supplier, "Material", qty, "Department", project, "TPL",
+            "Vehicle", "Received", "Authorized", "Security", "Remark", "TPL Remarks"]
+
+
+def query(sql, params=()):
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+
+def summary_totals():
+    return sorted(query("SELECT Date, Project, Supplier, Department, Benefit_Type, entry_count, qty_sum "
+                        "FROM inward_daily_summary WHERE entry_count <> 0"))
+
+
+def register_totals(through_id=None):
+    """The same totals counted straight from the register, optionally only up to an id."""
+    return sorted(query("SELECT Date, COALESCE(Project, ''), COALESCE(Supplier, ''), COALESCE(Department, ''), "
+                        "COALESCE(Benefit_Type, ''), COUNT(*), COALESCE(SUM(Qty), 0) FROM inward_logistic "
+                        "WHERE Date IS NOT NULL AND id <= %s "
+                        "GROUP BY Date, Project, Supplier, Department, Benefit_Type",
+                        (through_id if through_id is not None else 2 ** 62,)))
+
+
+class Interrupted(Exception):
+    pass
+
+
+class DailySummaryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=DATA_DIR)
+        self.server = SQLiteBackend(os.path.join(self.directory, "server.sqlite3"))
+        use_storage(self.server)
+        bootstrap_schema()
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_inserts_and_edits_update_a_complete_summary(self):
+        build_daily_summary()
+        first_id = insert_entry(entry_values("2025-01-02", "ACME", "P1", 5))
+        insert_entry(entry_values("2025-01-02", "ACME", "P1", 3))
+        insert_entry(entry_values("2025-01-03", "Globex", "P2", 7))
+
+        # The edit moves the record to another day and supplier
+        update_record(first_id, entry_values("2025-01-03", "Globex", "P2", 10))
+
+        self.assertEqual([(1,)], query("SELECT complete FROM inward_summary_state"))
+        self.assertEqual(register_totals(), summary_totals())
+
+    def test_resumed_build_counts_the_register_once(self):
+        record_ids = [insert_entry(entry_values(f"2025-01-0{day}", "ACME", "P1", day)) for day in range(1, 6)]
+
+        def interrupt(through_id, max_id):
+            raise Interrupted()
+
+        with self.assertRaises(Interrupted):
+            build_daily_summary(progress=interrupt, chunk_size=2)
+        through_id = query("SELECT through_id FROM inward_summary_state")[0][0]
+        self.assertEqual(record_ids[1], through_id)
+        self.assertEqual(register_totals(through_id), summary_totals())
+
+        # Writes to records the build has not reached are skipped, writes below it are counted right away
+        update_record(record_ids[0], entry_values("2025-01-01", "Globex", "P2", 4))
+        update_record(record_ids[3], entry_values("2025-01-04", "Globex", "P2", 40))
+        insert_entry(entry_values("2025-01-06", "Initech", "P3", 6))
+        self.assertEqual(register_totals(through_id), summary_totals())
+
+        build_daily_summary(chunk_size=2)
+        self.assertEqual(register_totals(), summary_totals())
+
+
+if __name__ == "__main__":
+    unittest.main()